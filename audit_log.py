@@ -0,0 +1,291 @@
+# audit_log.py - Structured local audit log for the BrainAllianceFX Bot
+# JSON lines written in the background with size rotation and an optional SQLite index
+
+import asyncio
+import collections
+import contextlib
+import contextvars
+import datetime
+import json
+import os
+import sqlite3
+import time
+
+# =============================================================================
+# AUDIT LOG SETTINGS
+# =============================================================================
+
+# JSON lines file and rotation policy
+AUDIT_LOG_FILE = os.getenv('AUDIT_LOG_FILE', 'audit_log.jsonl')
+try:
+    AUDIT_LOG_MAX_BYTES = int(os.getenv('AUDIT_LOG_MAX_BYTES', str(5 * 1024 * 1024)))
+    AUDIT_LOG_BACKUPS = int(os.getenv('AUDIT_LOG_BACKUPS', '3'))
+except ValueError:
+    AUDIT_LOG_MAX_BYTES = 5 * 1024 * 1024
+    AUDIT_LOG_BACKUPS = 3
+
+# SQLite file mirrored from the log and used for queries (empty disables; .audit then only sees recent records)
+AUDIT_DB_FILE = os.getenv('AUDIT_DB_FILE', 'audit.db')
+
+# Newest records kept in the SQLite index (older rows are pruned as new ones arrive)
+try:
+    AUDIT_DB_MAX_RECORDS = max(1, int(os.getenv('AUDIT_DB_MAX_RECORDS', '100000')))
+except ValueError:
+    AUDIT_DB_MAX_RECORDS = 100000
+
+# Buffered records are written after this many seconds or records
+AUDIT_FLUSH_INTERVAL = 1.0
+AUDIT_FLUSH_RECORDS = 100
+
+# Recent records kept in memory for queries when SQLite is disabled
+AUDIT_MEMORY_RECORDS = 5000
+
+# Outcomes recognised at the start of log_command details ("failed | ...")
+KNOWN_OUTCOMES = ('success', 'failed', 'skip', 'warning')
+
+# Columns of the SQLite index
+AUDIT_COLUMNS = ('ts', 'command', 'author_id', 'author', 'guild_id', 'targets', 'outcome', 'details', 'duration_ms')
+
+# Current command invocation (set by the before_invoke hook)
+_invocation = contextvars.ContextVar('audit_invocation', default=None)
+
+# =============================================================================
+# AUDIT LOG
+# =============================================================================
+
+class AuditQuery:
+    """Filters for AuditLog.query(); unset fields match everything"""
+
+    def __init__(self, user_id=None, command=None, outcome=None, guild_id=None, since=None, limit=10):
+        self.user_id = user_id
+        self.command = command
+        self.outcome = outcome
+        self.guild_id = guild_id
+        self.since = since  # epoch seconds
+        self.limit = limit
+
+    def matches(self, record):
+        return (
+            (self.user_id is None or record['author_id'] == self.user_id)
+            and (self.command is None or record['command'] == self.command)
+            and (self.outcome is None or record['outcome'] == self.outcome)
+            and (self.guild_id is None or record['guild_id'] == self.guild_id)
+            and (self.since is None or record['ts'] >= self.since)
+        )
+
+class AuditLog:
+    """Buffered, rotating JSON lines audit log.
+
+    record() only appends to an in-memory buffer; a background task writes
+    the buffer off the event loop (and flush() at shutdown). Queries use the
+    SQLite index, which starts from the existing log files when it is first
+    created; with AUDIT_DB_FILE empty they only see the in-memory recent
+    records.
+    """
+
+    def __init__(self, path: str = AUDIT_LOG_FILE, db_path: str = AUDIT_DB_FILE):
+        self.path = path
+        self.db_path = db_path
+        self.recent = collections.deque(maxlen=AUDIT_MEMORY_RECORDS)
+        self._buffer = []
+        self._flush_task = None
+        self._lock = asyncio.Lock()
+        self._db_ready = False
+
+    # --- Invocation context ---
+
+    def begin(self, ctx):
+        """Remember the running command so records can carry duration and arguments"""
+        try:
+            args = ctx.message.content[len(ctx.prefix or '') + len(ctx.invoked_with or ''):].strip()
+        except Exception:
+            args = ''
+        _invocation.set({
+            'command': ctx.command.qualified_name if ctx.command else None,
+            'started': time.perf_counter(),
+            'guild_id': ctx.guild.id if ctx.guild else None,
+            'args': args,
+        })
+
+    # --- Writing ---
+
+    def record(self, author, command_name, details, targets=None):
+        """Append one structured record for a log_command call"""
+        invocation = _invocation.get()
+        details = str(details)
+        outcome = details.split(' | ', 1)[0].strip().lower()
+        if outcome not in KNOWN_OUTCOMES:
+            outcome = 'success'
+        guild = getattr(author, 'guild', None)
+        entry = {
+            'ts': time.time(),
+            'command': command_name,
+            'author_id': getattr(author, 'id', None),
+            'author': getattr(author, 'name', str(author)),
+            'guild_id': guild.id if guild else (invocation or {}).get('guild_id'),
+            'targets': targets if targets is not None else (invocation or {}).get('args'),
+            'outcome': outcome,
+            'details': details,
+            'duration_ms': round((time.perf_counter() - invocation['started']) * 1000, 1) if invocation else None,
+        }
+        self.recent.append(entry)
+        self._buffer.append(entry)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop (e.g. at shutdown); the next record will flush
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        deadline = time.monotonic() + AUDIT_FLUSH_INTERVAL
+        while len(self._buffer) < AUDIT_FLUSH_RECORDS and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        await self.flush()
+
+    async def flush(self):
+        """Write buffered records to the log file (and SQLite) off the event loop"""
+        async with self._lock:
+            records, self._buffer = self._buffer, []
+            if not records:
+                return
+            try:
+                await asyncio.to_thread(self._write, records)
+            except Exception as e:
+                print(f"❌ Error writing audit log: {e}")
+
+    def _write(self, records):
+        rows = [_serializable(record) for record in records]
+        # Opened before the file is appended, so a new index importing the log files does not see this batch twice
+        db = self._open_index()
+        try:
+            lines = ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+            self._rotate_if_needed(len(lines.encode('utf-8')))
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+        finally:
+            # An index error never costs the log file its records (and the other way round)
+            if db is not None:
+                self._index_rows(db, rows)
+
+    def _open_index(self):
+        """Connection to the SQLite index, or None when disabled or unavailable"""
+        if not self.db_path:
+            return None
+        try:
+            return self._connect()
+        except Exception as e:
+            print(f"❌ Error opening audit index: {e}")
+            return None
+
+    def _index_rows(self, db, rows):
+        try:
+            with contextlib.closing(db), db:
+                _insert(db, rows)
+                # Bounded like the rotated log files: keep only the newest AUDIT_DB_MAX_RECORDS rows
+                db.execute("DELETE FROM audit WHERE id <= (SELECT MAX(id) FROM audit) - ?", (AUDIT_DB_MAX_RECORDS,))
+        except Exception as e:
+            print(f"❌ Error indexing audit records: {e}")
+
+    def _rotate_if_needed(self, incoming: int):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if size + incoming <= AUDIT_LOG_MAX_BYTES:
+            return
+        if AUDIT_LOG_BACKUPS <= 0:
+            os.remove(self.path)
+            return
+        for i in range(AUDIT_LOG_BACKUPS - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    # --- Querying ---
+
+    async def query(self, query: AuditQuery):
+        """Return matching records, newest first"""
+        if self.db_path:
+            await self.flush()
+            return await asyncio.to_thread(self._query_db, query)
+        results = []
+        for record in reversed(self.recent):
+            if query.matches(record):
+                results.append(record)
+                if len(results) >= query.limit:
+                    break
+        return results
+
+    def _query_db(self, query: AuditQuery):
+        clauses, params = [], []
+        for column, value in (('author_id', query.user_id), ('command', query.command),
+                              ('outcome', query.outcome), ('guild_id', query.guild_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if query.since is not None:
+            clauses.append("ts >= ?")
+            params.append(query.since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with contextlib.closing(self._connect()) as db:
+            db.row_factory = sqlite3.Row
+            rows = db.execute(f"SELECT * FROM audit {where} ORDER BY ts DESC LIMIT ?", params + [query.limit]).fetchall()
+        return [dict(row) for row in rows]
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path)
+        if not self._db_ready:
+            created = db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audit'").fetchone() is None
+            db.executescript(
+                "CREATE TABLE IF NOT EXISTS audit ("
+                " id INTEGER PRIMARY KEY, ts REAL, command TEXT, author_id INTEGER, author TEXT,"
+                " guild_id INTEGER, targets TEXT, outcome TEXT, details TEXT, duration_ms REAL);"
+                "CREATE INDEX IF NOT EXISTS audit_ts ON audit (ts);"
+                "CREATE INDEX IF NOT EXISTS audit_author ON audit (author_id, ts);"
+                "CREATE INDEX IF NOT EXISTS audit_command ON audit (command, ts);"
+            )
+            if created:
+                self._import_log_files(db)
+            self._db_ready = True
+        return db
+
+    def _import_log_files(self, db):
+        """Fill a new index with the records already in the log file and its backups"""
+        paths = [f"{self.path}.{i}" for i in range(AUDIT_LOG_BACKUPS, 0, -1)] + [self.path]
+        imported = 0
+        with db:
+            for path in paths:
+                if not os.path.exists(path):
+                    continue
+                with open(path, encoding='utf-8') as f:
+                    records = []
+                    for line in f:
+                        try:
+                            records.append(json.loads(line))
+                        except ValueError:
+                            continue  # Truncated line (e.g. crash mid-write)
+                _insert(db, records)
+                imported += len(records)
+        if imported:
+            print(f"📒 Imported {imported} audit record(s) into {self.db_path}")
+
+def _insert(db, records):
+    db.executemany(
+        f"INSERT INTO audit ({', '.join(AUDIT_COLUMNS)}) VALUES ({', '.join('?' for _ in AUDIT_COLUMNS)})",
+        [tuple(record.get(column) for column in AUDIT_COLUMNS) for record in records]
+    )
+
+def _serializable(record):
+    entry = dict(record)
+    entry['time'] = datetime.datetime.fromtimestamp(record['ts'], datetime.timezone.utc).isoformat()
+    if not isinstance(entry['targets'], (str, type(None))):
+        entry['targets'] = json.dumps(entry['targets'], ensure_ascii=False, default=str)
+    return entry
+
+# Global instance
+audit_log = AuditLog()
@@ -0,0 +1,143 @@
+# authorization.py - Authorized users store for the BrainAllianceFX Bot
+# Loaded once into memory; .auth/.deauth write through to authorized_users.json
+
+import asyncio
+import json
+import os
+
+import aiofiles
+
+from messages import get_status_message
+
+# File to store authorized users
+AUTH_FILE = 'authorized_users.json'
+
+# Seconds between mtime checks of AUTH_FILE (0 disables the watcher)
+try:
+    AUTH_RELOAD_INTERVAL = float(os.getenv('AUTH_RELOAD_INTERVAL', '30'))
+except ValueError:
+    AUTH_RELOAD_INTERVAL = 30.0
+
+# Used when no authorized users are configured anywhere
+DEFAULT_AUTHORIZED_USERS = {
+    '539464122027343873': 'StaffBotOwner'  # Default: your user ID
+}
+
+class AuthorizationStore:
+    """In-memory authorized users, keyed by user ID.
+
+    `users` maps str(user_id) -> username exactly as persisted, and `ids` is a
+    frozenset of int IDs used for O(1) checks on every command.
+    """
+
+    def __init__(self, path: str = AUTH_FILE):
+        self.path = path
+        self.users = {}
+        self.ids = frozenset()
+        self.loaded = False
+        self._mtime = None
+        self._lock = asyncio.Lock()
+        self._watch_task = None
+
+    def is_authorized(self, user_id: int):
+        return int(user_id) in self.ids
+
+    def get_name(self, user_id: int, default=None):
+        return self.users.get(str(user_id), default)
+
+    async def ensure_loaded(self):
+        if not self.loaded:
+            await self.load()
+
+    async def load(self):
+        """Load from the AUTHORIZED_USERS env var and the JSON file (JSON takes precedence)"""
+        authorized_users = {}
+
+        # First, try to load from .env file
+        env_auth_users = os.getenv('AUTHORIZED_USERS')
+        if env_auth_users:
+            try:
+                # Parse comma-separated user IDs from .env
+                user_ids = [user_id.strip() for user_id in env_auth_users.split(',') if user_id.strip()]
+                for user_id in user_ids:
+                    try:
+                        # Validate user ID format
+                        int(user_id)
+                        authorized_users[user_id] = f"User_{user_id}"  # Default name
+                    except ValueError:
+                        print(f"Warning: Invalid user ID in AUTHORIZED_USERS: {user_id}")
+            except Exception as e:
+                print(f"Error parsing AUTHORIZED_USERS from .env: {e}")
+
+        # Then, try to load from JSON file (this will override .env if both exist)
+        mtime = self._stat_mtime()
+        try:
+            async with aiofiles.open(self.path, 'r') as f:
+                json_data = json.loads(await f.read())
+                # Merge JSON data with .env data (JSON takes precedence)
+                authorized_users.update(json_data)
+        except FileNotFoundError:
+            pass  # JSON file doesn't exist, that's okay
+        except json.JSONDecodeError:
+            print(get_status_message("json_error"))
+
+        # If no authorized users found anywhere, use default
+        if not authorized_users:
+            authorized_users = dict(DEFAULT_AUTHORIZED_USERS)
+
+        self._set(authorized_users)
+        self._mtime = mtime
+        self.loaded = True
+        return self.users
+
+    async def add(self, user_id: int, username: str):
+        """Authorize user_id and persist immediately"""
+        async with self._lock:
+            users = dict(self.users)
+            users[str(user_id)] = username
+            await self._save(users)
+
+    async def remove(self, user_id: int):
+        """Deauthorize user_id and persist immediately"""
+        async with self._lock:
+            users = dict(self.users)
+            users.pop(str(user_id), None)
+            await self._save(users)
+
+    def start_watcher(self, interval: float = AUTH_RELOAD_INTERVAL):
+        """Reload the file when it is changed outside the bot (polls its mtime)"""
+        if interval <= 0 or (self._watch_task and not self._watch_task.done()):
+            return
+        self._watch_task = asyncio.get_running_loop().create_task(self._watch(interval))
+
+    async def _watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                mtime = self._stat_mtime()
+                if mtime != self._mtime:
+                    async with self._lock:
+                        await self.load()
+                    print(f"🔐 Reloaded authorized users ({len(self.ids)} users)")
+            except Exception as e:
+                print(f"❌ Error reloading authorized users: {e}")
+
+    async def _save(self, users):
+        async with aiofiles.open(self.path, 'w') as f:
+            await f.write(json.dumps(users, indent=4))
+        self._set(users)
+        self._mtime = self._stat_mtime()
+
+    def _set(self, users):
+        # An empty store falls back to the default owner, as on load
+        self.users = users or dict(DEFAULT_AUTHORIZED_USERS)
+        self.ids = frozenset(int(user_id) for user_id in self.users if str(user_id).isdigit())
+
+    def _stat_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+# Global instance
+auth_store = AuthorizationStore()
@@ -0,0 +1,152 @@
+# batch_executor.py - Concurrent bulk member operations for the BrainAllianceFX Bot
+# Runs per-member REST calls in parallel, bounded per Discord rate-limit bucket
+
+import asyncio
+import os
+import time
+
+import discord
+
+from messages import get_status_message
+
+# =============================================================================
+# EXECUTOR SETTINGS
+# =============================================================================
+
+# Concurrent requests allowed per rate-limit bucket
+try:
+    BATCH_CONCURRENCY = max(1, int(os.getenv('BATCH_CONCURRENCY', '5')))
+except ValueError:
+    BATCH_CONCURRENCY = 5
+
+# Seconds between progress message edits (also the delay before the first one)
+PROGRESS_INTERVAL = 2.0
+
+# =============================================================================
+# RATE-LIMIT BUCKETS
+# =============================================================================
+
+# Shared semaphores, one per bucket key, so parallel commands share the bound
+_buckets = {}
+
+def bucket(key, limit: int = BATCH_CONCURRENCY):
+    """Return the shared semaphore for a rate-limit bucket key"""
+    semaphore = _buckets.get(key)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(limit)
+        _buckets[key] = semaphore
+    return semaphore
+
+def member_bucket(guild: discord.Guild):
+    """Bucket for PATCH /guilds/{guild_id}/members/{user_id} (edit, move, mute, disconnect)"""
+    return ('guild_member_modify', guild.id)
+
+def member_roles_bucket(guild: discord.Guild):
+    """Bucket for PUT/DELETE /guilds/{guild_id}/members/{user_id}/roles/{role_id}"""
+    return ('guild_member_roles', guild.id)
+
+def ban_bucket(guild: discord.Guild):
+    """Bucket for PUT /guilds/{guild_id}/bans/{user_id}"""
+    return ('guild_ban', guild.id)
+
+# =============================================================================
+# BATCH EXECUTION
+# =============================================================================
+
+class BatchResult:
+    """Per-item outcome of a batch: succeeded items and (item, error) failures"""
+
+    def __init__(self):
+        self.succeeded = []
+        self.failed = []
+
+    @property
+    def total(self):
+        return len(self.succeeded) + len(self.failed)
+
+async def run_batch(items, operation, bucket_key, on_progress=None):
+    """Run `await operation(item)` for every item concurrently.
+
+    Concurrency is bounded by the shared semaphore for bucket_key. Errors
+    (Discord or otherwise) are collected per item instead of aborting the
+    batch, and on_progress(done, total) is called after each item completes.
+    """
+    items = list(items)
+    result = BatchResult()
+    semaphore = bucket(bucket_key)
+    done = 0
+
+    async def _run_one(item):
+        nonlocal done
+        async with semaphore:
+            try:
+                await operation(item)
+                result.succeeded.append(item)
+            except Exception as e:
+                # Any error fails only this item; the rest of the batch keeps going
+                result.failed.append((item, e))
+        done += 1
+        if on_progress:
+            on_progress(done, len(items))
+
+    await asyncio.gather(*(_run_one(item) for item in items))
+    return result
+
+def describe_error(error):
+    """Short reason used in failure summaries"""
+    if isinstance(error, discord.Forbidden):
+        return "missing permissions"
+    if isinstance(error, discord.NotFound):
+        return "not found"
+    if isinstance(error, discord.HTTPException):
+        return "HTTP error"
+    return "unexpected error"
+
+# =============================================================================
+# PROGRESS REPORTING
+# =============================================================================
+
+class ProgressReporter:
+    """Edits one status message with batch progress.
+
+    Nothing is sent for batches that finish within PROGRESS_INTERVAL; after
+    that the message is updated at most once per interval and removed by
+    finish(). destination is a channel or a command context; for slash
+    commands the context sends (and then edits) an interaction follow-up.
+    """
+
+    def __init__(self, destination, action: str, interval: float = PROGRESS_INTERVAL):
+        self.destination = destination
+        self.action = action
+        self.interval = interval
+        self.message = None
+        self._started = time.monotonic()
+        self._last_update = self._started
+        self._pending = None
+
+    def __call__(self, done: int, total: int):
+        now = time.monotonic()
+        if now - self._last_update < self.interval or (self._pending and not self._pending.done()):
+            return
+        self._last_update = now
+        self._pending = asyncio.get_running_loop().create_task(self._update(done, total))
+
+    async def _update(self, done: int, total: int):
+        text = get_status_message("batch_progress", action=self.action, done=done, total=total)
+        try:
+            if self.message is None:
+                self.message = await self.destination.send(text)
+            else:
+                await self.message.edit(content=text)
+        except discord.HTTPException:
+            pass
+
+    async def finish(self):
+        if self._pending:
+            await asyncio.gather(self._pending, return_exceptions=True)
+        if self.message is not None:
+            try:
+                await self.message.delete()
+            except discord.HTTPException:
+                pass
+            self.message = None
@@ -0,0 +1,305 @@
+# bench.py - Offline benchmarks for the BrainAllianceFX Bot
+# Times the resolvers, bulk commands and the startup waiting scan against a synthetic guild and fake REST API
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from fake_discord import FakeContext, FakeDiscordAPI, SyntheticGuild, install_bot_user
+from resolver import KIND_MEMBER, KIND_ROLE, KIND_VOICE_CHANNEL
+from guild_config import LEGACY_SETTINGS
+
+# =============================================================================
+# BENCHMARK SETTINGS
+# =============================================================================
+
+SCENARIOS = ('resolve_member', 'resolve_role', 'resolve_voice_channel', 'role_in', 'servermoveall', 'massban', 'waiting_scan')
+
+# Users in a .massban list that are not in the guild (their names are fetched)
+MASSBAN_OUTSIDERS = 10
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks against a synthetic guild and a fake Discord REST API")
+    parser.add_argument('--members', type=int, default=5000, help="members in the guild")
+    parser.add_argument('--roles', type=int, default=200, help="generic roles (each member gets 3)")
+    parser.add_argument('--voice-channels', type=int, default=50, help="voice channels")
+    parser.add_argument('--voice-members', type=int, default=300, help="members connected to voice")
+    parser.add_argument('--targets', type=int, default=200, help="members affected by .role -i, .massban and the waiting scan")
+    parser.add_argument('--queries', type=int, default=2000, help="lookups per resolver benchmark")
+    parser.add_argument('--iterations', type=int, default=3, help="runs of each command benchmark")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="fake REST latency per request")
+    parser.add_argument('--jitter', type=float, default=0.2, help="latency spread (fraction, +/-)")
+    parser.add_argument('--bucket-limit', type=int, default=50, help="requests per rate-limit bucket window")
+    parser.add_argument('--bucket-window', type=float, default=1.0, help="rate-limit bucket window in seconds")
+    parser.add_argument('--unexpected-429', type=float, default=0.0, help="fraction of requests answered with a 429 regardless of the bucket")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--only', default=','.join(SCENARIOS), help="comma-separated scenarios to run")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON results file")
+    parser.add_argument('--baseline', help="previous results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="slowdown vs the baseline reported as a regression")
+    parser.add_argument('--verbose', action='store_true', help="keep the bot's console output")
+    return parser.parse_args(argv)
+
+# =============================================================================
+# STATISTICS
+# =============================================================================
+
+def summarize(samples):
+    """Wall-time statistics in milliseconds"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {'count': 0}
+    def pick(p):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000, 3)
+    return {
+        'count': len(ordered),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3),
+        'p50_ms': pick(50),
+        'p95_ms': pick(95),
+        'p99_ms': pick(99),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+def compare(results, baseline, tolerance):
+    """Lines describing p50 changes against baseline; (lines, regressions)"""
+    lines = []
+    regressions = 0
+    for name, result in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or not previous.get('p50_ms') or 'p50_ms' not in result:
+            continue
+        change = result['p50_ms'] / previous['p50_ms'] - 1
+        regressed = change > tolerance
+        regressions += int(regressed)
+        lines.append(f"{'REGRESSION' if regressed else 'ok':>10}  {name:<22} p50 {previous['p50_ms']:.3f}ms -> {result['p50_ms']:.3f}ms ({change:+.1%})")
+    return lines, regressions
+
+# =============================================================================
+# BENCHMARKS
+# =============================================================================
+
+class Benchmarks:
+    """Runs the scenarios against one synthetic guild"""
+
+    def __init__(self, args, main, api, synthetic, target_role_id):
+        self.args = args
+        self.main = main
+        self.api = api
+        self.synthetic = synthetic
+        self.target_role_id = target_role_id
+        self.guild = synthetic.guild
+        self.rng = synthetic.rng
+        self.channel = self.guild.get_channel(synthetic.text_channel_ids[0])
+        members = [self.guild.get_member(member_id) for member_id in synthetic.member_ids]
+        self.author = members[0]
+        self.targets = [m for m in self.guild.get_role(self.target_role_id).members if m != self.author]
+
+    # --- Resolvers (synchronous, CPU only) ---
+
+    def _queries(self, objects, names_of):
+        """Exact, prefix, typo and ID lookups for random objects"""
+        queries = []
+        for _ in range(self.args.queries):
+            obj = self.rng.choice(objects)
+            name = self.rng.choice([n for n in names_of(obj) if n]) or str(obj.id)
+            kind = self.rng.random()
+            if kind < 0.3:
+                queries.append(name)
+            elif kind < 0.55:
+                queries.append(name[:max(3, len(name) // 2)])
+            elif kind < 0.85 and len(name) > 4:
+                i = self.rng.randrange(1, len(name) - 1)
+                queries.append(name[:i] + name[i + 1] + name[i] + name[i + 2:])
+            else:
+                queries.append(str(obj.id))
+        return queries
+
+    def bench_resolver(self, resolve, kind, objects, names_of):
+        queries = self._queries(objects, names_of)
+        self.main.resolver.invalidate(self.guild.id)
+        started = time.perf_counter()
+        self.main.resolver.index(self.guild, kind)
+        index_build = time.perf_counter() - started
+        samples = []
+        misses = 0
+        for query in queries:
+            started = time.perf_counter()
+            try:
+                resolve(self.guild, query)
+            except ValueError:
+                misses += 1
+            samples.append(time.perf_counter() - started)
+        return dict(summarize(samples), index_build_ms=round(index_build * 1000, 3), misses=misses)
+
+    # --- Commands (through the real invoke hooks and discord.py's HTTP client) ---
+
+    async def bench_command(self, command_name, *args, **kwargs):
+        samples = []
+        requests_before = self.api.requests
+        responses_429_before = self.api.responses_429
+        self.main.instrumentation.commands.pop(command_name, None)
+        # Extensions load on first use; keep the import out of the timed runs
+        await self.main.bot.load_extension_for(command_name)
+        for _ in range(self.args.iterations):
+            ctx = FakeContext(self.main.bot, command_name, self.guild, self.author, self.channel, ' '.join(map(str, args)))
+            started = time.perf_counter()
+            await self.main._delete_invocation(ctx)
+            try:
+                await ctx.command.callback(ctx, *args, **kwargs)
+            except Exception:
+                ctx.command_failed = True
+                raise
+            finally:
+                await self.main._record_invocation(ctx)
+            samples.append(time.perf_counter() - started)
+        return self._with_rest_stats(summarize(samples), command_name, requests_before, responses_429_before)
+
+    async def bench_waiting_scan(self):
+        # Run once: a repeated scan would find every private channel already created
+        requests_before = self.api.requests
+        responses_429_before = self.api.responses_429
+        self.main.instrumentation.commands.pop('waiting_scan', None)
+        ctx = types.SimpleNamespace(command=types.SimpleNamespace(qualified_name='waiting_scan'), command_failed=False)
+        self.main.instrumentation.begin(ctx)
+        started = time.perf_counter()
+        progress = await self.main.start_waiting_scan(self.guild)
+        elapsed = time.perf_counter() - started
+        self.main.instrumentation.end(ctx)
+        result = self._with_rest_stats(summarize([elapsed]), 'waiting_scan', requests_before, responses_429_before)
+        result.update(members=progress.total, channels_created=progress.channels_created, failed=len(progress.failed))
+        return result
+
+    def _with_rest_stats(self, result, command_name, requests_before, responses_429_before):
+        stats = self.main.instrumentation.commands.get(command_name)
+        runs = max(1, result.get('count', 1))
+        result.update(
+            rest_requests_per_run=round((self.api.requests - requests_before) / runs, 1),
+            responses_429=self.api.responses_429 - responses_429_before,
+            # Summed over concurrent requests, so it can exceed the wall time
+            ratelimit_wait_s_per_run=round(stats.ratelimit_wait / runs, 3) if stats else None,
+        )
+        return result
+
+    async def run(self, scenario):
+        import command_helpers  # like main, imported once the environment is cleaned
+        if scenario == 'resolve_member':
+            return self.bench_resolver(command_helpers.resolve_member_by_query, KIND_MEMBER, self.guild.members, lambda m: [m.display_name, m.name])
+        if scenario == 'resolve_role':
+            return self.bench_resolver(command_helpers.resolve_role_by_query, KIND_ROLE, self.guild.roles[1:], lambda r: [r.name])
+        if scenario == 'resolve_voice_channel':
+            return self.bench_resolver(command_helpers.resolve_voice_channel_by_query, KIND_VOICE_CHANNEL, self.guild.voice_channels, lambda c: [c.name])
+        if scenario == 'role_in':
+            action_role = self.guild.get_role(self.synthetic.role_ids[0])
+            return await self.bench_command('role', args=f"-a {action_role.id} -i {self.target_role_id}")
+        if scenario == 'servermoveall':
+            return await self.bench_command('servermoveall', str(self.synthetic.voice_channel_ids[0]))
+        if scenario == 'massban':
+            outsiders = [str(self.synthetic.guild_id + 90_000_000 + i) for i in range(MASSBAN_OUTSIDERS)]
+            return await self.bench_command('massban', *[str(m.id) for m in self.targets], *outsiders)
+        if scenario == 'waiting_scan':
+            return await self.bench_waiting_scan()
+        raise ValueError(f"unknown scenario: {scenario}")
+
+# =============================================================================
+# ENTRY POINT
+# =============================================================================
+
+async def run_benchmarks(args, scenarios):
+    for name in ('DISCORD_TOKEN', 'LOG_CHANNEL_ID'):
+        os.environ.pop(name, None)
+    import main
+
+    logging.getLogger('discord').addHandler(logging.NullHandler())
+    bot_user = install_bot_user(main.bot)
+    api = FakeDiscordAPI(latency=args.latency_ms / 1000, jitter=args.jitter, bucket_limit=args.bucket_limit,
+                         bucket_window=args.bucket_window, unexpected_429=args.unexpected_429, seed=args.seed)
+    api.install(main.bot, bot_user)
+
+    # The synthetic guild carries the legacy Waiting Setup IDs, configured like the original server
+    target_role = (LEGACY_SETTINGS['trigger_role'], 'bench-targets', args.targets)
+    synthetic = SyntheticGuild(
+        main.bot._connection,
+        members=args.members, roles=args.roles, voice_channels=args.voice_channels, voice_members=args.voice_members,
+        fixed_roles=[target_role, (LEGACY_SETTINGS['waiting_role'], 'sala-d-attesa', 0)],
+        categories=[(LEGACY_SETTINGS['waiting_category'], 'waiting')],
+        seed=args.seed,
+    )
+    await main.guild_config.seed_legacy(main.bot.guilds)
+    main.guild_counters.rebuild(main.bot.guilds)
+    benchmarks = Benchmarks(args, main, api, synthetic, LEGACY_SETTINGS['trigger_role'])
+
+    results = {}
+    for scenario in scenarios:
+        print(f"running {scenario}...", file=sys.stderr)
+        with contextlib.redirect_stdout(sys.stdout if args.verbose else open(os.devnull, 'w')):
+            results[scenario] = await benchmarks.run(scenario)
+    return results, api
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def main(argv=None):
+    args = parse_args(argv)
+    scenarios = [name.strip() for name in args.only.split(',') if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        sys.exit(f"unknown scenario(s): {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+    output = os.path.abspath(args.output)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    import discord
+    # The bot keeps its state files (audit log, checkpoints, ...) in the working directory
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='bot-bench-') as workdir:
+        os.chdir(workdir)
+        try:
+            results, api = asyncio.run(run_benchmarks(args, scenarios))
+        finally:
+            os.chdir(cwd)
+    report = {
+        'meta': {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'discord_py': discord.__version__,
+            'config': vars(args),
+            'rest_requests': api.requests,
+            'responses_429': api.responses_429,
+        },
+        'results': results,
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    for name, result in results.items():
+        print(f"{name:<22} p50 {result['p50_ms']:>10.3f}ms  p95 {result['p95_ms']:>10.3f}ms  "
+              f"REST/run {result.get('rest_requests_per_run', 0):>7}  429s {result.get('responses_429', 0)}")
+    print(f"results written to {output}")
+
+    if baseline is not None:
+        lines, regressions = compare(results, baseline, args.tolerance)
+        print("\n".join(lines))
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,346 @@
+# fake_discord.py - Synthetic guild and fake REST transport for the BrainAllianceFX Bot benchmarks
+# Builds real discord.py objects on the bot's connection state; REST calls are answered locally
+
+import asyncio
+import collections
+import datetime
+import hashlib
+import itertools
+import json
+import random
+import re
+
+import discord
+
+# =============================================================================
+# FAKE REST TRANSPORT
+# =============================================================================
+
+# Snowflake-sized IDs (18 digits) so ID parsing behaves as with real data
+FIRST_ID = 400000000000000000
+
+_SNOWFLAKE = re.compile(r"^\d{15,20}$")
+
+def route_template(method: str, path: str):
+    """Rate-limit bucket for a request: the major ID (guild/channel) is kept, other IDs are templated"""
+    parts = path.strip('/').split('/')
+    major_seen = False
+    for i, part in enumerate(parts):
+        if not _SNOWFLAKE.match(part):
+            continue
+        if not major_seen and i > 0 and parts[i - 1] in ('guilds', 'channels', 'webhooks'):
+            major_seen = True
+            continue
+        parts[i] = '{id}'
+    return f"{method} /{'/'.join(parts)}"
+
+class FakeResponse:
+    """The parts of aiohttp.ClientResponse that discord.py's HTTPClient reads"""
+
+    def __init__(self, status: int, body=None, headers=None):
+        self.status = status
+        self.reason = {200: 'OK', 204: 'No Content', 429: 'Too Many Requests'}.get(status, 'Error')
+        self.headers = dict(headers or {})
+        self._text = '' if body is None else json.dumps(body)
+        if body is not None:
+            self.headers['content-type'] = 'application/json'
+
+    async def text(self, encoding=None):
+        return self._text
+
+class _FakeRequest:
+    def __init__(self, api, method, url, kwargs):
+        self._call = api.handle(method, url, kwargs)
+
+    async def __aenter__(self):
+        return await self._call
+
+    async def __aexit__(self, *exc):
+        return False
+
+class _Bucket:
+    def __init__(self):
+        self.remaining = 0
+        self.reset_at = 0.0
+
+class FakeDiscordAPI:
+    """Stands in for the aiohttp session of discord.py's HTTPClient.
+
+    Every request waits `latency` seconds (+/- `jitter`), then is counted
+    against a per-route bucket of `bucket_limit` requests per
+    `bucket_window` seconds. Responses carry the X-RateLimit-* headers, so
+    discord.py's own limiter queues requests as it would against Discord;
+    a request over the limit, or a random `unexpected_429` fraction of
+    requests (shared/sub-limits), gets a 429 with retry_after.
+    """
+
+    def __init__(self, latency=0.02, jitter=0.2, bucket_limit=50, bucket_window=1.0, unexpected_429=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.bucket_limit = bucket_limit
+        self.bucket_window = bucket_window
+        self.unexpected_429 = unexpected_429
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.responses_429 = 0
+        self.by_route = collections.Counter()
+        self.closed = False
+        self.bot_user = None
+        self.state = None
+        self._buckets = collections.defaultdict(_Bucket)
+        self._ids = itertools.count(FIRST_ID + 10_000_000)
+
+    def install(self, bot: discord.Client, bot_user: dict):
+        """Route the bot's REST requests to this fake (call from the running loop)"""
+        self.bot_user = bot_user
+        self.state = bot._connection
+        http = bot.http
+        http._HTTPClient__session = self
+        # Normally created by HTTPClient.static_login()
+        http._global_over = asyncio.Event()
+        http._global_over.set()
+
+    # --- aiohttp.ClientSession interface ---
+
+    def request(self, method, url, **kwargs):
+        return _FakeRequest(self, method, url, kwargs)
+
+    async def close(self):
+        self.closed = True
+
+    # --- Request handling ---
+
+    async def handle(self, method: str, url: str, kwargs):
+        await asyncio.sleep(self.latency * self.random.uniform(1 - self.jitter, 1 + self.jitter))
+        path = url.split('/api/v10', 1)[-1].split('?', 1)[0]
+        route = route_template(method, path)
+        self.requests += 1
+        self.by_route[route] += 1
+
+        now = asyncio.get_running_loop().time()
+        bucket = self._buckets[route]
+        if now >= bucket.reset_at:
+            bucket.remaining = self.bucket_limit
+            bucket.reset_at = now + self.bucket_window
+        bucket_hash = hashlib.md5(route.encode()).hexdigest()[:16]
+        if bucket.remaining <= 0 or self.random.random() < self.unexpected_429:
+            self.responses_429 += 1
+            retry_after = max(bucket.reset_at - now, 0.05) if bucket.remaining <= 0 else 0.05
+            return FakeResponse(429, {'message': 'You are being rate limited.', 'retry_after': retry_after, 'global': False},
+                                {'Via': '1.1 google', 'X-Ratelimit-Bucket': bucket_hash})
+        bucket.remaining -= 1
+
+        headers = {
+            'X-Ratelimit-Bucket': bucket_hash,
+            'X-Ratelimit-Limit': str(self.bucket_limit),
+            'X-Ratelimit-Remaining': str(bucket.remaining),
+            'X-Ratelimit-Reset-After': f"{bucket.reset_at - now:.3f}",
+        }
+        payload = kwargs.get('data')
+        payload = json.loads(payload) if isinstance(payload, str) else {}
+        body = self.respond(method, path, payload)
+        return FakeResponse(200 if body is not None else 204, body, headers)
+
+    def respond(self, method: str, path: str, payload: dict):
+        """JSON body for a request, or None for 204 No Content"""
+        parts = path.strip('/').split('/')
+        if method == 'POST' and parts[0] == 'guilds' and parts[2:] == ['channels']:
+            return {
+                'id': str(next(self._ids)),
+                'type': payload.get('type', 0),
+                'name': payload.get('name', 'channel'),
+                'guild_id': parts[1],
+                'position': payload.get('position', 0),
+                'permission_overwrites': payload.get('permission_overwrites', []),
+                'parent_id': payload.get('parent_id'),
+                'topic': payload.get('topic'),
+                'nsfw': False,
+                'rate_limit_per_user': 0,
+            }
+        if parts[0] == 'channels' and parts[2:3] == ['messages'] and method in ('POST', 'PATCH'):
+            message_id = parts[3] if method == 'PATCH' else str(next(self._ids))
+            return message_payload(message_id, parts[1], self.bot_user, payload.get('content') or '', payload.get('embeds') or [])
+        if method == 'PATCH' and parts[0] == 'guilds' and parts[2:3] == ['members'] and len(parts) == 4:
+            guild = self.state._get_guild(int(parts[1]))
+            member = guild.get_member(int(parts[3])) if guild else None
+            return member_payload(member) if member else None
+        if method == 'GET' and parts[0] == 'users' and len(parts) == 2:
+            return user_payload(int(parts[1]), f"user{parts[1][-6:]}")
+        return None
+
+# =============================================================================
+# PAYLOADS
+# =============================================================================
+
+def user_payload(user_id: int, name: str, bot: bool = False):
+    return {'id': str(user_id), 'username': name, 'global_name': None, 'discriminator': '0', 'avatar': None, 'bot': bot}
+
+def member_payload(member: discord.Member):
+    return {
+        'user': user_payload(member.id, member.name, bot=member.bot),
+        'roles': [str(role_id) for role_id in member._roles],
+        'joined_at': member.joined_at.isoformat() if member.joined_at else None,
+        'nick': member.nick, 'deaf': False, 'mute': False, 'flags': 0,
+    }
+
+def message_payload(message_id, channel_id, author: dict, content: str = '', embeds=()):
+    return {
+        'id': str(message_id),
+        'channel_id': str(channel_id),
+        'author': author,
+        'content': content,
+        'embeds': list(embeds),
+        'attachments': [],
+        'mentions': [],
+        'mention_roles': [],
+        'mention_everyone': False,
+        'tts': False,
+        'pinned': False,
+        'type': 0,
+        'timestamp': discord.utils.utcnow().isoformat(),
+        'edited_timestamp': None,
+    }
+
+def role_payload(role_id: int, name: str, position: int, permissions: int = 0):
+    return {'id': str(role_id), 'name': name, 'color': 0, 'hoist': False, 'position': position,
+            'permissions': str(permissions), 'managed': False, 'mentionable': False}
+
+def channel_payload(channel_id: int, channel_type: int, name: str, position: int, parent_id=None):
+    return {'id': str(channel_id), 'type': channel_type, 'name': name, 'position': position,
+            'permission_overwrites': [], 'parent_id': str(parent_id) if parent_id else None,
+            'bitrate': 64000, 'user_limit': 0, 'rtc_region': None, 'nsfw': False, 'rate_limit_per_user': 0}
+
+# =============================================================================
+# SYNTHETIC GUILD
+# =============================================================================
+
+_SYLLABLES = ['al', 'bra', 'cor', 'dan', 'el', 'fi', 'gio', 'ka', 'lu', 'mar', 'no', 'pi', 'ro', 'sa', 'ti', 'vo', 'xen', 'zu']
+
+def _name(rng: random.Random):
+    word = ''.join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+    return word + (str(rng.randint(1, 999)) if rng.random() < 0.4 else '')
+
+class SyntheticGuild:
+    """A guild on the bot's connection state with generated members, roles and voice channels.
+
+    Members get `roles_per_member` random roles; `fixed_roles` are
+    (role_id, name, member_count) roles given to that many members, and
+    `categories` are (channel_id, name) category channels, so code that
+    looks up configured IDs finds them.
+    """
+
+    def __init__(self, state, members=1000, roles=50, voice_channels=20, voice_members=200, text_channels=5,
+                 roles_per_member=3, fixed_roles=(), categories=(), seed=0):
+        rng = random.Random(seed)
+        ids = itertools.count(FIRST_ID)
+        self.guild_id = next(ids)
+        self.bot_id = state.self_id
+
+        self.role_ids = []
+        payload_roles = [role_payload(self.guild_id, '@everyone', 0)]
+        admin_role = next(ids)
+        payload_roles.append(role_payload(admin_role, 'Bot', roles + len(fixed_roles) + 1, permissions=8))
+        for position in range(1, roles + 1):
+            role_id = next(ids)
+            self.role_ids.append(role_id)
+            payload_roles.append(role_payload(role_id, f"{_name(rng)}-{position}", position))
+        for offset, (role_id, name, _) in enumerate(fixed_roles):
+            payload_roles.append(role_payload(role_id, name, roles + offset + 1))
+
+        channels = []
+        for channel_id, name in categories:
+            channels.append(channel_payload(channel_id, 4, name, len(channels)))
+        self.text_channel_ids = []
+        for _ in range(max(1, text_channels)):
+            channel_id = next(ids)
+            self.text_channel_ids.append(channel_id)
+            channels.append(channel_payload(channel_id, 0, _name(rng), len(channels)))
+        self.voice_channel_ids = []
+        for _ in range(voice_channels):
+            channel_id = next(ids)
+            self.voice_channel_ids.append(channel_id)
+            channels.append(channel_payload(channel_id, 2, f"{_name(rng)} voice", len(channels)))
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self.member_ids = []
+        payload_members = [{'user': user_payload(self.bot_id, 'bot', bot=True), 'roles': [str(admin_role)],
+                            'joined_at': now.isoformat(), 'deaf': False, 'mute': False, 'nick': None, 'flags': 0}]
+        for _ in range(members):
+            member_id = next(ids)
+            self.member_ids.append(member_id)
+            member_roles = rng.sample(self.role_ids, min(roles_per_member, len(self.role_ids)))
+            payload_members.append({
+                'user': user_payload(member_id, _name(rng), bot=rng.random() < 0.02),
+                'roles': [str(role_id) for role_id in member_roles],
+                'joined_at': (now - datetime.timedelta(days=rng.uniform(0, 1000))).isoformat(),
+                'nick': _name(rng) if rng.random() < 0.2 else None,
+                'deaf': False, 'mute': False, 'flags': 0,
+            })
+        for role_id, _, count in fixed_roles:
+            for entry in rng.sample(payload_members[1:], min(count, members)):
+                entry['roles'].append(str(role_id))
+
+        voice_states = []
+        if self.voice_channel_ids:
+            for member_id in rng.sample(self.member_ids, min(voice_members, members)):
+                voice_states.append({
+                    'user_id': str(member_id), 'channel_id': str(rng.choice(self.voice_channel_ids)), 'session_id': 'x',
+                    'deaf': False, 'mute': False, 'self_deaf': False, 'self_mute': False, 'self_video': False,
+                    'suppress': False, 'request_to_speak_timestamp': None,
+                })
+
+        self.guild = state._add_guild_from_data({
+            'id': str(self.guild_id),
+            'name': 'Benchmark Guild',
+            'owner_id': str(self.bot_id),
+            'member_count': members + 1,
+            'roles': payload_roles,
+            'channels': channels,
+            'members': payload_members,
+            'voice_states': voice_states,
+            'emojis': [],
+            'stickers': [],
+            'features': [],
+            'large': members > 250,
+        })
+        self.rng = rng
+
+def install_bot_user(bot: discord.Client, user_id: int = FIRST_ID - 1):
+    """Give the bot's connection state a logged-in user; returns its payload"""
+    payload = dict(user_payload(user_id, 'bot', bot=True), verified=True, mfa_enabled=False, flags=0)
+    bot._connection.user = discord.ClientUser(state=bot._connection, data=payload)
+    return payload
+
+# =============================================================================
+# FAKE COMMAND CONTEXT
+# =============================================================================
+
+class FakeMessage:
+    """Invocation message: deleting it goes through the (fake) REST API"""
+
+    def __init__(self, channel, content: str):
+        self.channel = channel
+        self.content = content
+        self.attachments = []
+        self.id = FIRST_ID + 20_000_000
+
+    async def delete(self, *, delay=None):
+        await self.channel._state.http.delete_message(self.channel.id, self.id)
+
+class FakeContext:
+    """Enough of commands.Context to run a command callback and the global invoke hooks"""
+
+    def __init__(self, bot, command_name: str, guild: discord.Guild, author: discord.Member, channel, args: str = ''):
+        self.bot = bot
+        self.command = bot.get_command(command_name)
+        self.guild = guild
+        self.author = author
+        self.channel = channel
+        self.prefix = '.'
+        self.invoked_with = command_name
+        self.message = FakeMessage(channel, f".{command_name} {args}".strip())
+        self.interaction = None
+        self.command_failed = False
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
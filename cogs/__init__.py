@@ -0,0 +1,30 @@
+# cogs - Command extensions for the BrainAllianceFX Bot
+# Each extension is loaded on first use of one of its commands and can be swapped at runtime with .reload
+
+# Extension -> command names it registers (kept in sync with each module's COMMANDS)
+EXTENSION_COMMANDS = {
+    'cogs.voice': ('muteall', 'unmuteall', 'moveall', 'servermoveall', 'back', 'kickall', 'serverkickall'),
+    'cogs.admin': ('auth', 'deauth', 'nick', 'massban', 'audit', 'config', 'stats', 'ping', 'help', 'ca'),
+    'cogs.mentorship': ('setupwaiting', 'stopmentor', 'mentor', 'call'),
+    'cogs.roles': ('role',),
+    'cogs.presence': (
+        'setstatus', 'setactivity', 'setrotation', 'settype', 'setstreaming', 'setstreamtitle', 'setstreamurl',
+        'setservercount', 'setmembercount', 'setlargeimage', 'setlargetext', 'setsmallimage', 'setsmalltext',
+        'refreshpresence', 'resetpresence', 'presenceinfo', 'checkimages', 'presencehelp',
+    ),
+    # Slash front end: loaded at startup (SLASH_COMMANDS), listed here so .reload can swap it
+    'cogs.slash': (),
+}
+
+_COMMAND_EXTENSIONS = {name: extension for extension, names in EXTENSION_COMMANDS.items() for name in names}
+
+def extension_for(command_name):
+    """Extension that registers command_name, or None"""
+    return _COMMAND_EXTENSIONS.get(command_name)
+
+def extension_name(name):
+    """Full extension name for 'voice' or 'cogs.voice'; None if unknown"""
+    name = name.strip().lower()
+    if not name.startswith('cogs.'):
+        name = f'cogs.{name}'
+    return name if name in EXTENSION_COMMANDS else None
@@ -0,0 +1,574 @@
+# admin.py - Admin and moderation commands for the BrainAllianceFX Bot
+# Loaded as the cogs.admin extension on first use of one of its commands; hot-reloadable with .reload
+
+import discord
+from discord.ext import commands
+import time
+import datetime
+import asyncio
+import re
+
+from messages import get_error_message, get_success_message, HELP_EMBED
+from authorization import auth_store
+from audit_log import audit_log, AuditQuery
+from batch_executor import run_batch, ban_bucket, describe_error, ProgressReporter
+from metrics import loop_lag
+from instrumentation import instrumentation, LATENCY_SAMPLES
+from member_lookup import member_lookup
+from guild_config import guild_config, SETTINGS
+from command_helpers import log_command, log_to_discord, summarize_names, REPLY_LISTED_NAMES, fetch_member_by_query, resolve_role_by_query
+
+# Maximum records shown by .audit
+AUDIT_MAX_RESULTS = 25
+
+# Commands listed by .stats (most used first)
+STATS_MAX_COMMANDS = 15
+
+# Limits for .ca (messages inspected per clear)
+CA_DEFAULT_MESSAGES = 100
+CA_MAX_MESSAGES = 1000
+
+# Limits for .massban
+MASSBAN_MAX_IDS = 5000
+MASSBAN_MAX_FILE_BYTES = MASSBAN_MAX_IDS * 25  # an ID plus separators per line
+
+# User IDs and message links accepted by .massban
+USER_ID_PATTERN = re.compile(r"\d{15,20}")
+MESSAGE_LINK_PATTERN = re.compile(r"https?://(?:\w+\.)?discord(?:app)?\.com/channels/(?:\d+|@me)/(\d+)/(\d+)")
+
+# Prefix command: .auth USERID
+@commands.command(name="auth", description="Authorizes a user to use bot commands (restricted to bot owner)")
+async def auth(ctx, user_id: str):
+    # Restrict to your user ID
+    if ctx.author.id != 539464122027343873:
+        log_command(ctx.author, 'auth', 'failed | Reason: not bot owner')
+        await ctx.send(get_error_message("bot_owner_only"))
+        return
+
+    # Validate user_id
+    try:
+        user_id = int(user_id)
+    except ValueError:
+        log_command(ctx.author, 'auth', 'failed | Reason: invalid user id')
+        await ctx.send(get_error_message("invalid_user_id"))
+        return
+
+    # Fetch the user to get their username
+    try:
+        user = await ctx.bot.fetch_user(user_id)
+        username = user.name
+    except discord.NotFound:
+        log_command(ctx.author, 'auth', f"failed | User not found: {user_id}")
+        await ctx.send(get_error_message("user_not_found_global", user_id=user_id))
+        return
+    except discord.HTTPException as e:
+        log_command(ctx.author, 'auth', f"failed | HTTP error while fetching user {user_id}: {e}")
+        await ctx.send(get_error_message("fetch_error", type="user", error=e))
+        return
+
+    # Check if user is already authorized
+    await auth_store.ensure_loaded()
+    if auth_store.is_authorized(user_id):
+        log_command(ctx.author, 'auth', f"failed | User already authorized: {username} ({user_id})")
+        await ctx.send(get_error_message("user_already_authorized", username=username, user_id=user_id))
+        return
+
+    # Add user to authorized list (written through to disk)
+    await auth_store.add(user_id, username)
+    await ctx.send(get_success_message("user_authorized", username=username, user_id=user_id))
+    log_command(ctx.author, 'auth', f"success | Authorized {username} ({user_id})")
+    await log_to_discord(ctx.bot, ctx.author, 'auth', args=[user_id], details=f"Authorized {username} ({user_id})")
+
+# Prefix command: .deauth USERID
+@commands.command(name="deauth", description="Removes a user's authorization to use bot commands (restricted to bot owner)")
+async def deauth(ctx, user_id: str):
+    # Restrict to your user ID
+    if ctx.author.id != 539464122027343873:
+        log_command(ctx.author, 'deauth', 'failed | Reason: not bot owner')
+        await ctx.send(get_error_message("bot_owner_only"))
+        return
+
+    # Prevent deauthorizing the bot owner
+    if user_id == '539464122027343873':
+        log_command(ctx.author, 'deauth', 'failed | Reason: cannot deauth owner')
+        await ctx.send(get_error_message("cannot_deauth_owner"))
+        return
+
+    # Validate user_id
+    try:
+        user_id = int(user_id)
+    except ValueError:
+        log_command(ctx.author, 'deauth', 'failed | Reason: invalid user id')
+        await ctx.send(get_error_message("invalid_user_id"))
+        return
+
+    # Check if user is authorized
+    await auth_store.ensure_loaded()
+    if not auth_store.is_authorized(user_id):
+        log_command(ctx.author, 'deauth', f"failed | User not authorized: {user_id}")
+        await ctx.send(get_error_message("user_not_authorized", user_id=user_id))
+        return
+
+    # Fetch the user to confirm their username
+    try:
+        user = await ctx.bot.fetch_user(user_id)
+        username = user.name
+    except discord.NotFound:
+        username = auth_store.get_name(user_id, "Unknown User")
+    except discord.HTTPException as e:
+        log_command(ctx.author, 'deauth', f"failed | HTTP error while fetching user {user_id}: {e}")
+        await ctx.send(get_error_message("fetch_error", type="user", error=e))
+        return
+
+    # Remove user from authorized list (written through to disk)
+    await auth_store.remove(user_id)
+    await ctx.send(get_success_message("user_deauthorized", username=username, user_id=user_id))
+    log_command(ctx.author, 'deauth', f"success | Deauthorized {username} ({user_id})")
+    await log_to_discord(ctx.bot, ctx.author, 'deauth', args=[user_id], details=f"Deauthorized {username} ({user_id})")
+
+# Prefix command: .nick <USER> <NEW_NICK>
+@commands.command(name="nick", description="Change a member's server nickname by mention/ID/fuzzy name")
+async def nick(ctx, current_name: str, *, new_nick: str = None):
+    # Resolve member by mention, ID, or fuzzy name
+    try:
+        member = await fetch_member_by_query(ctx.guild, current_name)
+    except ValueError as ve:
+        if str(ve) in ("no_members", "empty_query", "not_found"):
+            await ctx.send(get_error_message("member_not_found_query", query=current_name))
+        else:
+            await ctx.send(get_error_message("member_not_found_query", query=current_name))
+        log_command(ctx.author, 'nick', f"failed | Member not found from query: {current_name}")
+        return
+
+    # Prevent changing own nick via this command to reduce accidents
+    if member.id == ctx.author.id:
+        log_command(ctx.author, 'nick', 'failed | Attempted to change own nickname')
+        await ctx.send(get_error_message("cannot_change_own_nick"))
+        return
+
+    # Interpret missing second arg or '-' as clear/remove nickname
+    if new_nick is None:
+        desired_nick = None
+    else:
+        desired_nick = None if new_nick.strip() == '-' else new_nick.strip()
+    if desired_nick is not None and len(desired_nick) == 0:
+        await ctx.send(get_error_message("invalid_nickname"))
+        return
+
+    try:
+        await member.edit(nick=desired_nick)
+        if desired_nick is None:
+            await ctx.send(get_success_message("nickname_cleared", member_name=member.display_name, member_id=member.id))
+            log_command(ctx.author, 'nick', f"success | Cleared nickname for {member.name} ({member.id})", targets=[member.id])
+            await log_to_discord(ctx.bot, ctx.author, 'nick', args=[current_name, '-'], details=f"Cleared nickname for {member.name} ({member.id})")
+        else:
+            await ctx.send(get_success_message("nickname_changed", member_name=member.display_name, member_id=member.id, new_nick=desired_nick))
+            log_command(ctx.author, 'nick', f"success | Changed nickname for {member.name} ({member.id}) to '{desired_nick}'", targets=[member.id])
+            await log_to_discord(ctx.bot, ctx.author, 'nick', args=[current_name, desired_nick], details=f"Changed nickname for {member.name} ({member.id}) to '{desired_nick}'")
+    except discord.Forbidden:
+        log_command(ctx.author, 'nick', f"failed | Missing permissions to change nick for {member.name}")
+        await ctx.send(get_error_message("missing_permissions", action="change nickname for", member_name=member.display_name))
+    except discord.HTTPException as e:
+        log_command(ctx.author, 'nick', f"failed | HTTP error while changing nick for {member.name}: {e}")
+        await ctx.send(get_error_message("http_error", action="changing nickname for", member_name=member.display_name, error=e))
+
+# Prefix command: .massban USERID USERID USERID...
+# --- .massban input helpers ---
+async def collect_massban_ids(ctx, args):
+    """User IDs from arguments, attached files and linked messages, de-duplicated in order.
+
+    Returns (user_ids, invalid) where invalid lists unusable inputs.
+    """
+    texts = []
+    invalid = []
+    attachments = list(ctx.message.attachments)
+    for arg in args:
+        link = MESSAGE_LINK_PATTERN.fullmatch(arg.strip('<>'))
+        if link:
+            channel = ctx.bot.get_channel(int(link.group(2)))
+            try:
+                message = await channel.fetch_message(int(link.group(3)))
+            except (AttributeError, discord.HTTPException):
+                invalid.append(f"{arg} (message not found)")
+                continue
+            texts.append(message.content)
+            attachments.extend(message.attachments)
+            continue
+        for token in filter(None, re.split(r"[,;]+", arg)):
+            if USER_ID_PATTERN.fullmatch(token):
+                texts.append(token)
+            else:
+                invalid.append(f"{token} (invalid ID)")
+    for attachment in attachments:
+        # Skip files that cannot hold a valid list before downloading them
+        if attachment.size > MASSBAN_MAX_FILE_BYTES:
+            invalid.append(f"{attachment.filename} (file too large)")
+            continue
+        try:
+            texts.append((await attachment.read()).decode('utf-8', errors='ignore'))
+        except discord.HTTPException:
+            invalid.append(f"{attachment.filename} (could not read)")
+    user_ids = list(dict.fromkeys(int(match) for text in texts for match in USER_ID_PATTERN.findall(text)))
+    return user_ids, invalid
+
+@commands.command(name="massban", description="Bans multiple users from the server by their user IDs", extras={'keep_invocation': True})
+async def massban(ctx, *user_ids):
+    # Read attached ID lists before the invocation message (and its files) is deleted
+    ids, failed_users = await collect_massban_ids(ctx, user_ids)
+    # A slash command's message is synthetic: there is nothing to delete
+    if ctx.interaction is None:
+        try:
+            await ctx.message.delete()
+        except discord.HTTPException:
+            pass
+
+    if not ids and not failed_users:
+        log_command(ctx.author, 'massban', 'failed | Reason: no user IDs provided')
+        await ctx.send(get_error_message("no_user_ids_provided"))
+        return
+    if len(ids) > MASSBAN_MAX_IDS:
+        log_command(ctx.author, 'massban', f"failed | Too many user IDs: {len(ids)}")
+        await ctx.send(get_error_message("massban_too_many", count=len(ids), max_count=MASSBAN_MAX_IDS))
+        return
+    for entry in failed_users:
+        log_command(ctx.author, 'massban', f"failed | Invalid input: {entry}")
+
+    # Names come from the member cache; only users outside the server need a fetch
+    cached = await member_lookup.fetch_many(ctx.guild, ids)
+    await guild_config.ensure_loaded()
+    protected = guild_config.get(ctx.guild.id, 'protected_users', {})
+    targets = []
+    missing = []
+    for user_id in ids:
+        member = cached[user_id]
+        if member is None:
+            missing.append(user_id)
+        elif member.id == ctx.author.id:
+            log_command(ctx.author, 'massban', f"failed | Cannot ban self: {member.name} ({user_id})")
+            failed_users.append(f"{member.name} ({user_id}) - cannot ban self")
+        elif member.id == 539464122027343873:
+            log_command(ctx.author, 'massban', f"failed | Cannot ban bot owner: {member.name} ({user_id})")
+            failed_users.append(f"{member.name} ({user_id}) - cannot ban bot owner")
+        elif str(member.id) in protected:
+            log_command(ctx.author, 'massban', f"failed | Cannot ban protected user: {member.name} ({user_id})")
+            failed_users.append(f"{member.name} ({user_id}) - protected user")
+        else:
+            targets.append(member)
+
+    # Fetch names (concurrently) only for the users that will be listed in the reply
+    fetched = {}
+    async def _fetch_name(user_id):
+        fetched[user_id] = (await ctx.bot.fetch_user(user_id)).name
+    await run_batch(missing[:REPLY_LISTED_NAMES], _fetch_name, ('user_fetch',))
+    for user_id in missing:
+        username = fetched.get(user_id)
+        log_command(ctx.author, 'massban', f"failed | User {username or user_id} ({user_id}) not in server", targets=[user_id])
+        failed_users.append(f"{username} ({user_id}) - not in server" if username else f"{user_id} (not in server)")
+
+    reporter = ProgressReporter(ctx, "Ban")
+    ban_reason = f"Mass ban by {ctx.author.name} ({ctx.author.id})"
+    result = await run_batch(targets, lambda member: member.ban(reason=ban_reason), ban_bucket(ctx.guild), on_progress=reporter)
+    await reporter.finish()
+
+    banned_names = [f"{member.name} ({member.id})" for member in result.succeeded]
+    for member in result.succeeded:
+        log_command(ctx.author, 'massban', f"success | Banned {member.name} ({member.id})", targets=[member.id])
+    for member, error in result.failed:
+        reason = describe_error(error) if error else "not banned"
+        log_command(ctx.author, 'massban', f"failed | Could not ban {member.name} ({member.id}): {error or reason}", targets=[member.id])
+        failed_users.append(f"{member.name} ({member.id}) - {reason}")
+    banned_count = len(banned_names)
+    failed_count = len(failed_users)
+
+    # Send result message
+    if banned_count > 0 and failed_count == 0:
+        await ctx.send(get_success_message("massban_success", count=banned_count, usernames=summarize_names(banned_names)))
+    elif banned_count > 0 and failed_count > 0:
+        await ctx.send(get_success_message("massban_partial", 
+                                         banned_count=banned_count, 
+                                         failed_count=failed_count,
+                                         banned_names=summarize_names(banned_names),
+                                         failed_names=summarize_names(failed_users)))
+    else:
+        await ctx.send(get_error_message("massban_failed", failed_count=failed_count, failed_names=summarize_names(failed_users)))
+    
+    details = f"Banned: {banned_count} | Failed: {failed_count} | Banned: {summarize_names(banned_names) if banned_names else 'none'} | Failed: {summarize_names(failed_users) if failed_users else 'none'}"
+    # Resolved IDs, also for IDs that came from an attached file
+    log_command(ctx.author, 'massban', details, targets=[member.id for member in result.succeeded])
+    await log_to_discord(ctx.bot, ctx.author, 'massban', args=list(user_ids), details=details)
+
+# Prefix command: .audit [FILTERS]
+@commands.command(name="audit", description="Query the local audit log (user:, cmd:, outcome:, since:, limit:)")
+async def audit(ctx, *filters: str):
+    query = AuditQuery(guild_id=ctx.guild.id if ctx.guild else None)
+    for token in filters:
+        key, _, value = token.partition(':')
+        key = key.lower()
+        if not value:
+            await ctx.send(get_error_message("audit_invalid_filter", filter=token))
+            return
+        if key == 'user':
+            try:
+                query.user_id = (await fetch_member_by_query(ctx.guild, value)).id
+            except ValueError:
+                if not value.isdigit():
+                    await ctx.send(get_error_message("member_not_found_query", query=value))
+                    return
+                query.user_id = int(value)  # Members who left can still be queried by ID
+        elif key == 'cmd':
+            query.command = value.lower().lstrip('.')
+        elif key == 'outcome':
+            query.outcome = value.lower()
+        elif key == 'since' and re.fullmatch(r"\d+[mhd]", value.lower()):
+            seconds = int(value[:-1]) * {'m': 60, 'h': 3600, 'd': 86400}[value[-1].lower()]
+            query.since = time.time() - seconds
+        elif key == 'limit' and value.isdigit():
+            query.limit = max(1, min(int(value), AUDIT_MAX_RESULTS))
+        else:
+            await ctx.send(get_error_message("audit_invalid_filter", filter=token))
+            return
+
+    records = await audit_log.query(query)
+    if not records:
+        await ctx.send(get_error_message("audit_no_results"))
+        return
+
+    embed = discord.Embed(title="📜 Audit Log", color=0x5865F2, timestamp=discord.utils.utcnow())
+    lines = []
+    for record in records:
+        duration = f" • {record['duration_ms']:.0f}ms" if record.get('duration_ms') is not None else ""
+        line = f"<t:{int(record['ts'])}:R> `.{record['command']}` by <@{record['author_id']}> • **{record['outcome']}**{duration}\n{record['details'][:120]}"
+        if sum(len(existing) + 1 for existing in lines) + len(line) > 4000:
+            break
+        lines.append(line)
+    embed.description = "\n".join(lines)
+    embed.set_footer(text=f"{len(lines)} record(s)")
+    await ctx.send(embed=embed)
+    log_command(ctx.author, 'audit', f"success | {len(lines)} record(s) for {' '.join(filters) or 'no filters'}")
+
+# Prefix command: .config [set KEY VALUE | unset KEY]
+def format_config_value(kind, value):
+    """Display form of a stored setting"""
+    if kind == 'role':
+        return f"<@&{value}>"
+    if kind == 'category':
+        return f"<#{value}>"
+    if kind == 'user':
+        return f"<@{value}>"
+    if kind == 'users':
+        return ", ".join(f"<@{user_id}>" for user_id in value) or "none"
+    return str(value)
+
+async def parse_config_value(guild: discord.Guild, kind, value: str):
+    """Stored form of a .config value; raises ValueError if it cannot be resolved"""
+    if kind == 'role':
+        return resolve_role_by_query(guild, value).id
+    if kind == 'category':
+        query = value.strip().lower()
+        for category in guild.categories:
+            if str(category.id) == query or category.name.lower() == query:
+                return category.id
+        raise ValueError("not_found")
+    if kind == 'user':
+        return (await fetch_member_by_query(guild, value)).id
+    if kind == 'users':
+        tokens = value.split(',') if ',' in value else value.split()
+        members = [await fetch_member_by_query(guild, token) for token in tokens if token.strip()]
+        if not members:
+            raise ValueError("empty_query")
+        return {str(member.id): member.display_name for member in members}
+    return value.strip()
+
+@commands.command(name="config", description="Show or change this server's settings (roles, channels and users used by the commands)")
+async def config(ctx, action: str = None, key: str = None, *, value: str = None):
+    await guild_config.ensure_loaded()
+    if action is None:
+        settings = guild_config.settings(ctx.guild.id)
+        embed = discord.Embed(title=f"⚙️ Configuration • {ctx.guild.name}", color=0x5865F2)
+        for name, (kind, description) in SETTINGS.items():
+            shown = format_config_value(kind, settings[name]) if name in settings else "*not set*"
+            embed.add_field(name=name, value=f"{shown}\n{description}"[:1024], inline=False)
+        await ctx.send(embed=embed)
+        log_command(ctx.author, 'config', f"success | Showed {len(settings)} setting(s)")
+        return
+
+    action = action.lower()
+    key = (key or '').lower()
+    if action not in ('set', 'unset') or key not in SETTINGS or (action == 'set' and not value):
+        await ctx.send(get_error_message("config_usage", keys=", ".join(SETTINGS)))
+        return
+
+    if action == 'unset':
+        await guild_config.unset(ctx.guild.id, key)
+        await ctx.send(get_success_message("config_unset", setting=key))
+        log_command(ctx.author, 'config', f"success | Cleared {key}")
+        await log_to_discord(ctx.bot, ctx.author, 'config', args=[action, key], details=f"Cleared {key}")
+        return
+
+    kind = SETTINGS[key][0]
+    try:
+        parsed = await parse_config_value(ctx.guild, kind, value)
+    except ValueError:
+        log_command(ctx.author, 'config', f"failed | Invalid {kind} for {key}: {value}")
+        await ctx.send(get_error_message("config_invalid_value", setting=key, kind=kind, value=value))
+        return
+    await guild_config.set(ctx.guild.id, key, parsed)
+    shown = format_config_value(kind, parsed)
+    await ctx.send(get_success_message("config_set", setting=key, value=shown))
+    log_command(ctx.author, 'config', f"success | Set {key} to {parsed}")
+    await log_to_discord(ctx.bot, ctx.author, 'config', args=[action, key, value], details=f"Set {key} to {shown}")
+
+# Prefix command: .stats
+@commands.command(name="stats", description="Show command latency percentiles, REST usage and event-loop lag")
+async def stats(ctx):
+    commands_by_count = sorted(instrumentation.commands.items(), key=lambda item: item[1].count, reverse=True)
+    embed = discord.Embed(title="⏱️ Command Stats", color=0x5865F2, timestamp=discord.utils.utcnow())
+    lines = []
+    for name, command in commands_by_count[:STATS_MAX_COMMANDS]:
+        p = command.percentiles()
+        lines.append(
+            f"`.{name}` ×{command.count} • p50 {p[50] * 1000:.0f}ms • p95 {p[95] * 1000:.0f}ms • p99 {p[99] * 1000:.0f}ms\n"
+            f"↳ {command.api_calls / command.count:.1f} API calls • {command.api_time / command.count * 1000:.0f}ms in REST, {command.ratelimit_wait / command.count * 1000:.0f}ms of it rate-limited • {command.errors} error(s)"
+        )
+    embed.description = "\n".join(lines) or get_success_message("stats_empty")
+    embed.add_field(
+        name="🔁 Event Loop",
+        value=f"**Lag:** {loop_lag.lag * 1000:.1f}ms\n**Max (1 min):** {loop_lag.max_lag * 1000:.1f}ms\n**Gateway:** {round(ctx.bot.latency * 1000)}ms",
+        inline=True
+    )
+    embed.add_field(name="🌐 REST", value=f"**Requests:** {instrumentation.rest_calls}", inline=True)
+    embed.set_footer(text=f"Percentiles over the last {LATENCY_SAMPLES} invocations per command")
+    await ctx.send(embed=embed)
+    log_command(ctx.author, 'stats', f"success | {len(lines)} command(s)")
+
+# Prefix command: .ping
+@commands.command(name="ping", description="Shows bot latency and responds with Pong!")
+async def ping(ctx):
+    # Calculate latency in milliseconds
+    latency_ms = round(ctx.bot.latency * 1000)
+    
+    await ctx.send(f"Pong! 🏓 {latency_ms}ms")
+    log_command(ctx.author, 'ping', f"success | Latency: {latency_ms}ms")
+    await log_to_discord(ctx.bot, ctx.author, 'ping', details=f"Latency: {latency_ms}ms")
+
+# Prefix command: .help (UPDATED)
+@commands.command(name="help", description="Shows all available commands and their usage")
+async def help_command(ctx):
+    help_embed = discord.Embed(
+        title=HELP_EMBED["title"],
+        description=HELP_EMBED["description"],
+        color=HELP_EMBED["color"]
+    )
+    
+    # Add all fields from the HELP_EMBED configuration
+    for field in HELP_EMBED["fields"]:
+        help_embed.add_field(
+            name=field["name"],
+            value=field["value"],
+            inline=field["inline"]
+        )
+    
+    help_embed.set_footer(text=HELP_EMBED["footer"])
+    
+    await ctx.send(embed=help_embed)
+    log_command(ctx.author, 'help', 'success | Help embed sent')
+    await log_to_discord(ctx.bot, ctx.author, 'help', details="Help embed sent")
+
+# Prefix command: .ca [COUNT] [FILTERS] (clear messages with bulk delete and send KABOOM)
+@commands.command(name="ca", description="Clears recent messages (default 100, optional user/bot/contains filters) and sends a KABOOM message")
+async def ca(ctx, *filters: str):
+    # Parse optional count and filters
+    limit = CA_DEFAULT_MESSAGES
+    checks = []
+    for token in filters:
+        lowered = token.lower()
+        if token.isdigit() and 1 <= int(token) <= CA_MAX_MESSAGES:
+            limit = int(token)
+        elif lowered in ("bot", "bots"):
+            checks.append(lambda message: message.author.bot)
+        elif lowered.startswith("user:") and len(token) > 5:
+            try:
+                target = await fetch_member_by_query(ctx.guild, token[5:])
+            except ValueError:
+                await ctx.send(get_error_message("member_not_found_query", query=token[5:]))
+                return
+            checks.append(lambda message, target_id=target.id: message.author.id == target_id)
+        elif lowered.startswith("contains:") and len(token) > 9:
+            checks.append(lambda message, text=lowered[9:]: text in message.content.lower())
+        else:
+            log_command(ctx.author, 'ca', f'failed | Invalid filter: {token}')
+            await ctx.send(get_error_message("ca_invalid_filter", filter=token, max=CA_MAX_MESSAGES))
+            return
+
+    try:
+        # Get the last messages before the command (its own is deleted in the background) that match every filter
+        messages = []
+        async for message in ctx.channel.history(limit=limit, before=ctx.message):
+            if all(check(message) for check in checks):
+                messages.append(message)
+
+        if not messages:
+            log_command(ctx.author, 'ca', 'failed | No messages to delete')
+            await ctx.send(get_error_message("no_messages_to_clear"))
+            return
+
+        # Bulk delete only accepts messages younger than 14 days; older ones go one by one
+        bulk_cutoff = discord.utils.time_snowflake(discord.utils.utcnow() - datetime.timedelta(days=14))
+        recent = [message for message in messages if message.id > bulk_cutoff]
+        old = [message for message in messages if message.id <= bulk_cutoff]
+
+        deleted_count = 0
+        progress = ProgressReporter(ctx, "Clearing")
+        for start in range(0, len(recent), 100):
+            chunk = recent[start:start + 100]
+            try:
+                await ctx.channel.delete_messages(chunk, reason=f"Clear by {ctx.author} ({ctx.author.id})")
+                deleted_count += len(chunk)
+            except discord.Forbidden:
+                raise
+            except discord.HTTPException as e:
+                log_command(ctx.author, 'ca', f'failed | HTTP error while bulk deleting {len(chunk)} messages: {e}')
+            progress(deleted_count, len(messages))
+
+        if old:
+            result = await run_batch(
+                old,
+                lambda message: message.delete(),
+                ('channel_message_delete', ctx.channel.id),
+                on_progress=lambda done, total: progress(deleted_count + done, len(messages)),
+            )
+            deleted_count += len(result.succeeded)
+            for message, error in result.failed:
+                log_command(ctx.author, 'ca', f'failed | Could not delete message {message.id}: {error}')
+        await progress.finish()
+
+        # Send KABOOM message
+        kaboom_msg = await ctx.send(get_success_message("kaboom_message"))
+
+        # Delete the KABOOM message after 3 seconds
+        await asyncio.sleep(3)
+        try:
+            await kaboom_msg.delete()
+        except (discord.Forbidden, discord.HTTPException):
+            # If we can't delete the KABOOM message, just log it
+            log_command(ctx.author, 'ca', 'warning | Could not delete KABOOM message')
+
+        log_command(ctx.author, 'ca', f'success | Deleted {deleted_count} messages')
+        await log_to_discord(ctx.bot, ctx.author, 'ca', args=list(filters), details=f"Deleted {deleted_count} messages from #{ctx.channel.name}")
+
+    except discord.Forbidden:
+        log_command(ctx.author, 'ca', 'failed | Missing permissions to manage messages')
+        await ctx.send(get_error_message("missing_permissions", action="manage messages", member_name=""))
+    except discord.HTTPException as e:
+        log_command(ctx.author, 'ca', f'failed | HTTP error: {e}')
+        await ctx.send(get_error_message("http_error", action="clearing messages", member_name="", error=e))
+
+# =============================================================================
+# EXTENSION SETUP
+# =============================================================================
+
+COMMANDS = (auth, deauth, nick, massban, audit, config, stats, ping, help_command, ca,)
+
+async def setup(bot):
+    for command in COMMANDS:
+        bot.add_command(command)
@@ -0,0 +1,300 @@
+# mentorship.py - Mentorship and Waiting Setup commands for the BrainAllianceFX Bot
+# Loaded as the cogs.mentorship extension on first use of one of its commands; hot-reloadable with .reload
+
+import discord
+from discord.ext import commands
+import asyncio
+
+from messages import get_error_message, get_success_message
+from batch_executor import ProgressReporter
+from waiting_scan import waiting_scanner
+from member_lookup import member_lookup
+from command_helpers import log_command, log_to_discord, report_batch_failures
+from waiting_setup import start_waiting_scan
+from guild_config import guild_config, WAITING_SETUP_KEYS
+
+# Prefix command: .setupwaiting
+@commands.command(name="setupwaiting", description="Crea canali privati e assegna ruolo Sala d’Attesa per utenti con ruolo trigger")
+async def setupwaiting(ctx, option: str = None):
+    # Report progress of the current or last background scan
+    if option and option.lower() == "status":
+        progress = waiting_scanner.progress.get(ctx.guild.id)
+        if progress is None:
+            await ctx.send(get_success_message("setupwaiting_no_scan"))
+            return
+        await ctx.send(get_success_message(
+            "setupwaiting_status",
+            state="in corso" if progress.running else "completata",
+            done=progress.done,
+            total=progress.total,
+            rate=progress.rate,
+            channels_created=progress.channels_created,
+            roles_assigned=progress.roles_assigned,
+            failed=len(progress.failed)
+        ))
+        return
+
+    # Resolve roles and category from this server's config
+    await guild_config.ensure_loaded()
+    missing = [key for key in WAITING_SETUP_KEYS if guild_config.get(ctx.guild.id, key) is None]
+    if missing:
+        await ctx.send(get_error_message("config_missing", setting=missing[0]))
+        log_command(ctx.author, 'setupwaiting', f"failed | {missing[0]} not configured")
+        return
+    trigger_role_id = guild_config.get(ctx.guild.id, 'trigger_role')
+    waiting_role_id = guild_config.get(ctx.guild.id, 'waiting_role')
+    category_id = guild_config.get(ctx.guild.id, 'waiting_category')
+    trigger_role = ctx.guild.get_role(trigger_role_id)
+    waiting_role = ctx.guild.get_role(waiting_role_id)
+    category = ctx.guild.get_channel(category_id)
+
+    if trigger_role is None:
+        await ctx.send(get_error_message("trigger_role_not_found", role_id=trigger_role_id))
+        log_command(ctx.author, 'setupwaiting', f"failed | trigger role {trigger_role_id} not found")
+        return
+    if waiting_role is None:
+        await ctx.send(get_error_message("waiting_role_not_found", role_id=waiting_role_id))
+        log_command(ctx.author, 'setupwaiting', f"failed | waiting role {waiting_role_id} not found")
+        return
+    if category is None:
+        await ctx.send(get_error_message("category_not_found", category_id=category_id))
+        log_command(ctx.author, 'setupwaiting', f"failed | category {category_id} not found")
+        return
+    if not isinstance(category, discord.CategoryChannel):
+        await ctx.send(get_error_message("invalid_category", category_id=category_id))
+        log_command(ctx.author, 'setupwaiting', f"failed | channel {category_id} is not a category")
+        return
+
+    # Run the background scan (or join the one already running, e.g. from startup)
+    task = start_waiting_scan(ctx.guild)
+    reporter = ProgressReporter(ctx, "Setup")
+    waiting_scanner.add_listener(ctx.guild.id, reporter)
+    try:
+        progress = await asyncio.shield(task)
+    finally:
+        waiting_scanner.remove_listener(ctx.guild.id, reporter)
+        await reporter.finish()
+
+    await report_batch_failures(ctx, 'setupwaiting', "configure", progress)
+    await ctx.send(get_success_message(
+        "setupwaiting_summary",
+        members_total=progress.total,
+        channels_created=progress.channels_created,
+        roles_assigned=progress.roles_assigned
+    ))
+    details = f"members={progress.total} channels_created={progress.channels_created} roles_assigned={progress.roles_assigned} failed={len(progress.failed)}"
+    log_command(ctx.author, 'setupwaiting', f"success | {details}")
+    await log_to_discord(ctx.bot, ctx.author, 'setupwaiting', details=f"Members processed: {progress.total} | Channels created: {progress.channels_created} | Roles assigned: {progress.roles_assigned} | Failed: {len(progress.failed)}")
+
+# Prefix command: .stopmentor [USER]
+@commands.command(name="stopmentor", description="Rimuove ruolo Sala d’Attesa per gli utenti in questo canale e elimina il canale")
+async def stopmentor(ctx):
+    guild = ctx.guild
+    await guild_config.ensure_loaded()
+    waiting_role_id = guild_config.get(guild.id, 'waiting_role')
+    category_id = guild_config.get(guild.id, 'waiting_category')
+    if waiting_role_id is None or category_id is None:
+        key = 'waiting_role' if waiting_role_id is None else 'waiting_category'
+        await ctx.send(get_error_message("config_missing", setting=key))
+        return
+    waiting_role = guild.get_role(waiting_role_id)
+    category = guild.get_channel(category_id)
+    if waiting_role is None or not isinstance(category, discord.CategoryChannel):
+        if waiting_role is None:
+            await ctx.send(get_error_message("waiting_role_not_found", role_id=waiting_role_id))
+        if not isinstance(category, discord.CategoryChannel):
+            await ctx.send(get_error_message("invalid_category", category_id=category_id))
+        return
+
+    # Determine the channel to operate on: current text channel
+    current_channel = ctx.channel if isinstance(ctx.channel, discord.TextChannel) else None
+    if current_channel is None:
+        await ctx.send(get_error_message("invalid_channel_id"))
+        return
+
+    # Collect members in this channel with the waiting role
+    # Note: For text channels, there is no built-in "members in channel" list with read access; use recent participants via channel.members
+    # Discord.py provides TextChannel.members as members who can see the channel; we filter by role
+    await member_lookup.ensure_chunked(guild)
+    candidates = [m for m in current_channel.members if waiting_role in getattr(m, 'roles', []) and not getattr(m, 'bot', False)]
+
+    if not candidates:
+        await ctx.send(get_error_message("stopmentor_no_waiting_in_channel"))
+        return
+
+    updated = 0
+    for member in candidates:
+        try:
+            if waiting_role in getattr(member, 'roles', []):
+                await member.remove_roles(waiting_role, reason=f"Stop mentor by {ctx.author} ({ctx.author.id})")
+            updated += 1
+        except discord.Forbidden:
+            await ctx.send(get_error_message("missing_permissions", action="rimuovere il ruolo a", member_name=member.display_name))
+            return
+        except discord.HTTPException as e:
+            await ctx.send(get_error_message("http_error", action="rimuovere ruolo a", member_name=member.display_name, error=e))
+            return
+
+    # Delete the channel if it belongs to the configured category
+    channel_deleted = False
+    if current_channel.category and current_channel.category.id == category_id:
+        try:
+            await current_channel.delete(reason=f"Stop mentor by {ctx.author} ({ctx.author.id})")
+            channel_deleted = True
+        except discord.Forbidden:
+            await ctx.send(get_error_message("missing_permissions", action="eliminare questo canale", member_name=""))
+            return
+        except discord.HTTPException as e:
+            await ctx.send(get_error_message("http_error", action="eliminare questo canale", member_name="", error=e))
+            return
+
+    # If channel deleted, message won't be visible; if not deleted, send summary
+    if not channel_deleted:
+        await ctx.send(get_success_message("stopmentor_done_channel", updated=updated, channel_deleted=channel_deleted))
+    log_command(ctx.author, 'stopmentor', f"success | updated={updated} channel_deleted={channel_deleted}")
+    await log_to_discord(ctx.bot, ctx.author, 'stopmentor', details=f"Users updated: {updated} | Channel deleted: {channel_deleted}")
+
+# Prefix command: .mentor (assign role to audience in current Stage channel and announce)
+@commands.command(name="mentor", description="Assegna un ruolo a tutti i partecipanti connessi nel tuo Stage e annuncia i partecipanti")
+async def mentor(ctx):
+    await guild_config.ensure_loaded()
+    role_id = guild_config.get(ctx.guild.id, 'mentor_role')
+    if role_id is None:
+        log_command(ctx.author, 'mentor', 'failed | mentor_role not configured')
+        await ctx.send(get_error_message("config_missing", setting='mentor_role'))
+        return
+
+    # Validate user is connected and in a Stage channel
+    if not ctx.author.voice or not ctx.author.voice.channel or not isinstance(ctx.author.voice.channel, discord.StageChannel):
+        log_command(ctx.author, 'mentor', 'failed | Reason: caller not in a Stage channel')
+        await ctx.send(get_error_message("not_in_stage"))
+        return
+
+    stage_channel: discord.StageChannel = ctx.author.voice.channel
+
+    # Resolve role
+    role = ctx.guild.get_role(role_id)
+    if role is None:
+        log_command(ctx.author, 'mentor', f'failed | Role not found: {role_id}')
+        await ctx.send(get_error_message("role_not_found"))
+        return
+
+    # Collect eligible participants: connected members in this Stage, excluding issuer and bots
+    eligible_members = [m for m in stage_channel.members if m.id != ctx.author.id and not getattr(m, 'bot', False)]
+
+    if not eligible_members:
+        log_command(ctx.author, 'mentor', 'failed | No eligible participants')
+        await ctx.send(get_error_message("no_participants"))
+        return
+
+    # Assign role to each eligible member
+    assigned_names = []
+    try:
+        for member in eligible_members:
+            if role not in getattr(member, 'roles', []):
+                await member.add_roles(role, reason=f"Mentorship participation via .mentor by {ctx.author} ({ctx.author.id})")
+            assigned_names.append(member.name)
+    except discord.Forbidden:
+        # Missing Manage Roles or role hierarchy issue
+        log_command(ctx.author, 'mentor', 'failed | Missing permissions to assign role')
+        # Reuse existing error template with action/member_name semantics
+        await ctx.send(get_error_message("missing_permissions", action="assign role to", member_name="participants"))
+        return
+    except discord.HTTPException as e:
+        log_command(ctx.author, 'mentor', f"failed | HTTP error while assigning roles: {e}")
+        await ctx.send(get_error_message("fetch_error", type="roles", error=e))
+        return
+
+    # Build announcement message with mentions
+    mentions_text = " ".join(member.mention for member in eligible_members)
+    # The announcement points to the configured contact (the mentor themselves if none)
+    contact_id = guild_config.get(ctx.guild.id, 'mentor_contact', ctx.author.id)
+    anthony_mention = f"<@{contact_id}>"
+    announcement = get_success_message("mentor_congrats", mentions=mentions_text, anthony_mention=anthony_mention)
+
+    await ctx.send(announcement)
+    details = f"Participants: {len(eligible_members)} | " + (", ".join(assigned_names) if assigned_names else "none") + f" | Stage: {stage_channel.name} ({stage_channel.id}) | Role: {role.name} ({role.id})"
+    log_command(ctx.author, 'mentor', details)
+    await log_to_discord(ctx.bot, ctx.author, 'mentor', details=details)
+
+# Prefix command: .call
+@commands.command(name="call", description="Sends a DM to the rest of the server's call group inviting them to a call")
+async def call(ctx):
+    # User ID -> name mapping of the users in this server's call group
+    await guild_config.ensure_loaded()
+    user_ids = guild_config.get(ctx.guild.id, 'call_users', {})
+    
+    # Get the caller's ID
+    caller_id = str(ctx.author.id)
+    
+    # Check if caller is one of the call group
+    if caller_id not in user_ids:
+        log_command(ctx.author, 'call', 'failed | Caller not authorized for call command')
+        await ctx.send(get_error_message("not_authorized"))
+        return
+    
+    # Determine which two users to DM (exclude the caller)
+    target_user_ids = [user_id for user_id in user_ids.keys() if user_id != caller_id]
+    
+    # Discord link
+    call_link = guild_config.get(ctx.guild.id, 'call_link')
+    if call_link is None:
+        log_command(ctx.author, 'call', 'failed | call_link not configured')
+        await ctx.send(get_error_message("config_missing", setting='call_link'))
+        return
+    
+    # Create the DM message
+    caller_name = user_ids[caller_id]
+    message = f"# Hey! {ctx.author.mention} ti vuole in call. Vieni!\n{call_link}"
+    
+    # Send DM to both target users
+    successful_dms = 0
+    failed_dms = []
+    
+    for target_id in target_user_ids:
+        try:
+            # Fetch the user
+            target_user = await ctx.bot.fetch_user(int(target_id))
+            
+            # Send DM
+            await target_user.send(message)
+            successful_dms += 1
+            log_command(ctx.author, 'call', f"success | DM sent to {user_ids[target_id]} ({target_id})")
+            
+        except discord.Forbidden:
+            # User has DMs disabled
+            failed_dms.append(f"{user_ids[target_id]} (DMs disabled)")
+            log_command(ctx.author, 'call', f"failed | DMs disabled for {user_ids[target_id]} ({target_id})")
+            
+        except discord.NotFound:
+            # User not found
+            failed_dms.append(f"{user_ids[target_id]} (user not found)")
+            log_command(ctx.author, 'call', f"failed | User not found: {user_ids[target_id]} ({target_id})")
+            
+        except discord.HTTPException as e:
+            # Other HTTP errors
+            failed_dms.append(f"{user_ids[target_id]} (HTTP error)")
+            log_command(ctx.author, 'call', f"failed | HTTP error for {user_ids[target_id]} ({target_id}): {e}")
+    
+    # Send confirmation message
+    if successful_dms > 0:
+        if failed_dms:
+            await ctx.send(f"✅ Call sent to {successful_dms} user(s)! Failed: {', '.join(failed_dms)}")
+        else:
+            await ctx.send(f"✅ Call sent to {successful_dms} user(s)!")
+    else:
+        await ctx.send(f"❌ Failed to send call to any users. Errors: {', '.join(failed_dms)}")
+    
+    # Log to Discord
+    details = f"Caller: {caller_name} ({caller_id}) | Successful DMs: {successful_dms} | Failed: {', '.join(failed_dms) if failed_dms else 'none'}"
+    await log_to_discord(ctx.bot, ctx.author, 'call', details=details)
+
+# =============================================================================
+# EXTENSION SETUP
+# =============================================================================
+
+COMMANDS = (setupwaiting, stopmentor, mentor, call,)
+
+async def setup(bot):
+    for command in COMMANDS:
+        bot.add_command(command)
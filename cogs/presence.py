@@ -0,0 +1,443 @@
+# presence.py - Rich Presence management commands for the BrainAllianceFX Bot
+# Loaded as the cogs.presence extension on first use of one of its commands; hot-reloadable with .reload
+
+import discord
+from discord.ext import commands
+
+from rich_presence import presence_manager, PRESENCE_MIN_ROTATION_INTERVAL
+from command_helpers import log_command, log_to_discord
+
+# Prefix command: .setstatus <status>
+@commands.command(name="setstatus", description="Set bot status (online, idle, dnd, invisible)")
+async def setstatus(ctx, status: str):
+    status_map = {
+        "online": discord.Status.online,
+        "idle": discord.Status.idle,
+        "dnd": discord.Status.dnd,
+        "invisible": discord.Status.invisible
+    }
+    
+    if status.lower() not in status_map:
+        await ctx.send("❌ Invalid status! Use: `online`, `idle`, `dnd`, or `invisible`")
+        return
+    
+    presence_manager.update_setting('bot_status', status_map[status.lower()])
+    await presence_manager.set_presence(ctx.bot)
+    await ctx.send(f"✅ Status set to: **{status.lower()}**")
+    log_command(ctx.author, 'setstatus', f"success | Set status: {status}")
+    await log_to_discord(ctx.bot, ctx.author, 'setstatus', args=[status])
+
+# Prefix command: .setactivity <text>
+@commands.command(name="setactivity", description="Set Rich Presence activity text")
+async def setactivity(ctx, *, activity_text: str):
+    if not activity_text.strip():
+        await ctx.send("❌ Please provide activity text!")
+        return
+    
+    presence_manager.update_setting('activity_text', activity_text)
+    await presence_manager.set_presence(ctx.bot)
+    await ctx.send(f"✅ Activity set to: **{activity_text}**")
+    log_command(ctx.author, 'setactivity', f"success | Set activity: {activity_text}")
+    await log_to_discord(ctx.bot, ctx.author, 'setactivity', args=[activity_text])
+
+# Prefix command: .setrotation <seconds> <text> | <text> ... (or off)
+@commands.command(name="setrotation", description="Rotate activity texts on a timer (.setrotation <seconds> <text> | <text> ..., or off)")
+async def setrotation(ctx, interval: str, *, texts: str = ""):
+    if interval.lower() == "off":
+        presence_manager.update_setting('rotation_interval', 0)
+        await presence_manager.set_presence(ctx.bot)
+        await ctx.send("✅ Activity rotation disabled!")
+        log_command(ctx.author, 'setrotation', 'success | Rotation disabled')
+        await log_to_discord(ctx.bot, ctx.author, 'setrotation', args=[interval])
+        return
+    
+    rotation_texts = [text.strip() for text in texts.split("|") if text.strip()]
+    if not interval.isdigit() or not rotation_texts:
+        await ctx.send("❌ Usage: `.setrotation <seconds> <text> | <text> ...` or `.setrotation off`")
+        return
+    
+    seconds = max(int(interval), PRESENCE_MIN_ROTATION_INTERVAL)
+    presence_manager.update_setting('rotation_texts', rotation_texts)
+    presence_manager.update_setting('rotation_interval', seconds)
+    await presence_manager.set_presence(ctx.bot)
+    await ctx.send(f"✅ Rotating {len(rotation_texts)} activity text(s) every **{seconds}s**")
+    log_command(ctx.author, 'setrotation', f"success | {len(rotation_texts)} texts every {seconds}s")
+    await log_to_discord(ctx.bot, ctx.author, 'setrotation', args=[interval, texts])
+
+# Prefix command: .settype <type>
+@commands.command(name="settype", description="Set activity type (playing, listening, watching, streaming, competing)")
+async def settype(ctx, activity_type: str):
+    type_map = {
+        "playing": discord.ActivityType.playing,
+        "listening": discord.ActivityType.listening,
+        "watching": discord.ActivityType.watching,
+        "streaming": discord.ActivityType.streaming,
+        "competing": discord.ActivityType.competing
+    }
+    
+    if activity_type.lower() not in type_map:
+        await ctx.send("❌ Invalid type! Use: `playing`, `listening`, `watching`, `streaming`, or `competing`")
+        return
+    
+    presence_manager.update_setting('activity_type', type_map[activity_type.lower()])
+    await presence_manager.set_presence(ctx.bot)
+    await ctx.send(f"✅ Activity type set to: **{activity_type.lower()}**")
+    log_command(ctx.author, 'settype', f"success | Set type: {activity_type}")
+    await log_to_discord(ctx.bot, ctx.author, 'settype', args=[activity_type])
+
+# Prefix command: .setstreaming <true/false>
+@commands.command(name="setstreaming", description="Enable/disable streaming presence")
+async def setstreaming(ctx, enable: str):
+    if enable.lower() not in ['true', 'false']:
+        await ctx.send("❌ Use `true` or `false`!")
+        return
+    
+    enable_bool = enable.lower() == 'true'
+    presence_manager.update_setting('enable_streaming', enable_bool)
+    await presence_manager.set_presence(ctx.bot)
+    await ctx.send(f"✅ Streaming {'enabled' if enable_bool else 'disabled'}!")
+    log_command(ctx.author, 'setstreaming', f"success | Set streaming: {enable_bool}")
+    await log_to_discord(ctx.bot, ctx.author, 'setstreaming', args=[enable])
+
+# Prefix command: .setstreamtitle <title>
+@commands.command(name="setstreamtitle", description="Set streaming title")
+async def setstreamtitle(ctx, *, title: str):
+    if not title.strip():
+        await ctx.send("❌ Please provide a title!")
+        return
+    
+    presence_manager.update_setting('streaming_title', title)
+    await presence_manager.set_presence(ctx.bot)
+    await ctx.send(f"✅ Streaming title set to: **{title}**")
+    log_command(ctx.author, 'setstreamtitle', f"success | Set title: {title}")
+    await log_to_discord(ctx.bot, ctx.author, 'setstreamtitle', args=[title])
+
+# Prefix command: .setstreamurl <url>
+@commands.command(name="setstreamurl", description="Set streaming URL")
+async def setstreamurl(ctx, url: str):
+    if not url.strip():
+        await ctx.send("❌ Please provide a URL!")
+        return
+    
+    presence_manager.update_setting('streaming_url', url)
+    await presence_manager.set_presence(ctx.bot)
+    await ctx.send(f"✅ Streaming URL set to: **{url}**")
+    log_command(ctx.author, 'setstreamurl', f"success | Set URL: {url}")
+    await log_to_discord(ctx.bot, ctx.author, 'setstreamurl', args=[url])
+
+# Prefix command: .setservercount <true/false>
+@commands.command(name="setservercount", description="Show/hide server count in presence")
+async def setservercount(ctx, show: str):
+    if show.lower() not in ['true', 'false']:
+        await ctx.send("❌ Use `true` or `false`!")
+        return
+    
+    show_bool = show.lower() == 'true'
+    presence_manager.update_setting('show_server_count', show_bool)
+    await presence_manager.set_presence(ctx.bot)
+    await ctx.send(f"✅ Server count {'shown' if show_bool else 'hidden'}!")
+    log_command(ctx.author, 'setservercount', f"success | Set server count: {show_bool}")
+    await log_to_discord(ctx.bot, ctx.author, 'setservercount', args=[show])
+
+# Prefix command: .setmembercount <true/false>
+@commands.command(name="setmembercount", description="Show/hide member count in presence")
+async def setmembercount(ctx, show: str):
+    if show.lower() not in ['true', 'false']:
+        await ctx.send("❌ Use `true` or `false`!")
+        return
+    
+    show_bool = show.lower() == 'true'
+    presence_manager.update_setting('show_member_count', show_bool)
+    await presence_manager.set_presence(ctx.bot)
+    await ctx.send(f"✅ Member count {'shown' if show_bool else 'hidden'}!")
+    log_command(ctx.author, 'setmembercount', f"success | Set member count: {show_bool}")
+    await log_to_discord(ctx.bot, ctx.author, 'setmembercount', args=[show])
+
+# Prefix command: .setlargeimage <key>
+@commands.command(name="setlargeimage", description="Set large image for Rich Presence")
+async def setlargeimage(ctx, image_key: str):
+    if not image_key.strip():
+        await ctx.send("❌ Please provide an image key!")
+        return
+    
+    presence_manager.update_setting('large_image', image_key)
+    await presence_manager.set_presence(ctx.bot)
+    await ctx.send(f"✅ Large image set to: **{image_key}**")
+    log_command(ctx.author, 'setlargeimage', f"success | Set large image: {image_key}")
+    await log_to_discord(ctx.bot, ctx.author, 'setlargeimage', args=[image_key])
+
+# Prefix command: .setlargetext <text>
+@commands.command(name="setlargetext", description="Set large image text for Rich Presence")
+async def setlargetext(ctx, *, text: str):
+    if not text.strip():
+        await ctx.send("❌ Please provide text!")
+        return
+    
+    presence_manager.update_setting('large_text', text)
+    await presence_manager.set_presence(ctx.bot)
+    await ctx.send(f"✅ Large image text set to: **{text}**")
+    log_command(ctx.author, 'setlargetext', f"success | Set large text: {text}")
+    await log_to_discord(ctx.bot, ctx.author, 'setlargetext', args=[text])
+
+# Prefix command: .setsmallimage <key>
+@commands.command(name="setsmallimage", description="Set small image for Rich Presence")
+async def setsmallimage(ctx, image_key: str):
+    if not image_key.strip():
+        await ctx.send("❌ Please provide an image key!")
+        return
+    
+    presence_manager.update_setting('small_image', image_key)
+    await presence_manager.set_presence(ctx.bot)
+    await ctx.send(f"✅ Small image set to: **{image_key}**")
+    log_command(ctx.author, 'setsmallimage', f"success | Set small image: {image_key}")
+    await log_to_discord(ctx.bot, ctx.author, 'setsmallimage', args=[image_key])
+
+# Prefix command: .setsmalltext <text>
+@commands.command(name="setsmalltext", description="Set small image text for Rich Presence")
+async def setsmalltext(ctx, *, text: str):
+    if not text.strip():
+        await ctx.send("❌ Please provide text!")
+        return
+    
+    presence_manager.update_setting('small_text', text)
+    await presence_manager.set_presence(ctx.bot)
+    await ctx.send(f"✅ Small image text set to: **{text}**")
+    log_command(ctx.author, 'setsmalltext', f"success | Set small text: {text}")
+    await log_to_discord(ctx.bot, ctx.author, 'setsmalltext', args=[text])
+
+# Prefix command: .refreshpresence
+@commands.command(name="refreshpresence", description="Refresh Rich Presence with current settings")
+async def refreshpresence(ctx):
+    await presence_manager.set_presence(ctx.bot)
+    await ctx.send("✅ Rich Presence refreshed!")
+    log_command(ctx.author, 'refreshpresence', 'success | Refreshed presence')
+    await log_to_discord(ctx.bot, ctx.author, 'refreshpresence')
+
+# Prefix command: .resetpresence
+@commands.command(name="resetpresence", description="Reset Rich Presence to default settings")
+async def resetpresence(ctx):
+    # Reset to default settings
+    presence_manager.settings = presence_manager.get_default_settings()
+    presence_manager.save_settings()
+    await presence_manager.set_presence(ctx.bot)
+    await ctx.send("✅ Presence reset to default!")
+    log_command(ctx.author, 'resetpresence', 'success | Reset to default')
+    await log_to_discord(ctx.bot, ctx.author, 'resetpresence')
+
+# Prefix command: .presenceinfo
+@commands.command(name="presenceinfo", description="Show current Rich Presence settings")
+async def presenceinfo(ctx):
+    settings = presence_manager.settings
+    
+    embed = discord.Embed(
+        title="🎭 Rich Presence Settings",
+        color=0x5865F2,
+        timestamp=discord.utils.utcnow()
+    )
+    
+    embed.add_field(
+        name="📊 Basic Settings",
+        value=f"**Status:** {settings['bot_status'].name}\n"
+              f"**Activity Type:** {settings['activity_type'].name}\n"
+              f"**Activity Text:** {settings['activity_text']}",
+        inline=False
+    )
+    
+    embed.add_field(
+        name="📺 Streaming",
+        value=f"**Enabled:** {settings['enable_streaming']}\n"
+              f"**Title:** {settings['streaming_title']}\n"
+              f"**URL:** {settings['streaming_url']}",
+        inline=False
+    )
+    
+    rotation_texts = settings.get('rotation_texts') or []
+    if rotation_texts and settings.get('rotation_interval', 0) > 0:
+        embed.add_field(
+            name="🔄 Rotation",
+            value=f"**Every:** {settings['rotation_interval']}s\n" + "\n".join(f"• {text}" for text in rotation_texts)[:900],
+            inline=False
+        )
+    
+    embed.add_field(
+        name="📈 Server Info",
+        value=f"**Show Server Count:** {settings['show_server_count']}\n"
+              f"**Show Member Count:** {settings['show_member_count']}",
+        inline=True
+    )
+    
+    embed.add_field(
+        name="🖼️ Images",
+        value=f"**Large Image:** {settings['large_image'] or 'None'}\n"
+              f"**Large Text:** {settings['large_text'] or 'None'}\n"
+              f"**Small Image:** {settings['small_image'] or 'None'}\n"
+              f"**Small Text:** {settings['small_text'] or 'None'}",
+        inline=True
+    )
+    
+    embed.set_footer(text="💡 Use .presencehelp for command guide")
+    
+    await ctx.send(embed=embed)
+    log_command(ctx.author, 'presenceinfo', 'success | Showed settings')
+    await log_to_discord(ctx.bot, ctx.author, 'presenceinfo')
+
+# Prefix command: .checkimages
+@commands.command(name="checkimages", description="Check Rich Presence image settings (Note: Discord bots cannot display images)")
+async def checkimages(ctx):
+    embed = discord.Embed(
+        title="🖼️ Rich Presence Image Information",
+        color=0xFF6B6B,
+        timestamp=discord.utils.utcnow()
+    )
+    
+    embed.add_field(
+        name="⚠️ Important Notice",
+        value=(
+            "**Discord bots CANNOT display Rich Presence images!**\n\n"
+            "This is a Discord API limitation, not a code issue. "
+            "Only user accounts can display Rich Presence images, not bot accounts."
+        ),
+        inline=False
+    )
+    
+    embed.add_field(
+        name="✅ What Works for Bots",
+        value=(
+            "• Activity text (Playing, Listening, Watching)\n"
+            "• Activity types (Playing, Listening, Watching, Streaming)\n"
+            "• Online status (Online, Idle, Do Not Disturb)\n"
+            "• Streaming URLs (for streaming activities)"
+        ),
+        inline=False
+    )
+    
+    embed.add_field(
+        name="❌ What Doesn't Work for Bots",
+        value=(
+            "• Rich Presence images\n"
+            "• Custom Rich Presence assets\n"
+            "• Any visual assets in activities"
+        ),
+        inline=False
+    )
+    
+    embed.set_footer(text="Your Rich Presence system is working correctly!")
+    
+    await ctx.send(embed=embed)
+    log_command(ctx.author, 'checkimages', 'success | Explained bot image limitations')
+    await log_to_discord(ctx.bot, ctx.author, 'checkimages')
+
+# Prefix command: .presencehelp
+@commands.command(name="presencehelp", description="Show Rich Presence command guide")
+async def presencehelp(ctx):
+    embed = discord.Embed(
+        title="🎭 Rich Presence Command Guide",
+        description="Complete guide to customize your bot's Rich Presence!",
+        color=0x5865F2,
+        timestamp=discord.utils.utcnow()
+    )
+    
+    embed.add_field(
+        name="🔧 Basic Commands",
+        value=(
+            "`.setstatus <status>` → Change bot status\n"
+            "`.setactivity <text>` → Set activity text\n"
+            "`.settype <type>` → Set activity type\n"
+            "`.setrotation <sec> <a> | <b>` → Rotate activity texts\n"
+            "`.refreshpresence` → Refresh Rich Presence\n"
+            "`.resetpresence` → Reset to default"
+        ),
+        inline=False
+    )
+    
+    embed.add_field(
+        name="📺 Streaming Commands",
+        value=(
+            "`.setstreaming <true/false>` → Enable/disable streaming\n"
+            "`.setstreamtitle <title>` → Set streaming title\n"
+            "`.setstreamurl <url>` → Set streaming URL"
+        ),
+        inline=False
+    )
+    
+    embed.add_field(
+        name="📊 Display Commands",
+        value=(
+            "`.setservercount <true/false>` → Show/hide server count\n"
+            "`.setmembercount <true/false>` → Show/hide member count"
+        ),
+        inline=False
+    )
+    
+    embed.add_field(
+        name="🖼️ Image Commands",
+        value=(
+            "`.setlargeimage <key>` → Set large image\n"
+            "`.setlargetext <text>` → Set large image text\n"
+            "`.setsmallimage <key>` → Set small image\n"
+            "`.setsmalltext <text>` → Set small image text"
+        ),
+        inline=False
+    )
+    
+    embed.add_field(
+        name="🎯 Activity Types",
+        value=(
+            "• **playing** - Playing [text]\n"
+            "• **listening** - Listening to [text]\n"
+            "• **watching** - Watching [text]\n"
+            "• **streaming** - Streaming [text]\n"
+            "• **competing** - Competing in [text]"
+        ),
+        inline=True
+    )
+    
+    embed.add_field(
+        name="📊 Status Options",
+        value=(
+            "• **online** - Green dot\n"
+            "• **idle** - Yellow dot\n"
+            "• **dnd** - Red dot (Do Not Disturb)\n"
+            "• **invisible** - Gray dot"
+        ),
+        inline=True
+    )
+    
+    embed.add_field(
+        name="💡 Examples",
+        value=(
+            "`.setactivity \"with BrainAllianceFX 🧠\"`\n"
+            "`.settype playing`\n"
+            "`.setstatus online`\n"
+            "`.setlargeimage \"brainalliance_logo\"`\n"
+            "`.setlargetext \"BrainAllianceFX Server\"`"
+        ),
+        inline=False
+    )
+    
+    embed.add_field(
+        name="📚 Documentation",
+        value=(
+            "• **README.md** → Complete setup and command guide\n"
+            "• **RICH_PRESENCE_GUIDE.md** → Detailed Rich Presence guide\n"
+            "• **.presenceinfo** → Current Rich Presence settings\n"
+            "• **.help** → All bot commands"
+        ),
+        inline=False
+    )
+    
+    embed.set_footer(text="💜 Made with love for BrainAllianceFX")
+    
+    await ctx.send(embed=embed)
+    log_command(ctx.author, 'presencehelp', 'success | Showed help guide')
+    await log_to_discord(ctx.bot, ctx.author, 'presencehelp')
+
+# =============================================================================
+# EXTENSION SETUP
+# =============================================================================
+
+COMMANDS = (setstatus, setactivity, setrotation, settype, setstreaming, setstreamtitle, setstreamurl, setservercount, setmembercount, setlargeimage, setlargetext, setsmallimage, setsmalltext, refreshpresence, resetpresence, presenceinfo, checkimages, presencehelp,)
+
+async def setup(bot):
+    for command in COMMANDS:
+        bot.add_command(command)
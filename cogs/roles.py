@@ -0,0 +1,210 @@
+# roles.py - Role management commands for the BrainAllianceFX Bot
+# Loaded as the cogs.roles extension on first use of one of its commands; hot-reloadable with .reload
+
+from discord.ext import commands
+
+from messages import get_error_message, get_success_message
+from batch_executor import run_batch, member_roles_bucket, describe_error, ProgressReporter
+from selector import select_members, SelectorError
+from member_lookup import member_lookup
+from command_helpers import log_command, log_to_discord, summarize_names, fetch_member_by_query, resolve_role_by_query
+
+# Prefix command: .role
+@commands.command(name="role", description="Manage roles for users and bots")
+async def role(ctx, *, args: str = None):
+    if not args:
+        await ctx.send(get_error_message("role_no_arguments"))
+        return
+    
+    # Parse arguments
+    args_list = args.split()
+    if len(args_list) < 2:
+        await ctx.send(get_error_message("role_insufficient_arguments"))
+        return
+    
+    # Parse flags and targets
+    flags = {}
+    targets = []
+    role_query = None
+    action = None
+    selector = None
+    
+    i = 0
+    while i < len(args_list):
+        arg = args_list[i]
+        if arg.startswith('-'):
+            if arg == '-s':
+                # Everything after -s is the member selector expression
+                selector = " ".join(token for token in args_list[i + 1:] if token != '-n')
+                flags['dry_run'] = flags.get('dry_run') or '-n' in args_list[i + 1:]
+                break
+            elif arg == '-n':
+                flags['dry_run'] = True
+            elif arg == '-u':
+                flags['users'] = True
+            elif arg == '-b':
+                flags['bots'] = True
+            elif arg == '-i':
+                flags['in_role'] = True
+            elif arg == '-a':
+                flags['add'] = True
+                action = 'add'
+            elif arg == '-r':
+                flags['remove'] = True
+                action = 'remove'
+            else:
+                await ctx.send(get_error_message("role_invalid_flag", flag=arg))
+                return
+        else:
+            if flags.get('in_role') and not role_query:
+                role_query = arg
+            elif action and not role_query:
+                role_query = arg
+            else:
+                targets.append(arg)
+        i += 1
+    
+    # Validate arguments
+    if not action:
+        await ctx.send(get_error_message("role_no_action"))
+        return
+    
+    if not role_query:
+        await ctx.send(get_error_message("role_no_role"))
+        return
+    
+    if not targets and not flags.get('in_role') and not selector:
+        await ctx.send(get_error_message("role_no_targets"))
+        return
+    
+    # Resolve the role
+    try:
+        role = resolve_role_by_query(ctx.guild, role_query)
+    except ValueError as ve:
+        if str(ve) == "not_found":
+            await ctx.send(get_error_message("role_not_found_query", query=role_query))
+        else:
+            await ctx.send(get_error_message("role_not_found_query", query=role_query))
+        log_command(ctx.author, 'role', f"failed | Role not found from query: {role_query}")
+        return
+    
+    # Get target members
+    target_members = []
+    
+    if selector or flags.get('in_role'):
+        # Select members in one evaluation over the member indexes
+        if not selector:
+            # -i <role> selects the members of that role (or of the action role if none is given)
+            in_role = " ".join(targets) if targets else str(role.id)
+            selector = f'in:"{in_role}"'
+        # Selectors look at every member, so the full member list is needed
+        await member_lookup.ensure_chunked(ctx.guild)
+        try:
+            selected = select_members(selector, ctx.guild)
+        except SelectorError as e:
+            await ctx.send(get_error_message("role_invalid_selector", error=e))
+            log_command(ctx.author, 'role', f"failed | Invalid selector '{selector}': {e}")
+            return
+        for member in selected:
+            if flags.get('users') and not member.bot:
+                target_members.append(member)
+            elif flags.get('bots') and member.bot:
+                target_members.append(member)
+            elif not flags.get('users') and not flags.get('bots'):
+                # If neither -u nor -b specified, include all
+                target_members.append(member)
+    else:
+        # Resolve individual targets
+        for target in targets:
+            try:
+                member = await fetch_member_by_query(ctx.guild, target)
+                if flags.get('users') and member.bot:
+                    continue  # Skip bots if only users requested
+                elif flags.get('bots') and not member.bot:
+                    continue  # Skip users if only bots requested
+                target_members.append(member)
+            except ValueError:
+                # Log failed resolution but continue with others
+                log_command(ctx.author, 'role', f"warning | Failed to resolve target: {target}")
+                continue
+    
+    if not target_members:
+        await ctx.send(get_error_message("role_no_valid_targets"))
+        return
+
+    # Dry run: report what would change without editing any member
+    if flags.get('dry_run'):
+        await ctx.send(get_success_message("role_selector_preview",
+                                         action=action,
+                                         role_name=role.name,
+                                         count=len(target_members),
+                                         target_names=summarize_names([member.display_name for member in target_members])))
+        log_command(ctx.author, 'role', f"skip | Dry run: {action} {role.name} for {len(target_members)} member(s)")
+        return
+    
+    # Members that already have (or lack) the role need no request
+    failed_names = []
+    pending = []
+    for member in target_members:
+        if action == 'add' and role in member.roles:
+            failed_names.append(f"{member.display_name} (already has role)")
+        elif action == 'remove' and role not in member.roles:
+            failed_names.append(f"{member.display_name} (doesn't have role)")
+        else:
+            pending.append(member)
+
+    # Perform role operations concurrently
+    reason = f"Role management by {ctx.author} ({ctx.author.id})"
+    async def _edit(member):
+        if action == 'add':
+            await member.add_roles(role, reason=reason)
+        else:
+            await member.remove_roles(role, reason=reason)
+
+    reporter = ProgressReporter(ctx, f"Role {action}")
+    result = await run_batch(pending, _edit, member_roles_bucket(ctx.guild), on_progress=reporter)
+    await reporter.finish()
+
+    success_names = [member.display_name for member in result.succeeded]
+    for member, error in result.failed:
+        failed_names.append(f"{member.display_name} ({describe_error(error)})")
+        log_command(ctx.author, 'role', f"failed | {describe_error(error)} for {member.display_name}: {error}")
+    success_count = len(success_names)
+    failed_count = len(failed_names)
+    
+    # Send result message
+    if success_count > 0 and failed_count == 0:
+        await ctx.send(get_success_message("role_operation_success", 
+                                         action=action, 
+                                         count=success_count, 
+                                         role_name=role.name,
+                                         target_names=summarize_names(success_names)))
+    elif success_count > 0 and failed_count > 0:
+        await ctx.send(get_success_message("role_operation_partial", 
+                                         action=action,
+                                         success_count=success_count,
+                                         failed_count=failed_count,
+                                         role_name=role.name,
+                                         success_names=summarize_names(success_names),
+                                         failed_names=summarize_names(failed_names)))
+    else:
+        await ctx.send(get_error_message("role_operation_failed", 
+                                       action=action,
+                                       failed_count=failed_count,
+                                       role_name=role.name,
+                                       failed_names=summarize_names(failed_names)))
+    
+    # Log to Discord
+    details = f"Action: {action} | Role: {role.name} ({role.id}) | Success: {success_count} | Failed: {failed_count} | Targets: {summarize_names(success_names) if success_names else 'none'}"
+    log_command(ctx.author, 'role', details, targets={'role': role.id, 'members': [member.id for member in result.succeeded]})
+    await log_to_discord(ctx.bot, ctx.author, 'role', args=[args], details=details)
+
+# =============================================================================
+# EXTENSION SETUP
+# =============================================================================
+
+COMMANDS = (role,)
+
+async def setup(bot):
+    for command in COMMANDS:
+        bot.add_command(command)
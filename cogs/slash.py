@@ -0,0 +1,335 @@
+# slash.py - Slash command front end for the BrainAllianceFX Bot
+# Loaded at startup (SLASH_COMMANDS); each command defers at once and runs the matching prefix command
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+from discord.ext.commands.view import StringView
+
+from messages import get_error_message, get_success_message
+from resolver import resolver, KIND_MEMBER, KIND_ROLE, KIND_VOICE_CHANNEL
+from guild_config import SETTINGS
+from audit_log import KNOWN_OUTCOMES
+
+# Choices returned per autocomplete request (Discord maximum)
+AUTOCOMPLETE_CHOICES = 25
+
+# =============================================================================
+# PREFIX COMMAND BRIDGE
+# =============================================================================
+
+class SlashContext(commands.Context):
+    """Context built from an interaction; remembers whether the command replied"""
+
+    responded = False
+
+    async def send(self, *args, **kwargs):
+        self.responded = True
+        return await super().send(*args, **kwargs)
+
+def quote(value):
+    """One prefix command argument, quoted when it contains whitespace"""
+    value = str(value)
+    if value and not any(char.isspace() or char == '"' for char in value):
+        return value
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+async def run_command(interaction: discord.Interaction, name: str, arguments: str = ""):
+    """Defer, then run prefix command name with arguments through the normal invoke path.
+
+    Checks, invoke hooks, the audit log and instrumentation behave exactly as
+    for the prefix command. Replies become interaction follow-ups and batch
+    progress edits one of them; a command that never replies still has the
+    deferred "thinking" message replaced.
+    """
+    await interaction.response.defer(thinking=True)
+    bot = interaction.client
+    await bot.load_extension_for(name)
+    ctx = await SlashContext.from_interaction(interaction)
+    ctx.command = bot.get_command(name)
+    if ctx.command is None:
+        await interaction.edit_original_response(content=get_error_message("slash_failed", command=name))
+        return
+    ctx.invoked_with = name
+    ctx.view = StringView(arguments)
+    # The audit log reads the arguments from the message content
+    ctx.message.content = f"/{name} {arguments}".strip()
+    await bot.invoke(ctx)
+    if not ctx.responded:
+        key = "slash_failed" if ctx.command_failed else "slash_done"
+        text = get_error_message(key, command=name) if ctx.command_failed else get_success_message(key, command=name)
+        try:
+            await interaction.edit_original_response(content=text)
+        except discord.HTTPException:
+            pass
+
+# =============================================================================
+# AUTOCOMPLETE (backed by the resolver indexes)
+# =============================================================================
+
+def _choices(objects, label):
+    return [app_commands.Choice(name=label(obj)[:100], value=str(obj.id)) for obj in objects]
+
+async def voice_channel_autocomplete(interaction: discord.Interaction, current: str):
+    if interaction.guild is None:
+        return []
+    channels = resolver.suggest(interaction.guild, KIND_VOICE_CHANNEL, current, AUTOCOMPLETE_CHOICES)
+    return _choices(channels, lambda channel: f"{channel.name} ({len(channel.members)} connected)")
+
+async def role_autocomplete(interaction: discord.Interaction, current: str):
+    if interaction.guild is None:
+        return []
+    roles = resolver.suggest(interaction.guild, KIND_ROLE, current, AUTOCOMPLETE_CHOICES)
+    return _choices([role for role in roles if not role.is_default()], lambda role: role.name)
+
+async def member_autocomplete(interaction: discord.Interaction, current: str):
+    if interaction.guild is None:
+        return []
+    members = resolver.suggest(interaction.guild, KIND_MEMBER, current, AUTOCOMPLETE_CHOICES)
+    return _choices(members, lambda member: f"{member.display_name} (@{member.name})")
+
+# =============================================================================
+# COMMANDS WITHOUT OPTIONS
+# =============================================================================
+
+def simple_command(name: str, description: str):
+    """Slash command that runs prefix command name without arguments"""
+    async def callback(interaction: discord.Interaction):
+        await run_command(interaction, name)
+    return app_commands.guild_only()(app_commands.Command(name=name, description=description, callback=callback))
+
+SIMPLE_COMMANDS = [
+    simple_command('muteall', "Mute everyone in your voice channel"),
+    simple_command('unmuteall', "Unmute everyone in your voice channel"),
+    simple_command('kickall', "Disconnect everyone in your voice channel"),
+    simple_command('serverkickall', "Disconnect everyone from every voice channel"),
+    simple_command('stopmentor', "End the mentorship session of this waiting channel"),
+    simple_command('mentor', "Give the mentorship role to everyone in your Stage channel"),
+    simple_command('call', "Invite the rest of the call group to a call"),
+    simple_command('stats', "Command latency percentiles and event-loop lag"),
+    simple_command('ping', "Bot latency"),
+    simple_command('help', "List the bot commands"),
+]
+
+# =============================================================================
+# VOICE COMMANDS
+# =============================================================================
+
+@app_commands.command(name="moveall", description="Move everyone in your voice channel to another channel")
+@app_commands.describe(channel="Destination voice channel")
+@app_commands.autocomplete(channel=voice_channel_autocomplete)
+@app_commands.guild_only()
+async def slash_moveall(interaction: discord.Interaction, channel: str):
+    await run_command(interaction, 'moveall', quote(channel))
+
+@app_commands.command(name="servermoveall", description="Move everyone connected to voice to one channel")
+@app_commands.describe(channel="Destination voice channel")
+@app_commands.autocomplete(channel=voice_channel_autocomplete)
+@app_commands.guild_only()
+async def slash_servermoveall(interaction: discord.Interaction, channel: str):
+    await run_command(interaction, 'servermoveall', quote(channel))
+
+@app_commands.command(name="back", description="Undo the last move operations")
+@app_commands.describe(steps="Number of moves to undo", show_list="Show the undo history instead")
+@app_commands.guild_only()
+async def slash_back(interaction: discord.Interaction, steps: app_commands.Range[int, 1, 50] = 1, show_list: bool = False):
+    await run_command(interaction, 'back', "list" if show_list else str(steps))
+
+# =============================================================================
+# MENTORSHIP AND ROLE COMMANDS
+# =============================================================================
+
+@app_commands.command(name="setupwaiting", description="Create private waiting channels for members with the trigger role")
+@app_commands.describe(status="Only show the progress of the current or last scan")
+@app_commands.guild_only()
+async def slash_setupwaiting(interaction: discord.Interaction, status: bool = False):
+    await run_command(interaction, 'setupwaiting', "status" if status else "")
+
+@app_commands.command(name="role", description="Add or remove a role for users, bots, members of a role or a selector")
+@app_commands.describe(
+    action="Add or remove the role",
+    role="Role to add or remove",
+    users="Users (names, mentions or IDs, separated by spaces)",
+    bots="Bots (names, mentions or IDs, separated by spaces)",
+    in_role="Every member of this role",
+    selector="Member selector expression",
+    dry_run="With a selector: only preview the matching members",
+)
+@app_commands.choices(action=[app_commands.Choice(name="add", value="-a"), app_commands.Choice(name="remove", value="-r")])
+@app_commands.autocomplete(role=role_autocomplete, in_role=role_autocomplete)
+@app_commands.guild_only()
+async def slash_role(interaction: discord.Interaction, action: app_commands.Choice[str], role: str,
+                     users: str = None, bots: str = None, in_role: str = None, selector: str = None, dry_run: bool = False):
+    # .role splits its arguments on whitespace, so the role is passed by ID when picked from the list
+    arguments = [action.value, role]
+    if selector:
+        arguments += ['-n', '-s', selector] if dry_run else ['-s', selector]
+    elif in_role:
+        arguments += ['-i', in_role]
+    elif bots:
+        arguments += ['-b', bots]
+    elif users:
+        arguments += ['-u', users]
+    await run_command(interaction, 'role', " ".join(arguments))
+
+# =============================================================================
+# MODERATION AND ADMIN COMMANDS
+# =============================================================================
+
+@app_commands.command(name="nick", description="Change or clear someone's nickname")
+@app_commands.describe(member="Member to rename", nickname="New nickname (leave empty to clear it)")
+@app_commands.autocomplete(member=member_autocomplete)
+@app_commands.guild_only()
+async def slash_nick(interaction: discord.Interaction, member: str, nickname: str = None):
+    await run_command(interaction, 'nick', f"{quote(member)} {nickname or '-'}")
+
+@app_commands.command(name="massban", description="Ban users by ID (from the list and/or an attached file)")
+@app_commands.describe(user_ids="User IDs or message links, separated by spaces", file="Text file with user IDs")
+@app_commands.guild_only()
+async def slash_massban(interaction: discord.Interaction, user_ids: str = "", file: discord.Attachment = None):
+    # An attached file reaches .massban through ctx.message.attachments
+    await run_command(interaction, 'massban', user_ids)
+
+@app_commands.command(name="audit", description="Query the audit log")
+@app_commands.describe(user="Only this user's commands", command="Only this command", outcome="Only this outcome",
+                       since="Time window, e.g. 30m, 12h, 7d", limit="Records to show")
+@app_commands.choices(outcome=[app_commands.Choice(name=name, value=name) for name in KNOWN_OUTCOMES])
+@app_commands.autocomplete(user=member_autocomplete)
+@app_commands.guild_only()
+async def slash_audit(interaction: discord.Interaction, user: str = None, command: str = None, outcome: app_commands.Choice[str] = None,
+                      since: str = None, limit: app_commands.Range[int, 1, 25] = None):
+    filters = [f"{key}:{value}" for key, value in (
+        ('user', user), ('cmd', command), ('outcome', outcome and outcome.value), ('since', since), ('limit', limit)
+    ) if value]
+    await run_command(interaction, 'audit', " ".join(quote(token) for token in filters))
+
+@app_commands.command(name="ca", description="Clear recent messages in this channel")
+@app_commands.describe(count="Messages to inspect", bots="Only messages from bots", user="Only messages from this member", contains="Only messages containing this text")
+@app_commands.autocomplete(user=member_autocomplete)
+@app_commands.guild_only()
+async def slash_ca(interaction: discord.Interaction, count: app_commands.Range[int, 1, 1000] = None, bots: bool = False,
+                   user: str = None, contains: str = None):
+    filters = [str(count)] if count else []
+    if bots:
+        filters.append("bot")
+    if user:
+        filters.append(quote(f"user:{user}"))
+    if contains:
+        filters.append(quote(f"contains:{contains}"))
+    await run_command(interaction, 'ca', " ".join(filters))
+
+@app_commands.command(name="config", description="Show or change this server's settings")
+@app_commands.describe(setting="Setting to change (leave empty to show all)", value="New value (leave empty to clear the setting)")
+@app_commands.choices(setting=[app_commands.Choice(name=key, value=key) for key in SETTINGS])
+@app_commands.guild_only()
+async def slash_config(interaction: discord.Interaction, setting: app_commands.Choice[str] = None, value: str = None):
+    if setting is None:
+        await run_command(interaction, 'config')
+    elif value:
+        await run_command(interaction, 'config', f"set {setting.value} {value}")
+    else:
+        await run_command(interaction, 'config', f"unset {setting.value}")
+
+@app_commands.command(name="auth", description="Authorize a user to use the bot (bot owner only)")
+@app_commands.describe(user="User to authorize")
+async def slash_auth(interaction: discord.Interaction, user: discord.User):
+    await run_command(interaction, 'auth', str(user.id))
+
+@app_commands.command(name="deauth", description="Revoke a user's access to the bot (bot owner only)")
+@app_commands.describe(user="User to deauthorize")
+async def slash_deauth(interaction: discord.Interaction, user: discord.User):
+    await run_command(interaction, 'deauth', str(user.id))
+
+# =============================================================================
+# RICH PRESENCE COMMANDS
+# =============================================================================
+
+presence = app_commands.Group(name="presence", description="Rich Presence settings", guild_only=True)
+
+@presence.command(name="status", description="Set the bot status")
+@app_commands.choices(status=[app_commands.Choice(name=name, value=name) for name in ("online", "idle", "dnd", "invisible")])
+async def presence_status(interaction: discord.Interaction, status: app_commands.Choice[str]):
+    await run_command(interaction, 'setstatus', status.value)
+
+@presence.command(name="activity", description="Set the activity text")
+async def presence_activity(interaction: discord.Interaction, text: str):
+    await run_command(interaction, 'setactivity', text)
+
+@presence.command(name="type", description="Set the activity type")
+@app_commands.choices(activity_type=[app_commands.Choice(name=name, value=name) for name in ("playing", "listening", "watching", "streaming", "competing")])
+async def presence_type(interaction: discord.Interaction, activity_type: app_commands.Choice[str]):
+    await run_command(interaction, 'settype', activity_type.value)
+
+@presence.command(name="rotation", description="Rotate activity texts on a timer (no texts turns it off)")
+@app_commands.describe(seconds="Seconds between texts", texts="Texts separated by |")
+async def presence_rotation(interaction: discord.Interaction, seconds: app_commands.Range[int, 1, 86400] = None, texts: str = None):
+    await run_command(interaction, 'setrotation', f"{seconds} {texts}" if seconds and texts else "off")
+
+@presence.command(name="streaming", description="Enable or disable the streaming presence")
+async def presence_streaming(interaction: discord.Interaction, enabled: bool):
+    await run_command(interaction, 'setstreaming', str(enabled).lower())
+
+@presence.command(name="streamtitle", description="Set the stream title")
+async def presence_streamtitle(interaction: discord.Interaction, title: str):
+    await run_command(interaction, 'setstreamtitle', title)
+
+@presence.command(name="streamurl", description="Set the stream URL")
+async def presence_streamurl(interaction: discord.Interaction, url: str):
+    await run_command(interaction, 'setstreamurl', quote(url))
+
+@presence.command(name="servercount", description="Show or hide the server count")
+async def presence_servercount(interaction: discord.Interaction, show: bool):
+    await run_command(interaction, 'setservercount', str(show).lower())
+
+@presence.command(name="membercount", description="Show or hide the member count")
+async def presence_membercount(interaction: discord.Interaction, show: bool):
+    await run_command(interaction, 'setmembercount', str(show).lower())
+
+@presence.command(name="largeimage", description="Set the large image key")
+async def presence_largeimage(interaction: discord.Interaction, key: str):
+    await run_command(interaction, 'setlargeimage', quote(key))
+
+@presence.command(name="largetext", description="Set the large image text")
+async def presence_largetext(interaction: discord.Interaction, text: str):
+    await run_command(interaction, 'setlargetext', text)
+
+@presence.command(name="smallimage", description="Set the small image key")
+async def presence_smallimage(interaction: discord.Interaction, key: str):
+    await run_command(interaction, 'setsmallimage', quote(key))
+
+@presence.command(name="smalltext", description="Set the small image text")
+async def presence_smalltext(interaction: discord.Interaction, text: str):
+    await run_command(interaction, 'setsmalltext', text)
+
+@presence.command(name="refresh", description="Send the current presence again")
+async def presence_refresh(interaction: discord.Interaction):
+    await run_command(interaction, 'refreshpresence')
+
+@presence.command(name="reset", description="Reset the presence to the defaults")
+async def presence_reset(interaction: discord.Interaction):
+    await run_command(interaction, 'resetpresence')
+
+@presence.command(name="info", description="Show the current presence settings")
+async def presence_info(interaction: discord.Interaction):
+    await run_command(interaction, 'presenceinfo')
+
+@presence.command(name="checkimages", description="Check the configured image keys")
+async def presence_checkimages(interaction: discord.Interaction):
+    await run_command(interaction, 'checkimages')
+
+@presence.command(name="help", description="Rich Presence guide")
+async def presence_help(interaction: discord.Interaction):
+    await run_command(interaction, 'presencehelp')
+
+# =============================================================================
+# EXTENSION SETUP
+# =============================================================================
+
+APP_COMMANDS = SIMPLE_COMMANDS + [
+    slash_moveall, slash_servermoveall, slash_back, slash_setupwaiting, slash_role, slash_nick, slash_massban,
+    slash_audit, slash_ca, slash_config, slash_auth, slash_deauth, presence,
+]
+
+async def setup(bot):
+    for command in APP_COMMANDS:
+        bot.tree.add_command(command)
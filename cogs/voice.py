@@ -0,0 +1,332 @@
+# voice.py - Voice channel moderation commands for the BrainAllianceFX Bot
+# Loaded as the cogs.voice extension on first use of one of its commands; hot-reloadable with .reload
+
+import discord
+from discord.ext import commands
+
+from messages import get_error_message, get_success_message
+from move_history import move_history, MoveAction, plan_restore
+from batch_executor import run_batch, member_bucket, ProgressReporter
+from command_helpers import log_command, log_to_discord, report_batch_failures, resolve_voice_channel_by_query
+
+# Prefix command: .muteall
+@commands.command(name="muteall", description="Mutes all members in the user's voice channel except themselves")
+async def muteall(ctx):
+    if not ctx.author.voice or not ctx.author.voice.channel:
+        log_command(ctx.author, 'muteall', 'failed | Reason: caller not in a voice channel')
+        await ctx.send(get_error_message("not_in_voice"))
+        return
+
+    voice_channel = ctx.author.voice.channel
+    targets = [member for member in voice_channel.members if member != ctx.author]
+
+    progress = ProgressReporter(ctx, "Muting")
+    result = await run_batch(targets, lambda member: member.edit(mute=True), member_bucket(ctx.guild), on_progress=progress)
+    await progress.finish()
+    await report_batch_failures(ctx, 'muteall', "mute", result)
+
+    members_muted = len(result.succeeded)
+    muted_names = [member.name for member in result.succeeded]
+    await ctx.send(get_success_message("muted_users", count=members_muted, channel_name=voice_channel.name))
+    details = f"Members muted: {members_muted} | " + (", ".join(muted_names) if muted_names else "none") + f" | Channel: {voice_channel.name}"
+    log_command(ctx.author, 'muteall', details)
+    await log_to_discord(ctx.bot, ctx.author, 'muteall', details=details)
+
+# Prefix command: .unmuteall
+@commands.command(name="unmuteall", description="Unmutes all members in the user's voice channel except themselves")
+async def unmuteall(ctx):
+    if not ctx.author.voice or not ctx.author.voice.channel:
+        log_command(ctx.author, 'unmuteall', 'failed | Reason: caller not in a voice channel')
+        await ctx.send(get_error_message("not_in_voice"))
+        return
+
+    voice_channel = ctx.author.voice.channel
+    targets = [member for member in voice_channel.members if member != ctx.author]
+
+    progress = ProgressReporter(ctx, "Unmuting")
+    result = await run_batch(targets, lambda member: member.edit(mute=False), member_bucket(ctx.guild), on_progress=progress)
+    await progress.finish()
+    await report_batch_failures(ctx, 'unmuteall', "unmute", result)
+
+    members_unmuted = len(result.succeeded)
+    unmuted_names = [member.name for member in result.succeeded]
+    await ctx.send(get_success_message("unmuted_users", count=members_unmuted, channel_name=voice_channel.name))
+    details = f"Members unmuted: {members_unmuted} | " + (", ".join(unmuted_names) if unmuted_names else "none") + f" | Channel: {voice_channel.name}"
+    log_command(ctx.author, 'unmuteall', details)
+    await log_to_discord(ctx.bot, ctx.author, 'unmuteall', details=details)
+
+# Prefix command: .moveall CHANNELID (UPDATED WITH ROLLBACK SUPPORT)
+@commands.command(name="moveall", description="Moves all members from the user's voice channel to the specified channel")
+async def moveall(ctx, channel: str):
+    if not ctx.author.voice or not ctx.author.voice.channel:
+        log_command(ctx.author, 'moveall', 'failed | Reason: caller not in a voice channel')
+        await ctx.send(get_error_message("not_in_voice"))
+        return
+
+    # Resolve destination channel by ID or fuzzy name
+    try:
+        destination_channel = resolve_voice_channel_by_query(ctx.guild, channel)
+        if not isinstance(destination_channel, discord.VoiceChannel):
+            log_command(ctx.author, 'moveall', 'failed | Reason: destination is not a voice channel')
+            await ctx.send(get_error_message("not_voice_channel"))
+            return
+    except ValueError as ve:
+        if str(ve) == "no_voice_channels":
+            await ctx.send(get_error_message("no_voice_channels"))
+        else:
+            await ctx.send(get_error_message("channel_not_found_query", query=channel))
+        log_command(ctx.author, 'moveall', f"failed | Channel not found from query: {channel}")
+        return
+    except discord.HTTPException as e:
+        log_command(ctx.author, 'moveall', f"failed | HTTP error while resolving channel '{channel}': {e}")
+        await ctx.send(get_error_message("fetch_error", type="channel", error=e))
+        return
+
+    source_channel = ctx.author.voice.channel
+
+    # Move all members including the command issuer
+    progress = ProgressReporter(ctx, "Moving")
+    result = await run_batch(list(source_channel.members), lambda member: member.move_to(destination_channel), member_bucket(ctx.guild), on_progress=progress)
+    await progress.finish()
+    await report_batch_failures(ctx, 'moveall', "move", result)
+
+    members_moved = len(result.succeeded)
+    moved_names = [member.name for member in result.succeeded]
+
+    # Store original positions of moved members for rollback
+    user_positions = {member.id: source_channel.id for member in result.succeeded}
+
+    # Store the move action for potential rollback
+    if user_positions:
+        await move_history.push(ctx.guild.id, MoveAction('moveall', ctx.author.id, destination_channel.id, user_positions))
+
+    await ctx.send(get_success_message("moved_users_channel", 
+                                     count=members_moved, 
+                                     source_name=source_channel.name, 
+                                     source_id=source_channel.id,
+                                     dest_name=destination_channel.name, 
+                                     dest_id=destination_channel.id))
+    details = (
+        f"Members moved: {members_moved} | " + (", ".join(moved_names) if moved_names else "none") +
+        f" | From: {source_channel.name} ({source_channel.id}) -> To: {destination_channel.name} ({destination_channel.id})"
+    )
+    log_command(ctx.author, 'moveall', details, targets={'channel': destination_channel.id, 'members': list(user_positions)})
+    await log_to_discord(ctx.bot, ctx.author, 'moveall', args=[channel], details=details)
+
+# Prefix command: .servermoveall CHANNELID (NEW)
+@commands.command(name="servermoveall", description="Moves all users from all voice channels in the server to the specified channel")
+async def servermoveall(ctx, channel: str):
+    # Resolve destination channel by ID or fuzzy name
+    try:
+        destination_channel = resolve_voice_channel_by_query(ctx.guild, channel)
+        if not isinstance(destination_channel, discord.VoiceChannel):
+            log_command(ctx.author, 'servermoveall', 'failed | Reason: destination is not a voice channel')
+            await ctx.send(get_error_message("not_voice_channel"))
+            return
+    except ValueError as ve:
+        if str(ve) == "no_voice_channels":
+            await ctx.send(get_error_message("no_voice_channels"))
+        else:
+            await ctx.send(get_error_message("channel_not_found_query", query=channel))
+        log_command(ctx.author, 'servermoveall', f"failed | Channel not found from query: {channel}")
+        return
+    except discord.HTTPException as e:
+        log_command(ctx.author, 'servermoveall', f"failed | HTTP error while resolving channel '{channel}': {e}")
+        await ctx.send(get_error_message("fetch_error", type="channel", error=e))
+        return
+
+    # Get all voice channels in the server
+    voice_channels = [channel for channel in ctx.guild.channels if isinstance(channel, discord.VoiceChannel)]
+    
+    if not voice_channels:
+        await ctx.send(get_error_message("no_voice_channels"))
+        return
+
+    # Collect members from all voice channels except the destination
+    source_channel_ids = {}
+    channels_affected = 0
+    for channel in voice_channels:
+        if channel.id == destination_channel.id:  # Skip if it's the destination channel
+            continue
+        if len(channel.members) > 0:
+            channels_affected += 1
+            for member in channel.members:
+                source_channel_ids[member] = channel.id
+
+    # Move all members from all voice channels to destination
+    progress = ProgressReporter(ctx, "Moving")
+    result = await run_batch(list(source_channel_ids), lambda member: member.move_to(destination_channel), member_bucket(ctx.guild), on_progress=progress)
+    await progress.finish()
+    await report_batch_failures(ctx, 'servermoveall', "move", result)
+
+    members_moved = len(result.succeeded)
+    moved_names = [member.name for member in result.succeeded]
+
+    # Store original positions of moved members for rollback
+    user_positions = {member.id: source_channel_ids[member] for member in result.succeeded}
+
+    # Store the move action for potential rollback
+    if user_positions:
+        await move_history.push(ctx.guild.id, MoveAction('servermoveall', ctx.author.id, destination_channel.id, user_positions))
+
+    await ctx.send(get_success_message("moved_users_server",
+                                     count=members_moved,
+                                     channels_count=channels_affected,
+                                     dest_name=destination_channel.name,
+                                     dest_id=destination_channel.id))
+    details = (
+        f"Members moved: {members_moved} | " + (", ".join(moved_names) if moved_names else "none") +
+        f" | To: {destination_channel.name} ({destination_channel.id}) | Channels affected: {channels_affected}"
+    )
+    log_command(ctx.author, 'servermoveall', details, targets={'channel': destination_channel.id, 'members': list(user_positions)})
+    await log_to_discord(ctx.bot, ctx.author, 'servermoveall', args=[channel], details=details)
+
+# Prefix command: .back [STEPS|list] (ROLLBACK SYSTEM)
+@commands.command(name="back", description="Rollbacks the last move action(s), returning users to their original channels")
+async def back(ctx, steps: str = "1"):
+    await move_history.ensure_loaded()
+
+    # Show the undo history for this server
+    if steps.lower() == "list":
+        actions = move_history.actions(ctx.guild.id)
+        if not actions:
+            await ctx.send(get_error_message("no_rollback_data"))
+            return
+        lines = []
+        for number, action in enumerate(actions, start=1):
+            destination = ctx.guild.get_channel(action.destination_channel_id)
+            destination_name = destination.name if destination else action.destination_channel_id
+            lines.append(get_success_message(
+                "rollback_history_entry",
+                step=number,
+                type=action.type,
+                count=len(action.user_positions),
+                dest_name=destination_name,
+                author_id=action.author_id,
+                timestamp=int(action.timestamp)
+            ))
+        embed = discord.Embed(title="⏮️ Move History", description="\n".join(lines), color=0x5865F2)
+        embed.set_footer(text="Use .back <N> to undo the last N moves")
+        await ctx.send(embed=embed)
+        log_command(ctx.author, 'back', f"success | Listed {len(actions)} move action(s)")
+        return
+
+    if not steps.isdigit() or int(steps) < 1:
+        log_command(ctx.author, 'back', f'failed | Reason: invalid steps {steps}')
+        await ctx.send(get_error_message("rollback_invalid_steps"))
+        return
+
+    # One restore at a time per server; other servers are unaffected
+    async with move_history.lock(ctx.guild.id):
+        actions = move_history.pop(ctx.guild.id, int(steps))
+        if not actions:
+            log_command(ctx.author, 'back', 'failed | Reason: no rollback data')
+            await ctx.send(get_error_message("no_rollback_data"))
+            return
+
+        # Work out where every member should go back to
+        moves = []
+        for user_id, (expected_channel_id, original_channel_id) in plan_restore(actions).items():
+            member = ctx.guild.get_member(user_id)
+            if not member:
+                log_command(ctx.author, 'back', f"skip | Member not in guild anymore: {user_id}")
+                continue  # Skip if member is no longer in the guild
+            if not member.voice or not member.voice.channel:
+                log_command(ctx.author, 'back', f"skip | Member disconnected: {member.name} ({member.id})")
+                continue  # Skip if member disconnected
+            if member.voice.channel.id != expected_channel_id:
+                log_command(ctx.author, 'back', f"skip | Member not in destination: {member.name} ({member.id})")
+                continue  # Skip if member is no longer in the destination channel
+            original_channel = ctx.guild.get_channel(original_channel_id)
+            if not isinstance(original_channel, discord.VoiceChannel):
+                log_command(ctx.author, 'back', f"skip | Channel not found for user {user_id}")
+                continue  # Skip if original channel is no longer a voice channel
+            moves.append((member, original_channel))
+
+        # Move users back to their original channels
+        progress = ProgressReporter(ctx, "Moving back")
+        result = await run_batch(moves, lambda move: move[0].move_to(move[1]), member_bucket(ctx.guild), on_progress=progress)
+        await progress.finish()
+
+    await report_batch_failures(ctx, 'back', "move", result, name_of=lambda move: move[0].name)
+
+    members_moved_back = len(result.succeeded)
+    channels_affected = len({channel.id for _, channel in result.succeeded})
+
+    await ctx.send(get_success_message("rollback_success", count=members_moved_back, channels_count=channels_affected))
+    log_command(ctx.author, 'back', f"success | Steps undone: {len(actions)} | Members moved back: {members_moved_back} | Channels affected: {channels_affected}")
+    await log_to_discord(ctx.bot, ctx.author, 'back', args=[steps], details=f"Steps undone: {len(actions)} | Members moved back: {members_moved_back} | Channels affected: {channels_affected}")
+
+# Prefix command: .kickall
+@commands.command(name="kickall", description="Kicks all members from the user's voice channel except themselves")
+async def kickall(ctx):
+    if not ctx.author.voice or not ctx.author.voice.channel:
+        log_command(ctx.author, 'kickall', 'failed | Reason: caller not in a voice channel')
+        await ctx.send(get_error_message("not_in_voice"))
+        return
+
+    voice_channel = ctx.author.voice.channel
+    targets = [member for member in voice_channel.members if member != ctx.author]
+
+    # Kick all members except the command issuer (None disconnects them)
+    progress = ProgressReporter(ctx, "Kicking")
+    result = await run_batch(targets, lambda member: member.move_to(None), member_bucket(ctx.guild), on_progress=progress)
+    await progress.finish()
+    await report_batch_failures(ctx, 'kickall', "kick", result)
+
+    members_kicked = len(result.succeeded)
+    kicked_names = [member.name for member in result.succeeded]
+
+    await ctx.send(get_success_message("kicked_users_channel",
+                                     count=members_kicked,
+                                     channel_name=voice_channel.name,
+                                     channel_id=voice_channel.id))
+    details = f"Members kicked: {members_kicked} | " + (", ".join(kicked_names) if kicked_names else "none") + f" | Channel: {voice_channel.name} ({voice_channel.id})"
+    log_command(ctx.author, 'kickall', details)
+    await log_to_discord(ctx.bot, ctx.author, 'kickall', details=details)
+
+# Prefix command: .serverkickall
+@commands.command(name="serverkickall", description="Kicks all members from all voice channels in the server")
+async def serverkickall(ctx):
+    # Get all voice channels in the server
+    voice_channels = [channel for channel in ctx.guild.channels if isinstance(channel, discord.VoiceChannel)]
+
+    if not voice_channels:
+        log_command(ctx.author, 'serverkickall', 'failed | Reason: no voice channels')
+        await ctx.send(get_error_message("no_voice_channels"))
+        return
+
+    # Kick all members from all voice channels (None disconnects them)
+    occupied = [channel for channel in voice_channels if len(channel.members) > 0]
+    channels_affected = len(occupied)
+    targets = [member for channel in occupied for member in channel.members]
+
+    progress = ProgressReporter(ctx, "Kicking")
+    result = await run_batch(targets, lambda member: member.move_to(None), member_bucket(ctx.guild), on_progress=progress)
+    await progress.finish()
+    await report_batch_failures(ctx, 'serverkickall', "kick", result)
+
+    members_kicked = len(result.succeeded)
+    kicked_names = [member.name for member in result.succeeded]
+
+    await ctx.send(get_success_message("kicked_users_server",
+                                     count=members_kicked,
+                                     channels_count=channels_affected,
+                                     server_name=ctx.guild.name,
+                                     server_id=ctx.guild.id))
+    details = (
+        f"Members kicked: {members_kicked} | " + (", ".join(kicked_names) if kicked_names else "none") +
+        f" | Channels affected: {channels_affected}"
+    )
+    log_command(ctx.author, 'serverkickall', details)
+    await log_to_discord(ctx.bot, ctx.author, 'serverkickall', details=details)
+
+# =============================================================================
+# EXTENSION SETUP
+# =============================================================================
+
+COMMANDS = (muteall, unmuteall, moveall, servermoveall, back, kickall, serverkickall,)
+
+async def setup(bot):
+    for command in COMMANDS:
+        bot.add_command(command)
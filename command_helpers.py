@@ -0,0 +1,162 @@
+# command_helpers.py - Shared command helpers for the BrainAllianceFX Bot
+# Logging, batch reporting and name resolution used by the command extensions in cogs/
+
+import os
+import asyncio
+
+import discord
+
+from messages import get_error_message
+from audit_log import audit_log
+from discord_log import log_sink
+from batch_executor import describe_error
+from resolver import resolver
+from member_lookup import member_lookup
+
+LOG_CHANNEL_ID = os.getenv('LOG_CHANNEL_ID')
+
+# Names listed in bulk command replies before "and N more"
+REPLY_LISTED_NAMES = 20
+
+# --- Console logging helper ---
+def log_command(author, command_name, details, targets=None):
+    # Structured copy for the local audit log (buffered, written in the background)
+    try:
+        audit_log.record(author, command_name, details, targets=targets)
+    except Exception as e:
+        print(f"Failed to record audit entry: {e}")
+    try:
+        author_name = getattr(author, 'name', str(author))
+        print(f"! {author_name} triggered .{command_name} | {details}")
+    except Exception:
+        # Fallback to avoid crashing on logging
+        try:
+            print(f"! [unknown] triggered .{command_name} | {details}")
+        except Exception:
+            pass
+
+# --- Discord logging helper ---
+async def log_to_discord(bot, author, command_name, args=None, details=None):
+    """Queue a command execution log for the Discord log channel.
+
+    The embed is built now and sent in the background by log_sink, so the
+    calling command never waits on the log channel.
+    """
+    if not LOG_CHANNEL_ID:
+        return  # Skip if no log channel configured
+    
+    try:
+        # Create embed for logging
+        embed = discord.Embed(
+            title="🤖 Command Executed",
+            color=0x00ff00,
+            timestamp=discord.utils.utcnow()
+        )
+        
+        # Add user information
+        embed.add_field(
+            name="👤 User",
+            value=f"{author.mention} ({author.name}#{author.discriminator})\nID: {author.id}",
+            inline=True
+        )
+        
+        # Add command information
+        embed.add_field(
+            name="⚡ Command",
+            value=f"`.{command_name}`",
+            inline=True
+        )
+        
+        # Add arguments if provided
+        if args is not None:
+            args_str = " ".join(str(arg) for arg in args) if isinstance(args, (list, tuple)) else str(args)
+            embed.add_field(
+                name="📝 Arguments",
+                value=f"`{args_str[:1000]}`" if args_str else "None",  # Discord field limit
+                inline=False
+            )
+        
+        # Add additional details if provided
+        if details:
+            embed.add_field(
+                name="📋 Details",
+                value=details[:1024],  # Discord field limit
+                inline=False
+            )
+        
+        # Add server information
+        if hasattr(author, 'guild') and author.guild:
+            embed.add_field(
+                name="🏠 Server",
+                value=f"{author.guild.name} ({author.guild.id})",
+                inline=True
+            )
+        
+        # Add channel information
+        if hasattr(author, 'voice') and author.voice and author.voice.channel:
+            embed.add_field(
+                name="🔊 Voice Channel",
+                value=f"{author.voice.channel.name} ({author.voice.channel.id})",
+                inline=True
+            )
+        
+        log_sink.enqueue(embed)
+        
+    except Exception as e:
+        # Don't crash the bot if logging fails
+        print(f"Failed to log to Discord: {e}")
+        pass
+
+# --- Batch failure reporting helper ---
+async def report_batch_failures(ctx, command_name, action, result, name_of=lambda member: member.name):
+    """Log every failed item of a batch and send one summary message"""
+    if not result.failed:
+        return
+    failed_names = []
+    for item, error in result.failed:
+        log_command(ctx.author, command_name, f"failed | Could not {action} {name_of(item)}: {error}")
+        failed_names.append(f"{name_of(item)} ({describe_error(error)})")
+    await ctx.send(get_error_message("batch_failed", action=action, failed_count=len(failed_names), failed_names=summarize_names(failed_names)))
+
+def summarize_names(names, limit=REPLY_LISTED_NAMES):
+    """Join names for a reply, listing at most limit of them"""
+    if len(names) <= limit:
+        return ", ".join(names)
+    return f"{', '.join(names[:limit])} and {len(names) - limit} more"
+
+# --- Voice channel resolution helper ---
+def resolve_voice_channel_by_query(guild: discord.Guild, query: str):
+    """Resolve a voice channel by ID or fuzzy name within the given guild.
+
+    Returns a discord.VoiceChannel or raises ValueError if not found/invalid.
+    """
+    return resolver.resolve_voice_channel(guild, query)
+
+# --- Member resolution helper ---
+def resolve_member_by_query(guild: discord.Guild, query: str):
+    """Resolve a member by mention, ID or fuzzy display/name within the given guild.
+
+    Returns a discord.Member or raises ValueError if not found/invalid.
+    """
+    return resolver.resolve_member(guild, query)
+
+async def fetch_member_by_query(guild: discord.Guild, query: str):
+    """resolve_member_by_query that also finds members missing from a partial member cache.
+
+    With lazy chunking, IDs/mentions are fetched and names searched through
+    the gateway before falling back to fuzzy matching of the cached members.
+    """
+    if not member_lookup.enabled or guild.chunked:
+        return resolve_member_by_query(guild, query)
+    try:
+        return await member_lookup.resolve(guild, query)
+    except (ValueError, discord.HTTPException, asyncio.TimeoutError):
+        return resolve_member_by_query(guild, query)
+
+# --- Role resolution helper ---
+def resolve_role_by_query(guild: discord.Guild, query: str):
+    """Resolve a role by ID or fuzzy name within the given guild.
+
+    Returns a discord.Role or raises ValueError if not found/invalid.
+    """
+    return resolver.resolve_role(guild, query)
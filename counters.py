@@ -0,0 +1,47 @@
+# counters.py - Live member/server counters for the BrainAllianceFX Bot
+# Seeded once from the guild cache and updated incrementally from join/remove events
+
+import discord
+
+# =============================================================================
+# GUILD COUNTERS
+# =============================================================================
+
+class GuildCounters:
+    """Total and per-guild member counts plus the server count, read in O(1)"""
+
+    def __init__(self):
+        self.guild_members = {}  # guild_id -> member count
+        self.members = 0
+
+    @property
+    def servers(self):
+        return len(self.guild_members)
+
+    def rebuild(self, guilds):
+        """Seed the counters from the guild cache (on ready)"""
+        self.guild_members = {guild.id: guild.member_count or 0 for guild in guilds}
+        self.members = sum(self.guild_members.values())
+
+    # --- Event hooks ---
+
+    def guild_joined(self, guild: discord.Guild):
+        self.guild_removed(guild)
+        self.guild_members[guild.id] = guild.member_count or 0
+        self.members += self.guild_members[guild.id]
+
+    def guild_removed(self, guild: discord.Guild):
+        self.members -= self.guild_members.pop(guild.id, 0)
+
+    def member_joined(self, member: discord.Member):
+        if member.guild.id in self.guild_members:
+            self.guild_members[member.guild.id] += 1
+            self.members += 1
+
+    def member_removed(self, member: discord.Member):
+        if self.guild_members.get(member.guild.id, 0) > 0:
+            self.guild_members[member.guild.id] -= 1
+            self.members -= 1
+
+# Global instance
+guild_counters = GuildCounters()
@@ -0,0 +1,140 @@
+# discord_log.py - Background Discord log channel sink for the BrainAllianceFX Bot
+# Commands enqueue log embeds without waiting; a consumer task sends them in batches
+
+import asyncio
+import time
+
+import discord
+
+# =============================================================================
+# SINK SETTINGS
+# =============================================================================
+
+# Maximum queued embeds before new entries are dropped (and summarized)
+LOG_QUEUE_SIZE = 500
+
+# Embeds packed into one message (Discord allows up to 10)
+LOG_BATCH_SIZE = 10
+
+# Characters across all embeds of one message (Discord limit)
+LOG_MESSAGE_MAX_CHARS = 6000
+
+# Seconds to wait for more embeds before flushing a partial batch
+LOG_FLUSH_INTERVAL = 2.0
+
+# =============================================================================
+# DISCORD LOG SINK
+# =============================================================================
+
+class DiscordLogSink:
+    """Queue of log embeds flushed to the log channel by a background task.
+
+    enqueue() never blocks: when the queue is full the entry is dropped and
+    counted, and the next flush carries a summary embed with the drop count.
+    A batch is split into messages within Discord's embed count and size
+    limits; embeds of a rejected message are retried one by one, and the ones
+    that still fail are counted as dropped too.
+    """
+
+    def __init__(self, maxsize: int = LOG_QUEUE_SIZE, batch_size: int = LOG_BATCH_SIZE, flush_interval: float = LOG_FLUSH_INTERVAL):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.bot = None
+        self.channel_id = None
+        self.dropped = 0
+        self.sent = 0
+        self._queue = None
+        self._task = None
+
+    def configure(self, bot, channel_id):
+        """Set the bot and log channel used by the consumer"""
+        self.bot = bot
+        self.channel_id = int(channel_id) if channel_id else None
+
+    def enqueue(self, embed: discord.Embed):
+        """Queue an embed for the log channel without waiting"""
+        if not self.channel_id:
+            return
+        self._ensure_consumer()
+        try:
+            self._queue.put_nowait(embed)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    @property
+    def pending(self):
+        return self._queue.qsize() if self._queue else 0
+
+    def _ensure_consumer(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._consume())
+
+    async def _consume(self):
+        while True:
+            batch = [await self._queue.get()]
+            # Collect more embeds until the batch is full or the flush interval passes,
+            # leaving room for the dropped-entries summary when there is one
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size - (1 if self.dropped else 0):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        if self.dropped:
+            batch.append(self._dropped_embed(self.dropped))
+            self.dropped = 0
+        channel = self.bot.get_channel(self.channel_id) if self.bot else None
+        if not channel:
+            return  # Skip if channel not found
+        for embeds in self._pack(batch):
+            await self._send(channel, embeds)
+
+    def _pack(self, embeds):
+        """Split embeds into messages of at most batch_size embeds and LOG_MESSAGE_MAX_CHARS characters"""
+        message, size = [], 0
+        for embed in embeds:
+            length = len(embed)
+            if message and (len(message) >= self.batch_size or size + length > LOG_MESSAGE_MAX_CHARS):
+                yield message
+                message, size = [], 0
+            message.append(embed)
+            size += length
+        if message:
+            yield message
+
+    async def _send(self, channel, embeds):
+        try:
+            await channel.send(embeds=embeds)
+            self.sent += len(embeds)
+        except discord.HTTPException as e:
+            if len(embeds) > 1:
+                # One bad embed must not take the rest of the message with it
+                for embed in embeds:
+                    await self._send(channel, [embed])
+                return
+            self.dropped += 1
+            print(f"Failed to log to Discord: {e}")
+        except Exception as e:
+            # Don't crash the consumer if logging fails
+            self.dropped += len(embeds)
+            print(f"Failed to log to Discord: {e}")
+
+    def _dropped_embed(self, count: int):
+        return discord.Embed(
+            title="⚠️ Log Entries Dropped",
+            description=f"{count} log entr{'y' if count == 1 else 'ies'} dropped while the log queue was full.",
+            color=0xFFA500,
+            timestamp=discord.utils.utcnow()
+        )
+
+# Global instance
+log_sink = DiscordLogSink()
@@ -0,0 +1,168 @@
+# guild_config.py - Per-guild configuration store for the BrainAllianceFX Bot
+# Settings live in a SQLite table loaded once into memory; .config writes through
+
+import asyncio
+import contextlib
+import json
+import os
+import sqlite3
+
+# =============================================================================
+# CONFIG SETTINGS
+# =============================================================================
+
+GUILD_CONFIG_DB_FILE = os.getenv('GUILD_CONFIG_DB_FILE', 'guild_config.db')
+
+# Configurable keys: key -> (kind, description). Kinds: role, category, user, users, text
+SETTINGS = {
+    'trigger_role': ('role', "Role that starts the Waiting Setup"),
+    'waiting_role': ('role', "Role given to members in the waiting room"),
+    'waiting_category': ('category', "Category of the private waiting channels"),
+    'mentor_role': ('role', "Role assigned by .mentor"),
+    'mentor_contact': ('user', "User the .mentor announcement points to"),
+    'call_users': ('users', "Users that can .call each other"),
+    'call_link': ('text', "Link sent by .call"),
+    'protected_users': ('users', "Users .massban never bans"),
+}
+
+# Keys that must all be set for the Waiting Setup to run in a guild
+WAITING_SETUP_KEYS = ('trigger_role', 'waiting_role', 'waiting_category')
+
+# Values the bot used before per-guild config; seeded into the guild that has this trigger role
+LEGACY_TRIGGER_ROLE_ID = 1424547689772613895
+LEGACY_SETTINGS = {
+    'trigger_role': LEGACY_TRIGGER_ROLE_ID,
+    'waiting_role': 1424710209829605478,
+    'waiting_category': 1424710355271290950,
+    'mentor_role': 1422365715721224192,
+    'mentor_contact': 769582403093004288,
+    'call_users': {'769582403093004288': 'Ale', '539464122027343873': 'Anto', '1420541599334662287': 'Sandro'},
+    'call_link': "https://discord.com/channels/1388900966727680141/1388900967948353568",
+    'protected_users': {'539464122027343873': 'StaffBotOwner'},
+}
+
+# =============================================================================
+# GUILD CONFIG STORE
+# =============================================================================
+
+class GuildConfigStore:
+    """Per-guild settings, keyed by guild ID.
+
+    Everything is read into memory once (ensure_loaded) and every change is
+    written through to SQLite off the event loop. Role/channel/user settings
+    are stored as int IDs, user lists as {str(user_id): name}. Event handlers
+    check `waiting_guilds`, a frozenset of guilds with a complete Waiting
+    Setup config, and return immediately for every other guild.
+    """
+
+    def __init__(self, db_path: str = GUILD_CONFIG_DB_FILE):
+        self.db_path = db_path
+        self.loaded = False
+        self.waiting_guilds = frozenset()
+        self._settings = {}  # guild_id -> {key: value}
+        self._lock = asyncio.Lock()
+        self._db_ready = False
+
+    # --- Reading ---
+
+    def get(self, guild_id: int, key: str, default=None):
+        return self._settings.get(guild_id, {}).get(key, default)
+
+    def settings(self, guild_id: int):
+        """Copy of every configured value of guild_id"""
+        return dict(self._settings.get(guild_id, {}))
+
+    def is_configured(self, guild_id: int):
+        return guild_id in self._settings
+
+    # --- Loading ---
+
+    async def ensure_loaded(self):
+        if self.loaded:
+            return
+        async with self._lock:
+            if self.loaded:
+                return
+            try:
+                rows = await asyncio.to_thread(self._read_all)
+            except Exception as e:
+                print(f"❌ Error loading guild config: {e}")
+                rows = []
+            for guild_id, key, value in rows:
+                if key in SETTINGS:
+                    self._settings.setdefault(guild_id, {})[key] = json.loads(value)
+            self._refresh()
+            self.loaded = True
+
+    async def seed_legacy(self, guilds):
+        """Give the unconfigured guild that has the legacy trigger role the legacy settings"""
+        await self.ensure_loaded()
+        for guild in guilds:
+            if not self.is_configured(guild.id) and guild.get_role(LEGACY_TRIGGER_ROLE_ID) is not None:
+                await self.update(guild.id, LEGACY_SETTINGS)
+                print(f"⚙️ Seeded {guild.name} with the legacy configuration")
+
+    # --- Writing ---
+
+    async def set(self, guild_id: int, key: str, value):
+        await self.update(guild_id, {key: value})
+
+    async def update(self, guild_id: int, values: dict):
+        """Set several keys of guild_id (a None value removes the key)"""
+        unknown = [key for key in values if key not in SETTINGS]
+        if unknown:
+            raise KeyError(unknown[0])
+        await self.ensure_loaded()
+        async with self._lock:
+            settings = self._settings.setdefault(guild_id, {})
+            for key, value in values.items():
+                if value is None:
+                    settings.pop(key, None)
+                else:
+                    settings[key] = value
+            if not settings:
+                del self._settings[guild_id]
+            self._refresh()
+            try:
+                await asyncio.to_thread(self._write, guild_id, values)
+            except Exception as e:
+                print(f"❌ Error saving guild config: {e}")
+
+    async def unset(self, guild_id: int, key: str):
+        await self.update(guild_id, {key: None})
+
+    # --- Internals ---
+
+    def _refresh(self):
+        self.waiting_guilds = frozenset(
+            guild_id for guild_id, settings in self._settings.items()
+            if all(key in settings for key in WAITING_SETUP_KEYS)
+        )
+
+    def _read_all(self):
+        with contextlib.closing(self._connect()) as db:
+            return db.execute("SELECT guild_id, key, value FROM guild_config").fetchall()
+
+    def _write(self, guild_id, values):
+        with contextlib.closing(self._connect()) as db, db:
+            for key, value in values.items():
+                if value is None:
+                    db.execute("DELETE FROM guild_config WHERE guild_id = ? AND key = ?", (guild_id, key))
+                else:
+                    db.execute(
+                        "INSERT OR REPLACE INTO guild_config (guild_id, key, value) VALUES (?, ?, ?)",
+                        (guild_id, key, json.dumps(value, ensure_ascii=False))
+                    )
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path)
+        if not self._db_ready:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS guild_config ("
+                " guild_id INTEGER, key TEXT, value TEXT, PRIMARY KEY (guild_id, key))"
+            )
+            self._db_ready = True
+        return db
+
+# Global instance
+guild_config = GuildConfigStore()
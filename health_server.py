@@ -0,0 +1,135 @@
+# health_server.py - Async health check and metrics server for the BrainAllianceFX Bot
+# Served from the bot's event loop (aiohttp), started in setup_hook and stopped on close
+
+import math
+import os
+import time
+
+from aiohttp import web
+
+from metrics import metrics, loop_lag
+
+# =============================================================================
+# HEALTH SETTINGS
+# =============================================================================
+
+try:
+    HEALTH_PORT = int(os.getenv("PORT", "8000"))
+except ValueError:
+    HEALTH_PORT = 8000
+
+# /healthz fails when the event loop lags more than this (seconds)
+HEALTH_MAX_LOOP_LAG = 5.0
+
+# /healthz fails when the gateway has been disconnected longer than this (seconds)
+HEALTH_DISCONNECT_GRACE = 120.0
+
+# =============================================================================
+# HEALTH SERVER
+# =============================================================================
+
+class HealthServer:
+    """HTTP endpoints for the hosting platform.
+
+    /healthz  liveness: the loop is responsive and the gateway is not stuck disconnected
+    /readyz   readiness: logged in, ready and connected to the gateway
+    /metrics  Prometheus text format
+    /         plain "Bot is running!" (kept for existing checks)
+    """
+
+    def __init__(self, port: int = HEALTH_PORT):
+        self.port = port
+        self.bot = None
+        self.started_at = time.time()
+        self.connected = False
+        self.disconnected_since = time.monotonic()
+        self._runner = None
+
+    async def start(self, bot):
+        """Bind the server on the running loop"""
+        self.bot = bot
+        app = web.Application()
+        app.router.add_get("/", self.handle_root)
+        app.router.add_get("/healthz", self.handle_healthz)
+        app.router.add_get("/readyz", self.handle_readyz)
+        app.router.add_get("/metrics", self.handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "0.0.0.0", self.port).start()
+        loop_lag.start()
+        print(f"🩺 Health server listening on port {self.port}")
+
+    async def stop(self):
+        loop_lag.stop()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    # --- Gateway state (from on_connect / on_disconnect / on_resumed) ---
+
+    def gateway_connected(self):
+        self.connected = True
+        self.disconnected_since = None
+
+    def gateway_disconnected(self):
+        if self.connected or self.disconnected_since is None:
+            self.disconnected_since = time.monotonic()
+        self.connected = False
+
+    # --- Status ---
+
+    def status(self):
+        bot = self.bot
+        latency = bot.latency if bot is not None else float('inf')
+        return {
+            "connected": self.connected,
+            "ready": bool(bot and bot.is_ready() and not bot.is_closed()),
+            "latency_ms": round(latency * 1000, 1) if math.isfinite(latency) else None,
+            "loop_lag_ms": round(loop_lag.lag * 1000, 1),
+            "loop_lag_max_ms": round(loop_lag.max_lag * 1000, 1),
+            "disconnected_for_s": round(time.monotonic() - self.disconnected_since, 1) if self.disconnected_since is not None else 0,
+            "uptime_s": round(time.time() - self.started_at),
+        }
+
+    # --- Handlers ---
+
+    async def handle_root(self, request):
+        return web.Response(text="Bot is running!")
+
+    async def handle_healthz(self, request):
+        status = self.status()
+        healthy = loop_lag.lag < HEALTH_MAX_LOOP_LAG and status["disconnected_for_s"] < HEALTH_DISCONNECT_GRACE
+        status["status"] = "ok" if healthy else "unhealthy"
+        return web.json_response(status, status=200 if healthy else 503)
+
+    async def handle_readyz(self, request):
+        status = self.status()
+        ready = status["ready"] and status["connected"]
+        status["status"] = "ready" if ready else "not ready"
+        return web.json_response(status, status=200 if ready else 503)
+
+    async def handle_metrics(self, request):
+        return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8", headers={"X-Content-Type-Options": "nosniff"})
+
+    def collect(self, registry):
+        """Metrics collector for gateway and loop state"""
+        status = self.status()
+        registry.set("bot_up", 1)
+        registry.set("bot_ready", int(status["ready"]))
+        registry.set("bot_gateway_connected", int(self.connected))
+        registry.set("bot_gateway_latency_seconds", self.bot.latency if self.bot is not None and math.isfinite(self.bot.latency) else float('inf'))
+        registry.set("bot_event_loop_lag_seconds", loop_lag.lag)
+        registry.set("bot_event_loop_lag_max_seconds", loop_lag.max_lag)
+        registry.set("bot_uptime_seconds", time.time() - self.started_at)
+
+# Global instance
+health_server = HealthServer()
+
+metrics.describe("bot_up", "gauge", "Always 1 while the process serves metrics")
+metrics.describe("bot_ready", "gauge", "1 when the bot is logged in and ready")
+metrics.describe("bot_gateway_connected", "gauge", "1 while the gateway websocket is connected")
+metrics.describe("bot_gateway_latency_seconds", "gauge", "Gateway heartbeat latency")
+metrics.describe("bot_event_loop_lag_seconds", "gauge", "Latest event-loop wake-up delay")
+metrics.describe("bot_event_loop_lag_max_seconds", "gauge", "Largest event-loop wake-up delay over the last minute")
+metrics.describe("bot_uptime_seconds", "gauge", "Seconds since the process started")
+metrics.add_collector(health_server.collect)
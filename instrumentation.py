@@ -0,0 +1,177 @@
+# instrumentation.py - Command latency and REST usage instrumentation for the BrainAllianceFX Bot
+# Per-command wall time, REST calls and rate-limit waits, with p50/p95/p99 latencies
+
+import collections
+import contextvars
+import logging
+import time
+
+import discord
+
+from metrics import metrics
+
+# =============================================================================
+# INSTRUMENTATION SETTINGS
+# =============================================================================
+
+# Recent invocations kept per command for percentiles
+LATENCY_SAMPLES = 500
+
+PERCENTILES = (50, 95, 99)
+
+# Invocation being measured in the current task (and the tasks it spawns)
+_current = contextvars.ContextVar('instrumented_invocation', default=None)
+
+# =============================================================================
+# STATS
+# =============================================================================
+
+class InvocationStats:
+    """Measurements for one command invocation"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.api_calls = 0
+        self.api_time = 0.0
+        self.ratelimit_wait = 0.0
+        self.closed = False
+
+class CommandStats:
+    """Aggregates and recent latency samples for one command"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.api_calls = 0
+        self.api_time = 0.0
+        self.ratelimit_wait = 0.0
+        self.samples = collections.deque(maxlen=LATENCY_SAMPLES)
+
+    def percentiles(self):
+        """{50: seconds, 95: seconds, 99: seconds} over the recent samples"""
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {p: 0.0 for p in PERCENTILES}
+        return {p: ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] for p in PERCENTILES}
+
+# =============================================================================
+# INSTRUMENTATION
+# =============================================================================
+
+class Instrumentation:
+    """Measures commands between before_invoke and after_invoke.
+
+    REST calls are counted by wrapping the bot's HTTP client. Time spent
+    queued on discord.py's rate limiter (and sleeping on 429 responses) is
+    recorded separately, so a slow command can be attributed to Discord's
+    limits or to our own code.
+    """
+
+    def __init__(self):
+        self.commands = collections.defaultdict(CommandStats)
+        self.rest_calls = 0
+
+    # --- Command hooks ---
+
+    def begin(self, ctx):
+        _current.set(InvocationStats())
+
+    def end(self, ctx):
+        stats = _current.get()
+        if stats is None or stats.closed or ctx.command is None:
+            return
+        # Tasks spawned by the command keep a reference; stop counting for them
+        stats.closed = True
+        elapsed = time.perf_counter() - stats.started
+        command = self.commands[ctx.command.qualified_name]
+        command.count += 1
+        command.errors += int(bool(ctx.command_failed))
+        command.api_calls += stats.api_calls
+        command.api_time += stats.api_time
+        command.ratelimit_wait += stats.ratelimit_wait
+        command.samples.append(elapsed)
+
+    # --- REST hooks ---
+
+    def install(self, http):
+        """Wrap http.request (and the rate limiter, when available) to measure REST usage"""
+        original_request = http.request
+
+        async def request(route, **kwargs):
+            stats = _current.get()
+            started = time.perf_counter()
+            status = "error"
+            try:
+                response = await original_request(route, **kwargs)
+                status = "ok"
+                return response
+            except discord.HTTPException as e:
+                status = str(e.status)
+                raise
+            finally:
+                self.rest_calls += 1
+                metrics.inc("bot_rest_requests_total", method=route.method, route=route.path, status=status)
+                if stats is not None and not stats.closed:
+                    stats.api_calls += 1
+                    stats.api_time += time.perf_counter() - started
+
+        http.request = request
+        self._install_ratelimit_timing()
+
+    def _install_ratelimit_timing(self):
+        ratelimit = getattr(discord.http, 'Ratelimit', None)
+        if ratelimit is None or getattr(ratelimit, '_instrumented', False):
+            return
+        for name in ('acquire', '_refresh'):
+            original = getattr(ratelimit, name, None)
+            if original is not None:
+                setattr(ratelimit, name, _timed_wait(original))
+        ratelimit._instrumented = True
+        # 429 retries sleep inside request(); their duration is only in the log record
+        logging.getLogger('discord.http').addHandler(_RetryAfterHandler())
+
+    # --- Reporting ---
+
+    def collect(self, registry):
+        """Metrics collector: per-command counts and latency quantiles"""
+        for name, command in self.commands.items():
+            registry.set("bot_command_invocations_total", command.count, command=name)
+            registry.set("bot_command_errors_total", command.errors, command=name)
+            registry.set("bot_command_api_calls_total", command.api_calls, command=name)
+            registry.set("bot_command_api_seconds_total", command.api_time, command=name)
+            registry.set("bot_command_ratelimit_wait_seconds_total", command.ratelimit_wait, command=name)
+            for p, value in command.percentiles().items():
+                registry.set("bot_command_latency_seconds", value, command=name, quantile=str(p / 100))
+
+def _timed_wait(method):
+    async def wrapper(*args, **kwargs):
+        stats = _current.get()
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            if stats is not None and not stats.closed:
+                stats.ratelimit_wait += time.perf_counter() - started
+    return wrapper
+
+class _RetryAfterHandler(logging.Handler):
+    """Adds the retry_after of discord.py's 429 warnings to the current invocation"""
+
+    def emit(self, record):
+        stats = _current.get()
+        if stats is None or stats.closed or not str(record.msg).startswith('We are being rate limited.'):
+            return
+        if len(record.args or ()) == 3 and isinstance(record.args[2], (int, float)):
+            stats.ratelimit_wait += record.args[2]
+
+# Global instance
+instrumentation = Instrumentation()
+
+metrics.describe("bot_rest_requests_total", "counter", "REST requests by method, route and outcome")
+metrics.describe("bot_command_invocations_total", "counter", "Completed command invocations")
+metrics.describe("bot_command_errors_total", "counter", "Command invocations that raised an error")
+metrics.describe("bot_command_api_calls_total", "counter", "REST calls made by commands")
+metrics.describe("bot_command_api_seconds_total", "counter", "Seconds commands spent in REST calls, rate-limit waits included")
+metrics.describe("bot_command_ratelimit_wait_seconds_total", "counter", "Seconds commands spent waiting on Discord rate limits")
+metrics.describe("bot_command_latency_seconds", "summary", "Command wall time over recent invocations")
+metrics.add_collector(instrumentation.collect)
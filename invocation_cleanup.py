@@ -0,0 +1,99 @@
+# invocation_cleanup.py - Background deletion of command messages for the BrainAllianceFX Bot
+# Commands start at once; their invocation messages are gathered per channel and bulk-deleted
+
+import asyncio
+import contextvars
+
+import discord
+
+from batch_executor import run_batch
+from metrics import metrics
+
+# =============================================================================
+# CLEANUP SETTINGS
+# =============================================================================
+
+# Seconds to gather invocation messages of a channel before deleting them
+CLEANUP_FLUSH_DELAY = 0.5
+
+# Messages per bulk-delete request (Discord maximum)
+CLEANUP_BULK_SIZE = 100
+
+# =============================================================================
+# INVOCATION CLEANER
+# =============================================================================
+
+class InvocationCleaner:
+    """Deletes command invocation messages without holding up the commands.
+
+    schedule() only records the message; one task per channel waits
+    CLEANUP_FLUSH_DELAY, then removes everything gathered for that channel
+    with a single bulk delete (or a plain delete for a lone message). If the
+    bulk request is rejected, the messages are deleted one by one. Failures
+    are counted and never reach the command.
+    """
+
+    def __init__(self, delay: float = CLEANUP_FLUSH_DELAY):
+        self.delay = delay
+        self.deleted = 0
+        self.failed = 0
+        self._pending = {}  # channel_id -> [message]
+        self._tasks = {}    # channel_id -> flush task
+
+    def schedule(self, message: discord.Message):
+        """Queue message for deletion without waiting"""
+        channel = message.channel
+        self._pending.setdefault(channel.id, []).append(message)
+        task = self._tasks.get(channel.id)
+        if task is None or task.done():
+            # Fresh context: the REST calls must not count towards the command that scheduled them
+            self._tasks[channel.id] = asyncio.get_running_loop().create_task(
+                self._flush_later(channel), context=contextvars.Context()
+            )
+
+    @property
+    def pending(self):
+        return sum(len(messages) for messages in self._pending.values())
+
+    async def _flush_later(self, channel):
+        await asyncio.sleep(self.delay)
+        try:
+            while self._pending.get(channel.id):
+                messages = self._pending.pop(channel.id)
+                for start in range(0, len(messages), CLEANUP_BULK_SIZE):
+                    await self._delete(channel, messages[start:start + CLEANUP_BULK_SIZE])
+        except Exception as e:
+            # Never let a cleanup error escape the background task
+            print(f"Failed to delete command messages: {e}")
+        finally:
+            self._pending.pop(channel.id, None)
+            self._tasks.pop(channel.id, None)
+
+    async def _delete(self, channel, messages):
+        if len(messages) > 1 and hasattr(channel, 'delete_messages'):
+            try:
+                await channel.delete_messages(messages, reason="Command invocation cleanup")
+                self._count(len(messages), 0, "bulk")
+                return
+            except discord.Forbidden:
+                # Without Manage Messages single deletes fail the same way
+                self._count(0, len(messages), "bulk")
+                return
+            except discord.HTTPException:
+                pass  # e.g. a message already deleted: retry one by one
+        result = await run_batch(messages, lambda message: message.delete(), ('channel_message_delete', channel.id))
+        self._count(len(result.succeeded), len(result.failed), "single")
+
+    def _count(self, deleted, failed, mode):
+        self.deleted += deleted
+        self.failed += failed
+        if deleted:
+            metrics.inc("bot_invocation_deletes_total", deleted, mode=mode)
+        if failed:
+            metrics.inc("bot_invocation_delete_failures_total", failed)
+
+# Global instance
+invocation_cleaner = InvocationCleaner()
+
+metrics.describe("bot_invocation_deletes_total", "counter", "Command invocation messages deleted, by bulk or single delete")
+metrics.describe("bot_invocation_delete_failures_total", "counter", "Command invocation messages that could not be deleted")
@@ -0,0 +1,143 @@
+# keepalive.py - Scheduled async keepalive prober for the BrainAllianceFX Bot
+# One task and one reused HTTP session probe every target with jitter, timeouts and backoff
+
+import asyncio
+import os
+import random
+import time
+
+import aiohttp
+
+from metrics import metrics
+
+# =============================================================================
+# KEEPALIVE SETTINGS
+# =============================================================================
+
+def _env_float(name: str, default: float):
+    try:
+        return max(0.0, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+# Seconds between probes of each target (0 disables the prober)
+KEEPALIVE_INTERVAL = _env_float('KEEPALIVE_INTERVAL', 240)
+
+# Random spread applied to every delay (fraction of the delay, +/-)
+KEEPALIVE_JITTER = 0.1
+
+# Per-request timeout in seconds
+KEEPALIVE_TIMEOUT = _env_float('KEEPALIVE_TIMEOUT', 10)
+
+# Upper bound for the delay after repeated failures (seconds)
+KEEPALIVE_MAX_BACKOFF = 3600
+
+DEFAULT_TARGETS = [
+    "https://www.google.com/generate_204",
+    "https://cloudflare.com/cdn-cgi/trace",
+]
+
+def default_targets():
+    """Targets from KEEPALIVE_TARGETS, or the local health check, KEEPALIVE_URL and the defaults"""
+    configured = os.getenv('KEEPALIVE_TARGETS')
+    if configured is not None:
+        return [url.strip() for url in configured.split(',') if url.strip()]
+    targets = [f"http://127.0.0.1:{os.getenv('PORT', '8000')}/healthz"]
+    # Optionally include your own public URL so the platform router sees inbound traffic
+    keepalive_url = os.getenv("KEEPALIVE_URL")
+    if keepalive_url:
+        targets.append(keepalive_url.rstrip("/"))
+    return targets + DEFAULT_TARGETS
+
+# =============================================================================
+# KEEPALIVE PROBER
+# =============================================================================
+
+class ProbeTarget:
+    """Schedule and last result for one URL"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.failures = 0
+        self.next_due = 0.0
+        self.last_latency = None
+        self.last_error = None
+
+class KeepaliveProber:
+    """Probes each target every KEEPALIVE_INTERVAL seconds from one task.
+
+    Delays carry +/- KEEPALIVE_JITTER so targets don't fire in lockstep, and
+    a failing target backs off exponentially up to KEEPALIVE_MAX_BACKOFF.
+    Results are exported as bot_keepalive_* metrics.
+    """
+
+    def __init__(self, targets=None, interval: float = KEEPALIVE_INTERVAL, timeout: float = KEEPALIVE_TIMEOUT):
+        self.targets = [ProbeTarget(url) for url in (targets if targets is not None else default_targets())]
+        self.interval = interval
+        self.timeout = timeout
+        self._session = None
+        self._task = None
+
+    def start(self):
+        if not self.interval or not self.targets:
+            print("ℹ️ Keepalive prober disabled")
+            return
+        if self._task is None or self._task.done():
+            now = time.monotonic()
+            for target in self.targets:
+                # Spread the first round over the first interval
+                target.next_due = now + random.uniform(0, self.interval * KEEPALIVE_JITTER)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _run(self):
+        self._session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": "KeepAlive/1.0"},
+        )
+        while True:
+            now = time.monotonic()
+            due = [target for target in self.targets if target.next_due <= now]
+            if due:
+                await asyncio.gather(*(self.probe(target) for target in due))
+                continue
+            await asyncio.sleep(min(target.next_due for target in self.targets) - now)
+
+    async def probe(self, target: ProbeTarget):
+        started = time.perf_counter()
+        try:
+            async with self._session.get(target.url) as response:
+                await response.read()
+                if response.status >= 500:
+                    raise aiohttp.ClientResponseError(response.request_info, (), status=response.status)
+            target.last_latency = time.perf_counter() - started
+            target.last_error = None
+            target.failures = 0
+            metrics.inc("bot_keepalive_probes_total", target=target.url, result="success")
+            metrics.set("bot_keepalive_latency_seconds", target.last_latency, target=target.url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            target.last_error = str(e) or type(e).__name__
+            target.failures += 1
+            metrics.inc("bot_keepalive_probes_total", target=target.url, result="failure")
+        metrics.set("bot_keepalive_up", int(target.failures == 0), target=target.url)
+        metrics.set("bot_keepalive_consecutive_failures", target.failures, target=target.url)
+        target.next_due = time.monotonic() + self._delay(target.failures)
+
+    def _delay(self, failures: int):
+        delay = min(self.interval * (2 ** failures), max(self.interval, KEEPALIVE_MAX_BACKOFF))
+        return delay * random.uniform(1 - KEEPALIVE_JITTER, 1 + KEEPALIVE_JITTER)
+
+# Global instance
+keepalive = KeepaliveProber()
+
+metrics.describe("bot_keepalive_probes_total", "counter", "Keepalive probes by target and result")
+metrics.describe("bot_keepalive_latency_seconds", "gauge", "Latency of the last successful keepalive probe")
+metrics.describe("bot_keepalive_up", "gauge", "1 if the last keepalive probe of the target succeeded")
+metrics.describe("bot_keepalive_consecutive_failures", "gauge", "Consecutive failed keepalive probes of the target")
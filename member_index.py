@@ -0,0 +1,167 @@
+# member_index.py - Reverse member indexes for the BrainAllianceFX Bot
+# Role ID -> member IDs, bots, voice and join order per guild, so member selection does not rescan the guild
+
+import bisect
+
+import discord
+
+# =============================================================================
+# GUILD INDEX
+# =============================================================================
+
+class GuildMemberIndex:
+    """Indexes for one guild: member IDs, bot IDs, role members, voice channels and join order"""
+
+    def __init__(self, guild: discord.Guild):
+        self.member_ids = set()
+        self.bot_ids = set()
+        self.role_members = {}   # role_id -> set(member_id)
+        self.member_roles = {}   # member_id -> frozenset(role_id)
+        self.joined = []         # sorted (joined_at timestamp, member_id)
+        self.joined_at = {}      # member_id -> joined_at timestamp
+        self.voice_members = {}  # channel_id -> set(member_id)
+        self.member_voice = {}   # member_id -> channel_id
+        for member in guild.members:
+            self._index(member)
+            if member.voice and member.voice.channel:
+                self.set_voice(member.id, member.voice.channel.id)
+        # One sort instead of an insort per member, which is quadratic for large guilds
+        self.joined = sorted((timestamp, member_id) for member_id, timestamp in self.joined_at.items())
+
+    def update(self, member: discord.Member):
+        entry = self._index(member)
+        if entry is not None:
+            bisect.insort(self.joined, entry)
+
+    def _index(self, member):
+        """Index member except for the join order list; returns its new (joined_at, id) entry, if any"""
+        self.member_ids.add(member.id)
+        if member.bot:
+            self.bot_ids.add(member.id)
+        self._set_roles(member.id, frozenset(role.id for role in member.roles if not role.is_default()))
+        if member.id not in self.joined_at and member.joined_at is not None:
+            entry = (member.joined_at.timestamp(), member.id)
+            self.joined_at[member.id] = entry[0]
+            return entry
+        return None
+
+    def remove(self, member_id: int):
+        self.member_ids.discard(member_id)
+        self.bot_ids.discard(member_id)
+        self._set_roles(member_id, frozenset())
+        self.set_voice(member_id, None)
+        timestamp = self.joined_at.pop(member_id, None)
+        if timestamp is not None:
+            i = bisect.bisect_left(self.joined, (timestamp, member_id))
+            if i < len(self.joined) and self.joined[i] == (timestamp, member_id):
+                del self.joined[i]
+
+    def remove_role(self, role_id: int):
+        for member_id in self.role_members.pop(role_id, ()):
+            remaining = self.member_roles.get(member_id, frozenset()) - {role_id}
+            if remaining:
+                self.member_roles[member_id] = remaining
+            else:
+                self.member_roles.pop(member_id, None)
+
+    def set_voice(self, member_id: int, channel_id):
+        previous = self.member_voice.pop(member_id, None)
+        if previous is not None:
+            members = self.voice_members[previous]
+            members.discard(member_id)
+            if not members:
+                del self.voice_members[previous]
+        if channel_id is not None:
+            self.member_voice[member_id] = channel_id
+            self.voice_members.setdefault(channel_id, set()).add(member_id)
+
+    def joined_between(self, after=None, before=None):
+        """IDs of members who joined after/before the given timestamps"""
+        start = bisect.bisect_left(self.joined, (after, 0)) if after is not None else 0
+        end = bisect.bisect_left(self.joined, (before, 0)) if before is not None else len(self.joined)
+        return {member_id for _, member_id in self.joined[start:end]}
+
+    def _set_roles(self, member_id, role_ids):
+        previous = self.member_roles.get(member_id, frozenset())
+        for role_id in previous - role_ids:
+            members = self.role_members.get(role_id)
+            if members is not None:
+                members.discard(member_id)
+                if not members:
+                    del self.role_members[role_id]
+        for role_id in role_ids - previous:
+            self.role_members.setdefault(role_id, set()).add(member_id)
+        if role_ids:
+            self.member_roles[member_id] = role_ids
+        else:
+            self.member_roles.pop(member_id, None)
+
+# =============================================================================
+# MEMBER INDEX
+# =============================================================================
+
+class MemberIndex:
+    """Lazily built GuildMemberIndex per guild.
+
+    A guild is indexed on first use with one pass over its members; after
+    that member and role events keep it current, and a role's members are
+    read in O(members in role).
+    """
+
+    def __init__(self):
+        self._guilds = {}
+
+    def guild(self, guild: discord.Guild):
+        """Index for guild, built on first use"""
+        index = self._guilds.get(guild.id)
+        if index is None:
+            index = self._guilds[guild.id] = GuildMemberIndex(guild)
+        return index
+
+    def role_members(self, guild: discord.Guild, role: discord.Role):
+        """Members of guild that have role"""
+        return self.members(guild, self.role_member_ids(guild, role))
+
+    def role_member_ids(self, guild: discord.Guild, role: discord.Role):
+        """IDs of the members of guild that have role"""
+        index = self.guild(guild)
+        if role.is_default():
+            return index.member_ids
+        return index.role_members.get(role.id, set())
+
+    def members(self, guild: discord.Guild, member_ids):
+        """Cached members for member_ids (missing ones are skipped)"""
+        members = (guild.get_member(member_id) for member_id in member_ids)
+        return [member for member in members if member is not None]
+
+    # --- Event hooks ---
+
+    def member_changed(self, member: discord.Member):
+        index = self._guilds.get(member.guild.id)
+        if index is not None:
+            index.update(member)
+
+    def member_removed(self, member: discord.Member):
+        index = self._guilds.get(member.guild.id)
+        if index is not None:
+            index.remove(member.id)
+
+    def voice_changed(self, member: discord.Member, channel):
+        index = self._guilds.get(member.guild.id)
+        if index is not None:
+            index.set_voice(member.id, channel.id if channel else None)
+
+    def role_removed(self, role: discord.Role):
+        index = self._guilds.get(role.guild.id)
+        if index is not None:
+            index.remove_role(role.id)
+
+    def invalidate(self, guild_id=None):
+        """Drop the index for one guild (or all guilds); rebuilt on next use"""
+        if guild_id is None:
+            self._guilds.clear()
+        else:
+            self._guilds.pop(guild_id, None)
+
+# Global instance
+member_index = MemberIndex()
@@ -0,0 +1,195 @@
+# member_lookup.py - On-demand member lookups for the BrainAllianceFX Bot
+# Lets the bot start without chunking every guild: members are fetched when needed and kept in a bounded LRU
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
+import discord
+
+from member_index import member_index
+from metrics import metrics
+from resolver import resolver, NameIndex, extract_id_from_mention, member_names, normalize_name
+
+# =============================================================================
+# LOOKUP SETTINGS
+# =============================================================================
+
+# Start without requesting every guild's member list (LAZY_MEMBER_CHUNKING=true)
+LAZY_MEMBER_CHUNKING = os.getenv('LAZY_MEMBER_CHUNKING', 'false').strip().lower() in ('1', 'true', 'yes', 'on')
+
+# Fetched members kept outside the guild cache
+try:
+    MEMBER_LRU_SIZE = max(1, int(os.getenv('MEMBER_LRU_SIZE', '2000')))
+except ValueError:
+    MEMBER_LRU_SIZE = 2000
+
+# Seconds a fetched member is trusted (roles/nick may change without an event reaching us)
+MEMBER_LRU_TTL = 300
+
+# Candidates requested per name search (gateway maximum is 100)
+MEMBER_QUERY_LIMIT = 25
+
+# Missing IDs fetched one by one; more than this chunks the guild instead
+MEMBER_FETCH_MAX = 25
+
+# =============================================================================
+# MEMBER LOOKUP
+# =============================================================================
+
+class MemberLookup:
+    """Member access for guilds whose member list is not fully cached.
+
+    IDs and mentions use fetch_member, names use the gateway's
+    query_members (username/nickname prefix) ranked like the resolver.
+    Results live in an LRU bounded by MEMBER_LRU_SIZE and MEMBER_LRU_TTL
+    instead of the guild cache. Commands that need the whole roster call
+    ensure_chunked(), which chunks a guild once, shared by concurrent callers.
+    With lazy chunking disabled every guild is chunked at startup and only
+    the caches are consulted.
+    """
+
+    def __init__(self, size: int = MEMBER_LRU_SIZE, enabled: bool = LAZY_MEMBER_CHUNKING):
+        self.size = size
+        self.enabled = enabled
+        self._members = OrderedDict()  # (guild_id, member_id) -> (member, fetched_at)
+        self._queries = OrderedDict()  # (guild_id, normalized query) -> member_id
+        self._chunking = {}            # guild_id -> chunk task
+
+    # --- Lookups ---
+
+    def get(self, guild: discord.Guild, member_id: int):
+        """Cached member (guild cache first, then the LRU) or None"""
+        member = guild.get_member(member_id)
+        if member is not None:
+            return member
+        entry = self._members.get((guild.id, member_id))
+        if entry is None:
+            return None
+        if time.monotonic() - entry[1] > MEMBER_LRU_TTL:
+            del self._members[(guild.id, member_id)]
+            return None
+        self._members.move_to_end((guild.id, member_id))
+        return entry[0]
+
+    async def fetch(self, guild: discord.Guild, member_id: int):
+        """Member by ID from the caches or the API; None if not in the guild"""
+        member = self.get(guild, member_id)
+        if member is not None:
+            return member
+        try:
+            member = await guild.fetch_member(member_id)
+        except discord.NotFound:
+            return None
+        metrics.inc("bot_member_fetches_total", kind="id")
+        self._remember(member)
+        return member
+
+    async def fetch_many(self, guild: discord.Guild, member_ids):
+        """{member_id: member or None}; chunks the guild when too many are missing"""
+        missing = [member_id for member_id in member_ids if self.get(guild, member_id) is None]
+        if missing and self.enabled and not guild.chunked:
+            if len(missing) > MEMBER_FETCH_MAX:
+                await self.ensure_chunked(guild)
+            else:
+                # A failed fetch leaves that ID as None, like a member who is not in the guild
+                results = await asyncio.gather(*(self.fetch(guild, member_id) for member_id in missing), return_exceptions=True)
+                for member_id, result in zip(missing, results):
+                    if isinstance(result, BaseException):
+                        print(f"❌ Could not fetch member {member_id} in {guild.name}: {result}")
+        return {member_id: self.get(guild, member_id) for member_id in member_ids}
+
+    async def search(self, guild: discord.Guild, query: str):
+        """Best member for a name query from query_members, or None"""
+        key = (guild.id, normalize_name(query) or query.lower())
+        member_id = self._queries.get(key)
+        if member_id is not None:
+            member = self.get(guild, member_id)
+            if member is not None:
+                self._queries.move_to_end(key)
+                return member
+        candidates = await guild.query_members(query=query[:100], limit=MEMBER_QUERY_LIMIT, cache=False)
+        metrics.inc("bot_member_fetches_total", kind="query")
+        if not candidates:
+            return None
+        index = NameIndex()
+        by_id = {}
+        for member in candidates:
+            index.add(member.id, member_names(member))
+            by_id[member.id] = member
+            self._remember(member)
+        best_id = index.search(query, weight=lambda member_id: len(by_id[member_id].roles))
+        if best_id is None:
+            return None
+        self._queries[key] = best_id
+        if len(self._queries) > self.size:
+            self._queries.popitem(last=False)
+        return by_id[best_id]
+
+    async def resolve(self, guild: discord.Guild, query: str):
+        """Resolve a mention, ID or name without the full member list; raises ValueError('not_found')"""
+        if not query or not query.strip():
+            raise ValueError("empty_query")
+        member_id = extract_id_from_mention(query)
+        if member_id is None and query.strip().isdigit():
+            member_id = int(query.strip())
+        if member_id is not None:
+            member = await self.fetch(guild, member_id)
+        else:
+            member = await self.search(guild, query.strip())
+        if member is None:
+            raise ValueError("not_found")
+        return member
+
+    # --- Chunking ---
+
+    async def ensure_chunked(self, guild: discord.Guild):
+        """Request the full member list of guild once (no-op if already cached)"""
+        if not self.enabled or guild.chunked:
+            return
+        task = self._chunking.get(guild.id)
+        if task is None or task.done():
+            task = asyncio.get_running_loop().create_task(self._chunk(guild))
+            self._chunking[guild.id] = task
+        await asyncio.shield(task)
+
+    async def _chunk(self, guild):
+        started = time.perf_counter()
+        await guild.chunk(cache=True)
+        metrics.inc("bot_guild_chunks_total")
+        # Cached members supersede the fetched copies; indexes rebuild from the full list
+        self.invalidate(guild.id)
+        resolver.invalidate(guild.id)
+        member_index.invalidate(guild.id)
+        print(f"👥 Chunked {guild.name}: {len(guild.members)} members in {time.perf_counter() - started:.1f}s")
+
+    # --- Event hooks ---
+
+    def member_removed(self, member: discord.Member):
+        self._members.pop((member.guild.id, member.id), None)
+
+    def invalidate(self, guild_id=None):
+        if guild_id is None:
+            self._members.clear()
+            self._queries.clear()
+            return
+        for key in [key for key in self._members if key[0] == guild_id]:
+            del self._members[key]
+        for key in [key for key in self._queries if key[0] == guild_id]:
+            del self._queries[key]
+
+    # --- Internals ---
+
+    def _remember(self, member: discord.Member):
+        key = (member.guild.id, member.id)
+        self._members[key] = (member, time.monotonic())
+        self._members.move_to_end(key)
+        if len(self._members) > self.size:
+            self._members.popitem(last=False)
+
+# Global instance
+member_lookup = MemberLookup()
+
+metrics.describe("bot_member_fetches_total", "counter", "Members fetched on demand, by ID or by name query")
+metrics.describe("bot_guild_chunks_total", "counter", "Guild member lists requested on demand")
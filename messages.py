@@ -26,11 +26,22 @@ ERROR_MESSAGES = {
     "no_rollback_data": "No move action to rollback!",
     "rollback_different_server": "The last move action was performed in a different server!",
     "rollback_channel_not_found": "Cannot find the previous destination channel for rollback!",
+    "rollback_invalid_steps": "Invalid number of steps! Usage: `.back`, `.back <N>` or `.back list`",
     "member_not_found_query": "Member not found for query: '{query}'. Try a closer name, mention, or ID.",
     "invalid_nickname": "Invalid nickname. Please provide a non-empty nickname.",
     "cannot_change_own_nick": "You cannot change your own nickname with this command.",
-    "no_user_ids_provided": "No user IDs provided! Usage: `.massban USERID USERID USERID...`",
+    "no_user_ids_provided": "No user IDs provided! Usage: `.massban USERID USERID USERID...` (or attach a file / link a message with the IDs)",
     "massban_failed": "Mass ban failed! {failed_count} user(s) could not be banned: {failed_names}",
+    "massban_too_many": "Too many user IDs ({count})! The maximum per `.massban` is {max_count}.",
+    "batch_failed": "Could not {action} {failed_count} member(s): {failed_names}",
+    "unknown_extension": "Unknown extension: '{name}'. Available: {available}",
+    "config_missing": "This server has no `{setting}` configured. Set it with `.config set {setting} <value>`.",
+    "config_usage": "Usage: `.config`, `.config set <key> <value>` or `.config unset <key>`. Keys: {keys}",
+    "config_invalid_value": "Invalid {kind} for `{setting}`: '{value}'",
+    "reload_failed": "Reload of `{extension}` failed, the previous code stays active: {error}",
+    "sync_usage": "Usage: `.sync [here|global|clear]` (`here` and `clear` only work in a server)",
+    "sync_failed": "Slash command sync failed: {error}",
+    "slash_failed": "`/{command}` could not be completed.",
     # Mentor command
     "not_in_stage": "You must be connected to a Stage channel to use this command!",
     "role_not_found": "The role required for mentorship could not be found.",
@@ -43,13 +54,18 @@ ERROR_MESSAGES = {
     "channel_create_failed": "Errore nella creazione del canale per @{member_name} {member_id}: {error}",
     "stopmentor_no_waiting_in_channel": "Nessun utente con il ruolo Sala d'Attesa trovato in questo canale.",
     "no_messages_to_clear": "No messages found to clear in this channel!",
+    "ca_invalid_filter": "Invalid option: `{filter}`. Use a count (1-{max}), `bot`, `user:<member>` or `contains:<text>`",
+    # Audit log
+    "audit_invalid_filter": "Invalid filter: `{filter}`. Use `user:<user>`, `cmd:<command>`, `outcome:<success/failed>`, `since:<30m/6h/7d>` or `limit:<n>`",
+    "audit_no_results": "No audit log entries match these filters.",
     # Role command errors
     "role_no_arguments": "Please provide arguments! Usage: `.role -a/-r <role> -u/-b <targets>` or `.role -a/-r <role> -i <role>`",
     "role_insufficient_arguments": "Insufficient arguments! Usage: `.role -a/-r <role> -u/-b <targets>` or `.role -a/-r <role> -i <role>`",
-    "role_invalid_flag": "Invalid flag: `{flag}`. Use `-u` (users), `-b` (bots), `-i` (in role), `-a` (add), or `-r` (remove)",
+    "role_invalid_flag": "Invalid flag: `{flag}`. Use `-u` (users), `-b` (bots), `-i` (in role), `-s` (selector), `-n` (dry run), `-a` (add), or `-r` (remove)",
+    "role_invalid_selector": "Invalid selector: {error}. Example: `in:@A & !in:@B & bot:false & voice:any & joined<30d`",
     "role_no_action": "No action specified! Use `-a` to add roles or `-r` to remove roles",
     "role_no_role": "No role specified! Provide a role ID or name after the action flag",
-    "role_no_targets": "No targets specified! Provide user names/IDs or use `-i` to target members in a role",
+    "role_no_targets": "No targets specified! Provide user names/IDs, use `-i` to target members in a role or `-s` with a selector",
     "role_no_valid_targets": "No valid targets found! Check your user names/IDs or role names",
     "role_not_found_query": "Role not found for query: '{query}'. Try a closer name or the role ID.",
     "role_operation_failed": "Role {action} failed! {failed_count} target(s) could not be processed: {failed_names}"
@@ -84,6 +100,7 @@ SUCCESS_MESSAGES = {
     
     # Rollback
     "rollback_success": "Rolled back! Moved {count} users back to {channels_count} original voice channels",
+    "rollback_history_entry": "**{step}.** `.{type}` by <@{author_id}> <t:{timestamp}:R> → {count} users to #{dest_name}",
     # Nickname
     "nickname_changed": "Changed nickname for @{member_name} {member_id} to '{new_nick}'",
     "nickname_cleared": "Cleared nickname for @{member_name} {member_id}",
@@ -94,13 +111,26 @@ SUCCESS_MESSAGES = {
     "mentor_congrats": "Congratulazioni! {mentions}\n\nAvete visto la vostra mentorship gratuita!\n\n# Scrivete in privato ad {anthony_mention} per ulteriori dettagli!",
     # Setup Waiting workflow
     "setupwaiting_summary": "Completato: trovati {members_total} utenti con ruolo trigger. Canali creati: {channels_created}. Ruoli assegnati/già presenti: {roles_assigned}.",
+    "setupwaiting_status": "Scansione {state}: {done}/{total} utenti ({rate:.1f}/s). Canali creati: {channels_created}. Ruoli assegnati: {roles_assigned}. Errori: {failed}.",
+    "setupwaiting_no_scan": "Nessuna scansione eseguita dall'avvio del bot.",
     # Stop mentor
     "stopmentor_done": "Sessione terminata per @{member_name}. Canale eliminato: {channel_deleted}. Ruolo Sala d'Attesa rimosso: {role_removed}.",
     "stopmentor_done_channel": "Sessione terminata. Utenti aggiornati: {updated}. Canale eliminato: {channel_deleted}.",
     # Clear all command
     "kaboom_message": "💥 **KABOOM!** 💥\n\n*Channel cleared!*",
+    # Stats command
+    "stats_empty": "No commands recorded since the bot started.",
+    # Config command
+    "config_set": "⚙️ `{setting}` set to {value}",
+    "config_unset": "⚙️ `{setting}` cleared",
+    # Reload command
+    "extensions_reloaded": "🔄 Reloaded {extensions} in {elapsed_ms:.0f}ms",
+    # Slash commands
+    "slash_synced": "🔁 Synced {count} slash command(s) ({scope})",
+    "slash_done": "✅ `/{command}` done",
     # Role command success messages
     "role_operation_success": "✅ Successfully {action}ed role **{role_name}** to {count} target(s): {target_names}",
+    "role_selector_preview": "🔎 Dry run: {action} role **{role_name}** would apply to {count} member(s): {target_names}",
     "role_operation_partial": "⚠️ Partially successful! {action}ed role **{role_name}** to {success_count} target(s): {success_names}\nFailed for {failed_count} target(s): {failed_names}"
 }
 
@@ -120,7 +150,7 @@ HELP_EMBED = {
             "value": (
                 "`.mentor` → Assign roles to Stage channel participants\n"
                 "`.stopmentor` → Remove waiting room roles & cleanup\n"
-                "`.setupwaiting` → Auto-create private channels for users\n"
+                "`.setupwaiting [status]` → Auto-create private channels for users (or show scan progress)\n"
                 "`.call` → Send DM invites to team members"
             ),
             "inline": False
@@ -132,7 +162,7 @@ HELP_EMBED = {
                 "`.moveall <channel>` → Move your channel to another\n"
                 "`.servermoveall <channel>` → Move EVERYONE to one channel\n"
                 "`.kickall` / `.serverkickall` → Clear voice channels\n"
-                "`.back` → Undo last move operation"
+                "`.back [N|list]` → Undo the last N move operations"
             ),
             "inline": False
         },
@@ -143,6 +173,7 @@ HELP_EMBED = {
                 "`.role -r <role> -u <users>` → Remove role from users\n"
                 "`.role -a <role> -b <bots>` → Add role to bots\n"
                 "`.role -r <role> -i <role>` → Remove role from members in role\n"
+                "`.role -a <role> -s <selector>` → Add role to members matching a selector (`-n` = dry run)\n"
                 "*Supports fuzzy names, IDs, and mentions*"
             ),
             "inline": False
@@ -150,10 +181,15 @@ HELP_EMBED = {
         {
             "name": "🔨 Moderation Tools",
             "value": (
-                "`.massban <id> <id>...` → Ban multiple users by ID\n"
+                "`.massban <id> <id>...` → Ban multiple users by ID (or from an attached file / message link)\n"
                 "`.nick <user> <nick>` → Change someone's nickname\n"
                 "`.nick <user> -` → Clear nickname\n"
-                "`.ca` → Clear last 100 messages + KABOOM! 💥"
+                "`.ca [count] [bot|user:<user>|contains:<text>]` → Clear recent messages + KABOOM! 💥\n"
+                "`.audit [user:<user>] [cmd:<name>] [since:<7d>]` → Query the audit log\n"
+                "`.stats` → Command latency percentiles and event-loop lag\n"
+                "`.config` / `.config set <key> <value>` / `.config unset <key>` → Show or change this server's roles, channels and users\n"
+                "`.reload [extension|all]` → Reload command code without restarting (owner only)\n"
+                "`.sync [here|global|clear]` → Publish the slash commands (owner only)"
             ),
             "inline": False
         },
@@ -163,6 +199,7 @@ HELP_EMBED = {
                 "`.setstatus <status>` → Change bot status\n"
                 "`.setactivity <text>` → Set activity text\n"
                 "`.settype <type>` → Set activity type\n"
+                "`.setrotation <sec> <a> | <b>` → Rotate activity texts\n"
                 "`.presenceinfo` → Show current settings\n"
                 "`.presencehelp` → Complete Rich Presence guide"
             ),
@@ -206,7 +243,8 @@ HELP_EMBED = {
 
 STATUS_MESSAGES = {
     "bot_ready": "{bot_name} has connected to Discord!",
-    "json_error": "Error: Invalid JSON in authorized_users.json. Using default."
+    "json_error": "Error: Invalid JSON in authorized_users.json. Using default.",
+    "batch_progress": "⏳ {action}: {done}/{total}..."
 }
 
 # =============================================================================
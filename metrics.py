@@ -0,0 +1,125 @@
+# metrics.py - In-process metrics for the BrainAllianceFX Bot
+# Counters and gauges rendered in the Prometheus text format, plus an event-loop lag monitor
+
+import asyncio
+import collections
+import time
+
+# =============================================================================
+# METRICS SETTINGS
+# =============================================================================
+
+# Seconds between event-loop lag samples
+LOOP_LAG_INTERVAL = 0.5
+
+# Samples kept for the recent maximum lag (LOOP_LAG_WINDOW * LOOP_LAG_INTERVAL seconds)
+LOOP_LAG_WINDOW = 120
+
+# =============================================================================
+# METRICS REGISTRY
+# =============================================================================
+
+class MetricsRegistry:
+    """Named counters/gauges with labels.
+
+    Collectors registered with add_collector() run right before rendering,
+    so values that are cheap to read (cache sizes, queue lengths) are only
+    computed when /metrics is scraped.
+    """
+
+    def __init__(self):
+        self._values = {}     # name -> {labels tuple: value}
+        self._meta = {}       # name -> (type, help)
+        self._collectors = []
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._meta[name] = (kind, help_text)
+        self._values.setdefault(name, {})
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        series = self._values.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels):
+        self._values.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+
+    def get(self, name: str, **labels):
+        return self._values.get(name, {}).get(tuple(sorted(labels.items())))
+
+    def add_collector(self, collector):
+        """Register collector(registry), called before each render"""
+        self._collectors.append(collector)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        for collector in self._collectors:
+            try:
+                collector(self)
+            except Exception as e:
+                print(f"❌ Metrics collector failed: {e}")
+        lines = []
+        for name, series in self._values.items():
+            kind, help_text = self._meta.get(name, ('gauge', ''))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in series.items():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), " ")}"'
+               for key, value in labels)
+    return "{" + ",".join(escaped) + "}"
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+# =============================================================================
+# EVENT-LOOP LAG MONITOR
+# =============================================================================
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a sleeping task.
+
+    A healthy loop wakes it within a few milliseconds; seconds of lag mean
+    something is blocking the loop (sync I/O, heavy CPU work).
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, window: int = LOOP_LAG_WINDOW):
+        self.interval = interval
+        self.lag = 0.0
+        self._samples = collections.deque(maxlen=window)
+        self._task = None
+
+    @property
+    def max_lag(self):
+        """Largest lag over the recent window"""
+        return max(self._samples, default=0.0)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, time.perf_counter() - started - self.interval)
+            self._samples.append(self.lag)
+
+# Global instances
+metrics = MetricsRegistry()
+loop_lag = LoopLagMonitor()
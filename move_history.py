@@ -0,0 +1,150 @@
+# move_history.py - Per-guild undo history for move commands (.moveall, .servermoveall)
+# Kept in memory, bounded per guild and persisted compactly to move_history.json
+
+import asyncio
+import collections
+import os
+import time
+
+from storage import read_json, write_json_atomic
+
+# =============================================================================
+# HISTORY SETTINGS
+# =============================================================================
+
+MOVE_HISTORY_FILE = 'move_history.json'
+
+# Move actions remembered per guild (older ones are discarded)
+try:
+    MOVE_HISTORY_DEPTH = max(1, int(os.getenv('MOVE_HISTORY_DEPTH', '10')))
+except ValueError:
+    MOVE_HISTORY_DEPTH = 10
+
+# Seconds to coalesce changes before writing the history file
+MOVE_HISTORY_SAVE_DELAY = 1.0
+
+# =============================================================================
+# MOVE HISTORY
+# =============================================================================
+
+class MoveAction:
+    """One move command: who ran it, when, where members went and where they came from"""
+
+    def __init__(self, action_type, author_id, destination_channel_id, user_positions, timestamp=None):
+        self.type = action_type
+        self.author_id = author_id
+        self.destination_channel_id = destination_channel_id
+        self.user_positions = dict(user_positions)  # member_id -> original channel_id
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+    def to_json(self):
+        # Group members by original channel to keep the file compact
+        origins = {}
+        for member_id, channel_id in self.user_positions.items():
+            origins.setdefault(str(channel_id), []).append(member_id)
+        return {'t': self.type, 'ts': round(self.timestamp, 1), 'by': self.author_id,
+                'dest': self.destination_channel_id, 'from': origins}
+
+    @classmethod
+    def from_json(cls, data):
+        positions = {member_id: int(channel_id) for channel_id, members in data['from'].items() for member_id in members}
+        return cls(data['t'], data['by'], data['dest'], positions, timestamp=data['ts'])
+
+class MoveHistory:
+    """Bounded per-guild stacks of MoveAction, newest last.
+
+    Each guild has its own stack and lock, so moderators in different guilds
+    (or several .moveall runs in one guild) never overwrite each other's undo
+    data. Changes are written to disk in the background, atomically.
+    """
+
+    def __init__(self, path: str = MOVE_HISTORY_FILE, depth: int = MOVE_HISTORY_DEPTH):
+        self.path = path
+        self.depth = depth
+        self._guilds = {}
+        self._locks = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._save_task = None
+        self._dirty = False
+
+    async def ensure_loaded(self):
+        if self._loaded:
+            return
+        # Concurrent first calls wait for one read instead of each replacing the stacks
+        async with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                data = await asyncio.to_thread(read_json, self.path, {})
+                for guild_id, actions in data.items():
+                    stack = collections.deque(maxlen=self.depth)
+                    stack.extend(MoveAction.from_json(action) for action in actions)
+                    self._guilds[int(guild_id)] = stack
+            except Exception as e:
+                print(f"❌ Error loading move history: {e}")
+            self._loaded = True
+
+    def lock(self, guild_id: int):
+        """Lock serializing restores within one guild"""
+        return self._locks.setdefault(guild_id, asyncio.Lock())
+
+    def actions(self, guild_id: int):
+        """Actions for guild, newest first"""
+        return list(reversed(self._guilds.get(guild_id, ())))
+
+    async def push(self, guild_id: int, action: MoveAction):
+        await self.ensure_loaded()
+        self._guilds.setdefault(guild_id, collections.deque(maxlen=self.depth)).append(action)
+        self._schedule_save()
+
+    def pop(self, guild_id: int, steps: int = 1):
+        """Remove and return the newest `steps` actions, newest first"""
+        stack = self._guilds.get(guild_id)
+        popped = []
+        while stack and len(popped) < steps:
+            popped.append(stack.pop())
+        if popped:
+            self._schedule_save()
+        return popped
+
+    def _schedule_save(self):
+        self._dirty = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.get_running_loop().create_task(self._save_later())
+
+    async def _save_later(self):
+        # Keep writing until no change arrived during the previous write
+        while self._dirty:
+            await asyncio.sleep(MOVE_HISTORY_SAVE_DELAY)
+            await self.flush()
+
+    async def flush(self):
+        """Write pending changes now (e.g. before shutdown)"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        data = {str(guild_id): [action.to_json() for action in stack] for guild_id, stack in self._guilds.items() if stack}
+        try:
+            await asyncio.to_thread(write_json_atomic, self.path, data)
+        except Exception as e:
+            print(f"❌ Error saving move history: {e}")
+
+def plan_restore(actions):
+    """Combine actions (newest first) into {member_id: (expected_channel_id, target_channel_id)}.
+
+    A member moved by several of the undone actions is sent straight back to
+    the channel they were in before the oldest of them, as long as each older
+    action left them where the next newer one picked them up.
+    """
+    plan = {}
+    for action in actions:
+        for member_id, origin_id in action.user_positions.items():
+            if member_id not in plan:
+                plan[member_id] = (action.destination_channel_id, origin_id)
+            elif plan[member_id][1] == action.destination_channel_id:
+                plan[member_id] = (plan[member_id][0], origin_id)
+    return plan
+
+# Global instance
+move_history = MoveHistory()
@@ -0,0 +1,174 @@
+# private_channels.py - Member -> private waiting channel index for the BrainAllianceFX Bot
+# Built once per category from channel topics/overwrites, kept current from events and persisted
+
+import asyncio
+import re
+
+import discord
+
+from storage import read_json, write_json_atomic
+
+# =============================================================================
+# INDEX SETTINGS
+# =============================================================================
+
+PRIVATE_CHANNELS_FILE = 'private_channels.json'
+
+# Owner metadata written to the topic of channels the bot creates
+OWNER_TOPIC_TEMPLATE = "waiting-member:{member_id}"
+OWNER_TOPIC_PATTERN = re.compile(r"waiting-member:(\d{15,20})")
+
+# Seconds to coalesce changes before writing the index file
+PRIVATE_CHANNELS_SAVE_DELAY = 2.0
+
+def owner_topic(member):
+    """Topic for a new private channel, identifying its owner"""
+    return OWNER_TOPIC_TEMPLATE.format(member_id=member.id)
+
+def channel_owner_id(channel):
+    """Member ID a private channel belongs to, from its topic or its single member overwrite"""
+    match = OWNER_TOPIC_PATTERN.search(getattr(channel, 'topic', None) or '')
+    if match:
+        return int(match.group(1))
+    # Channels created before topic metadata: the one member given an overwrite
+    members = [target.id for target in getattr(channel, 'overwrites', {})
+               if isinstance(target, discord.Member) and not target.bot]
+    if len(members) == 1:
+        return members[0]
+    return None
+
+# =============================================================================
+# PRIVATE CHANNEL INDEX
+# =============================================================================
+
+class PrivateChannelIndex:
+    """Per-category {member_id: channel_id} map of private waiting channels.
+
+    A category is scanned once per session (only channels not already known
+    from the persisted file are inspected); after that lookups are dict hits
+    and channel events keep the map current. Channels whose owner cannot be
+    determined are kept by name as a fallback.
+    """
+
+    def __init__(self, path: str = PRIVATE_CHANNELS_FILE):
+        self.path = path
+        self._owners = {}    # category_id -> {member_id: channel_id}
+        self._unowned = {}   # category_id -> {channel name: channel_id}
+        self._by_channel = {}  # channel_id -> (category_id, member_id or channel name)
+        self._built = set()
+        self._loaded = False
+        self._save_task = None
+        self._dirty = False
+
+    async def ensure_loaded(self):
+        if self._loaded:
+            return
+        try:
+            data = await asyncio.to_thread(read_json, self.path, {})
+            for category_id, owners in data.items():
+                for member_id, channel_id in owners.items():
+                    self._assign(int(category_id), int(member_id), channel_id)
+        except Exception as e:
+            print(f"❌ Error loading private channel index: {e}")
+        self._loaded = True
+
+    def build(self, category: discord.CategoryChannel):
+        """Reconcile the persisted map for category with its current channels"""
+        owners = self._owners.setdefault(category.id, {})
+        self._unowned.setdefault(category.id, {})
+        current = {channel.id: channel for channel in category.text_channels}
+        for channel_id in [channel_id for channel_id in owners.values() if channel_id not in current]:
+            self._forget(channel_id)
+        self._built.add(category.id)
+        for channel_id, channel in current.items():
+            if channel_id not in self._by_channel:
+                self.channel_created(channel)
+
+    def lookup(self, category: discord.CategoryChannel, member):
+        """Existing private channel of member in category, or None"""
+        if category.id not in self._built:
+            self.build(category)
+        channel_id = self._owners[category.id].get(member.id)
+        if channel_id is not None:
+            channel = category.guild.get_channel(channel_id)
+            if channel is not None and channel.category_id == category.id:
+                return channel
+            self._forget(channel_id)
+        # Name fallback for channels without owner metadata; claim the match
+        channel_id = self._unowned[category.id].get(member.name.lower())
+        channel = category.guild.get_channel(channel_id) if channel_id else None
+        if channel is not None and channel.category_id == category.id:
+            self.set(category.id, member.id, channel.id)
+            return channel
+        return None
+
+    def set(self, category_id: int, member_id: int, channel_id: int):
+        """Record channel_id as member_id's private channel in category_id"""
+        self._forget(channel_id)
+        self._assign(category_id, member_id, channel_id)
+        self._schedule_save()
+
+    def _assign(self, category_id, member_id, channel_id):
+        self._owners.setdefault(category_id, {})[member_id] = channel_id
+        self._by_channel[channel_id] = (category_id, member_id)
+
+    def _forget(self, channel_id):
+        category_id, key = self._by_channel.pop(channel_id, (None, None))
+        if isinstance(key, int):
+            # The member may already own a replacement channel; keep that mapping
+            owners = self._owners.get(category_id, {})
+            if owners.get(key) == channel_id:
+                del owners[key]
+                self._schedule_save()
+        elif key is not None and self._unowned[category_id].get(key) == channel_id:
+            del self._unowned[category_id][key]
+
+    # --- Event hooks ---
+
+    def channel_created(self, channel):
+        if channel.category_id not in self._built or not isinstance(channel, discord.TextChannel):
+            return
+        owner_id = channel_owner_id(channel)
+        if owner_id is not None and owner_id not in self._owners[channel.category_id]:
+            self._assign(channel.category_id, owner_id, channel.id)
+            self._schedule_save()
+        else:
+            self._unowned[channel.category_id][channel.name] = channel.id
+            self._by_channel[channel.id] = (channel.category_id, channel.name)
+
+    def channel_removed(self, channel):
+        self._forget(channel.id)
+
+    def channel_changed(self, before, after):
+        if before.category_id != after.category_id or getattr(before, 'topic', None) != getattr(after, 'topic', None) or before.name != after.name:
+            self.channel_removed(before)
+            self.channel_created(after)
+
+    def _schedule_save(self):
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._save_task is None or self._save_task.done():
+            self._save_task = loop.create_task(self._save_later())
+
+    async def _save_later(self):
+        while self._dirty:
+            await asyncio.sleep(PRIVATE_CHANNELS_SAVE_DELAY)
+            await self.flush()
+
+    async def flush(self):
+        """Write pending changes now (e.g. before shutdown)"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        data = {str(category_id): {str(member_id): channel_id for member_id, channel_id in owners.items()}
+                for category_id, owners in self._owners.items() if owners}
+        try:
+            await asyncio.to_thread(write_json_atomic, self.path, data)
+        except Exception as e:
+            print(f"❌ Error saving private channel index: {e}")
+
+# Global instance
+private_channels = PrivateChannelIndex()
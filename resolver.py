@@ -0,0 +1,505 @@
+# resolver.py - Indexed fuzzy name lookups for the BrainAllianceFX Bot
+# Keeps pre-normalized names per guild so resolution does not rescan the guild
+
+import bisect
+import difflib
+import heapq
+import re
+from collections import OrderedDict
+
+import discord
+
+from member_index import member_index
+
+# =============================================================================
+# MATCHING SETTINGS
+# =============================================================================
+
+# Minimum score for a fuzzy match to be accepted
+MATCH_THRESHOLD = 0.6
+
+# SequenceMatcher ratios are scaled below the exact/prefix/contains tiers
+SCORE_FUZZY_WEIGHT = 0.8
+
+# Scores closer than this are considered a tie and broken by weight
+TIE_MARGIN = 0.02
+
+# Maximum number of trigram candidates scored with SequenceMatcher
+FUZZY_CANDIDATES = 64
+
+# =============================================================================
+# NORMALIZATION HELPERS
+# =============================================================================
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]")
+
+def normalize_name(name: str):
+    """Lowercase and strip non-alphanumeric characters for loose matching"""
+    try:
+        return _NON_ALNUM.sub("", name.lower())
+    except Exception:
+        return name.lower()
+
+def _grams(text: str):
+    """Trigrams of text; strings shorter than 3 characters are their own gram"""
+    if len(text) < 3:
+        return {text} if text else set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+# =============================================================================
+# NAME INDEX
+# =============================================================================
+
+class NameIndex:
+    """Index of entity names supporting exact, prefix, substring and fuzzy lookups.
+
+    Each entity is stored under an integer key with one or more names. Exact
+    matches use a dict, prefix matches a sorted list, substring matches a
+    trigram filter, and SequenceMatcher only scores trigram candidates.
+    """
+
+    def __init__(self):
+        self._names = {}       # key -> tuple of (lower, normalized) names
+        self._exact = {}       # lower name -> set of keys
+        self._sorted = []      # sorted (lower name, key) pairs for prefix lookups
+        self._grams = {}       # trigram of lower name -> set of keys
+        self._norm_grams = {}  # trigram of normalized name -> set of keys
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, key):
+        return key in self._names
+
+    def add(self, key: int, names):
+        """Add or replace the names stored for key"""
+        if key in self._names:
+            self.remove(key)
+        for lower in self._store(key, names):
+            bisect.insort(self._sorted, (lower, key))
+
+    def extend(self, items):
+        """Add many (key, names) pairs, sorting the prefix list once (index builds)"""
+        pairs = []
+        for key, names in items:
+            if key in self._names:
+                self.add(key, names)  # Replacement: _sorted is still ordered here
+                continue
+            pairs.extend((lower, key) for lower in self._store(key, names))
+        # One sort instead of an insort per name, which is quadratic for large guilds
+        self._sorted.extend(pairs)
+        self._sorted.sort()
+
+    def _store(self, key, names):
+        """Index the names of key everywhere but _sorted; returns the stored lowercased names"""
+        entries = []
+        seen = set()
+        for name in names:
+            if not name:
+                continue
+            lower = name.lower()
+            if lower in seen:
+                continue
+            seen.add(lower)
+            entries.append((lower, normalize_name(name)))
+        if not entries:
+            return []
+        self._names[key] = tuple(entries)
+        for lower, norm in entries:
+            self._exact.setdefault(lower, set()).add(key)
+            for gram in _grams(lower):
+                self._grams.setdefault(gram, set()).add(key)
+            for gram in _grams(norm):
+                self._norm_grams.setdefault(gram, set()).add(key)
+        return [lower for lower, _ in entries]
+
+    def remove(self, key: int):
+        """Drop every name stored for key"""
+        entries = self._names.pop(key, None)
+        if not entries:
+            return
+        for lower, norm in entries:
+            _discard(self._exact, lower, key)
+            pos = bisect.bisect_left(self._sorted, (lower, key))
+            if pos < len(self._sorted) and self._sorted[pos] == (lower, key):
+                del self._sorted[pos]
+            for gram in _grams(lower):
+                _discard(self._grams, gram, key)
+            for gram in _grams(norm):
+                _discard(self._norm_grams, gram, key)
+
+    def names(self, key: int):
+        """Return the lowercased names stored for key"""
+        return [lower for lower, _ in self._names.get(key, ())]
+
+    # --- Lookups ---
+
+    def exact(self, query: str):
+        return set(self._exact.get(query.lower(), ()))
+
+    def prefix(self, query: str):
+        query = query.lower()
+        keys = set()
+        pos = bisect.bisect_left(self._sorted, (query, -1))
+        while pos < len(self._sorted) and self._sorted[pos][0].startswith(query):
+            keys.add(self._sorted[pos][1])
+            pos += 1
+        return keys
+
+    def contains(self, query: str):
+        query = query.lower()
+        return {
+            key for key in _gram_candidates(self._grams, query)
+            if any(query in lower for lower, _ in self._names[key])
+        }
+
+    def normalized_contains(self, normalized_query: str):
+        if not normalized_query:
+            return set()
+        return {
+            key for key in _gram_candidates(self._norm_grams, normalized_query)
+            if any(normalized_query in norm for _, norm in self._names[key])
+        }
+
+    def fuzzy(self, normalized_query: str, min_score: float = MATCH_THRESHOLD):
+        """Score trigram candidates with SequenceMatcher; returns {key: score}"""
+        if len(normalized_query) < 3:
+            return {}
+        overlap = {}
+        for gram in _grams(normalized_query):
+            for key in self._norm_grams.get(gram, ()):
+                overlap[key] = overlap.get(key, 0) + 1
+        if not overlap:
+            return {}
+        candidates = sorted(overlap, key=overlap.get, reverse=True)[:FUZZY_CANDIDATES]
+
+        min_ratio = min_score / SCORE_FUZZY_WEIGHT
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(normalized_query)
+        scores = {}
+        for key in candidates:
+            best = 0.0
+            for _, norm in self._names[key]:
+                matcher.set_seq1(norm)
+                # Cheap upper bounds first; ratio() is the expensive part
+                if matcher.real_quick_ratio() < min_ratio or matcher.quick_ratio() < min_ratio:
+                    continue
+                best = max(best, matcher.ratio())
+            if best >= min_ratio:
+                scores[key] = best * SCORE_FUZZY_WEIGHT
+        return scores
+
+    def search(self, query: str, weight=None):
+        """Return the best matching key for query, or None below the threshold.
+
+        Tiers mirror the original scoring: exact, startswith, contains,
+        normalized contains, then SequenceMatcher ratio. Ties inside a tier are
+        broken by weight(key) (e.g. member count), highest first.
+        """
+        if not query:
+            return None
+        weight = weight or (lambda key: 0)
+        for tier in (self.exact, self.prefix, self.contains):
+            keys = tier(query)
+            if keys:
+                return max(keys, key=weight)
+        normalized_query = normalize_name(query)
+        keys = self.normalized_contains(normalized_query)
+        if keys:
+            return max(keys, key=weight)
+
+        scores = self.fuzzy(normalized_query)
+        if not scores:
+            return None
+        best_score = max(scores.values())
+        close = [key for key, score in scores.items() if best_score - score < TIE_MARGIN]
+        return max(close, key=lambda key: (weight(key), scores[key]))
+
+    def suggest(self, query: str, limit: int, weight=None):
+        """Return up to limit keys for query, best tier first (autocomplete).
+
+        Same tiers as search(); within a tier keys are ordered by weight and
+        fuzzy matches by score. An empty query lists the highest-weight keys.
+        """
+        weight = weight or (lambda key: 0)
+        if not query:
+            return heapq.nlargest(limit, self._names, key=weight)
+        found = []
+        seen = set()
+        normalized_query = normalize_name(query)
+        tiers = (
+            lambda: self.exact(query),
+            lambda: self.prefix(query),
+            lambda: self.contains(query),
+            lambda: self.normalized_contains(normalized_query),
+        )
+        for tier in tiers:
+            keys = tier() - seen
+            for key in heapq.nlargest(limit - len(found), keys, key=weight):
+                found.append(key)
+                seen.add(key)
+            if len(found) >= limit:
+                return found
+        scores = self.fuzzy(normalized_query)
+        for key in sorted(scores.keys() - seen, key=lambda key: (scores[key], weight(key)), reverse=True):
+            found.append(key)
+            if len(found) >= limit:
+                break
+        return found
+
+def _discard(mapping, name, key):
+    keys = mapping.get(name)
+    if keys is None:
+        return
+    keys.discard(key)
+    if not keys:
+        del mapping[name]
+
+def _gram_candidates(gram_map, query: str):
+    """Keys whose names may contain query, from the trigram postings"""
+    if not query:
+        return set()
+    if len(query) >= 3:
+        postings = [gram_map.get(gram) for gram in _grams(query)]
+        if not all(postings):
+            return set()
+        postings.sort(key=len)
+        result = set(postings[0])
+        for keys in postings[1:]:
+            result &= keys
+            if not result:
+                break
+        return result
+    # Short queries: every name containing it has a gram containing it
+    result = set()
+    for gram, keys in gram_map.items():
+        if query in gram:
+            result |= keys
+    return result
+
+# =============================================================================
+# RESOLVER ENGINE
+# =============================================================================
+
+# Number of recent query -> ID results kept in the LRU cache
+QUERY_CACHE_SIZE = 512
+
+KIND_VOICE_CHANNEL = "voice_channel"
+KIND_ROLE = "role"
+KIND_MEMBER = "member"
+
+def member_names(member):
+    """Names a member can be looked up by: display name, username and nickname"""
+    return [
+        getattr(member, "display_name", "") or "",
+        getattr(member, "name", "") or "",
+        getattr(member, "nick", "") or "",
+    ]
+
+def extract_id_from_mention(query: str):
+    try:
+        match = re.match(r"^<@!?(\d+)>$", query.strip())
+        if match:
+            return int(match.group(1))
+    except Exception:
+        return None
+    return None
+
+class ResolverEngine:
+    """Shared resolver for voice channels, roles and members.
+
+    Keeps one lazily built NameIndex per (kind, guild) with pre-normalized
+    names, updated from create/update/delete events, plus an LRU cache of
+    recent query -> ID results. Cached results for a kind are dropped whenever
+    that kind changes in the guild, so a cached answer is always one the index
+    would still give (tie-breaks on live counts such as voice occupancy are
+    decided when the result is first computed).
+    """
+
+    def __init__(self, cache_size: int = QUERY_CACHE_SIZE):
+        self._indexes = {}
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+
+    # --- Public resolvers (raise ValueError with a reason code) ---
+
+    def resolve_voice_channel(self, guild: discord.Guild, query: str):
+        if not query:
+            raise ValueError("empty_query")
+        try:
+            channel = guild.get_channel(int(query))
+            if isinstance(channel, discord.VoiceChannel):
+                return channel
+        except Exception:
+            pass
+        return self._resolve(
+            guild, KIND_VOICE_CHANNEL, query,
+            lookup=guild.get_channel,
+            # Slight tie-breaker: prefer channels with more members
+            weight=lambda ch: len(ch.members),
+            empty_reason="no_voice_channels",
+        )
+
+    def resolve_role(self, guild: discord.Guild, query: str):
+        if not query:
+            raise ValueError("empty_query")
+        try:
+            role = guild.get_role(int(query))
+            if isinstance(role, discord.Role):
+                return role
+        except Exception:
+            pass
+        return self._resolve(
+            guild, KIND_ROLE, query,
+            lookup=guild.get_role,
+            # Slight tie-breaker: prefer roles with more members (indexed counts; role.members scans the guild)
+            weight=lambda role: len(member_index.role_member_ids(guild, role)),
+            empty_reason="no_roles",
+        )
+
+    def resolve_member(self, guild: discord.Guild, query: str):
+        if not query:
+            raise ValueError("empty_query")
+        mention_id = extract_id_from_mention(query)
+        if mention_id is not None:
+            member = guild.get_member(mention_id)
+            if isinstance(member, discord.Member):
+                return member
+        try:
+            member = guild.get_member(int(query))
+            if isinstance(member, discord.Member):
+                return member
+        except Exception:
+            pass
+        return self._resolve(
+            guild, KIND_MEMBER, query,
+            lookup=guild.get_member,
+            # Slight tie-breaker: prefer members with more roles
+            weight=lambda member: len(member.roles),
+            empty_reason="no_members",
+        )
+
+    def suggest(self, guild: discord.Guild, kind: str, query: str, limit: int = 25):
+        """Up to limit voice channels, roles or members matching query, best first"""
+        lookup = {KIND_VOICE_CHANNEL: guild.get_channel, KIND_ROLE: guild.get_role, KIND_MEMBER: guild.get_member}[kind]
+        weight = {
+            KIND_VOICE_CHANNEL: lambda ch: len(ch.members),
+            # Role position instead of member count: counting members of every role is O(guild)
+            KIND_ROLE: lambda role: role.position,
+            KIND_MEMBER: lambda member: len(member.roles),
+        }[kind]
+
+        def _weight(key):
+            obj = lookup(key)
+            return weight(obj) if obj is not None else -1
+
+        keys = self.index(guild, kind).suggest(query.strip(), limit, weight=_weight)
+        return [obj for obj in map(lookup, keys) if obj is not None]
+
+    def index(self, guild: discord.Guild, kind: str):
+        """Return the NameIndex for kind in guild, building it on first use"""
+        index = self._indexes.get((kind, guild.id))
+        if index is None:
+            index = NameIndex()
+            index.extend((obj.id, self._names(kind, obj)) for obj in self._source(guild, kind))
+            self._indexes[(kind, guild.id)] = index
+        return index
+
+    # --- Event hooks ---
+
+    def channel_changed(self, channel):
+        if isinstance(channel, discord.VoiceChannel):
+            self._update(KIND_VOICE_CHANNEL, channel.guild.id, channel)
+        else:
+            # A channel converted away from voice must leave the index
+            self._remove(KIND_VOICE_CHANNEL, channel.guild.id, channel.id)
+
+    def channel_removed(self, channel):
+        self._remove(KIND_VOICE_CHANNEL, channel.guild.id, channel.id)
+
+    def role_changed(self, role: discord.Role):
+        self._update(KIND_ROLE, role.guild.id, role)
+
+    def role_removed(self, role: discord.Role):
+        self._remove(KIND_ROLE, role.guild.id, role.id)
+
+    def member_changed(self, member: discord.Member, before=None):
+        # Role, timeout and pending updates leave the names alone: keep the index and cached lookups
+        if before is not None and member_names(before) == member_names(member):
+            return
+        self._update(KIND_MEMBER, member.guild.id, member)
+
+    def member_removed(self, member: discord.Member):
+        self._remove(KIND_MEMBER, member.guild.id, member.id)
+
+    def invalidate(self, guild_id=None):
+        """Drop indexes and cached results for one guild (or all guilds)"""
+        if guild_id is None:
+            self._indexes.clear()
+            self._cache.clear()
+            return
+        for key in [key for key in self._indexes if key[1] == guild_id]:
+            del self._indexes[key]
+        self._clear_cache(guild_id)
+
+    # --- Internals ---
+
+    def _resolve(self, guild, kind, query, lookup, weight, empty_reason):
+        cache_key = (kind, guild.id, query)
+        cached_id = self._cache.get(cache_key)
+        if cached_id is not None:
+            obj = lookup(cached_id)
+            if obj is not None:
+                self._cache.move_to_end(cache_key)
+                return obj
+            del self._cache[cache_key]
+
+        index = self.index(guild, kind)
+        if not len(index):
+            raise ValueError(empty_reason)
+
+        def _weight(key):
+            obj = lookup(key)
+            return weight(obj) if obj is not None else -1
+
+        best_id = index.search(query, weight=_weight)
+        obj = lookup(best_id) if best_id is not None else None
+        if obj is None:
+            raise ValueError("not_found")
+
+        self._cache[cache_key] = best_id
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return obj
+
+    def _source(self, guild, kind):
+        if kind == KIND_VOICE_CHANNEL:
+            return [c for c in guild.channels if isinstance(c, discord.VoiceChannel)]
+        if kind == KIND_ROLE:
+            return guild.roles
+        return guild.members
+
+    def _names(self, kind, obj):
+        if kind == KIND_MEMBER:
+            return member_names(obj)
+        return [obj.name]
+
+    def _update(self, kind, guild_id, obj):
+        index = self._indexes.get((kind, guild_id))
+        if index is not None:
+            index.add(obj.id, self._names(kind, obj))
+        self._clear_cache(guild_id, kind)
+
+    def _remove(self, kind, guild_id, key):
+        index = self._indexes.get((kind, guild_id))
+        if index is not None:
+            index.remove(key)
+        self._clear_cache(guild_id, kind)
+
+    def _clear_cache(self, guild_id, kind=None):
+        stale = [key for key in self._cache if key[1] == guild_id and (kind is None or key[0] == kind)]
+        for key in stale:
+            del self._cache[key]
+
+# Global instance
+resolver = ResolverEngine()
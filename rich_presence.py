@@ -2,8 +2,14 @@
 # Fully editable by commands with image support
 
 import discord
+import asyncio
+import collections
 import json
 import os
+import time
+
+from counters import guild_counters
+from storage import write_json_atomic
 
 # =============================================================================
 # RICH PRESENCE SETTINGS - Default values (can be overridden by commands)
@@ -28,6 +34,28 @@ DEFAULT_SMALL_TEXT = ""
 # Settings file to store command changes
 SETTINGS_FILE = 'rich_presence_settings.json'
 
+# Seconds to coalesce rapid setting changes into one write
+SETTINGS_SAVE_DELAY = 1.0
+
+# fsync policy for settings writes: "always" (survives power loss) or "never"
+SETTINGS_FSYNC = os.getenv('PRESENCE_SETTINGS_FSYNC', 'always').lower() != 'never'
+
+# Presence changes requested within this many seconds are merged into one update
+PRESENCE_UPDATE_WINDOW = 1.0
+
+# Gateway presence updates allowed per period (stays well under Discord's limit)
+PRESENCE_MAX_UPDATES = 5
+PRESENCE_RATE_PERIOD = 60.0
+
+# Shortest allowed interval between rotating activity texts (seconds)
+PRESENCE_MIN_ROTATION_INTERVAL = 30
+
+# Seconds between automatic refreshes of the server/member counts (0 disables)
+try:
+    PRESENCE_REFRESH_INTERVAL = max(0, int(os.getenv('PRESENCE_REFRESH_INTERVAL', '300')))
+except ValueError:
+    PRESENCE_REFRESH_INTERVAL = 300
+
 # =============================================================================
 # RICH PRESENCE MANAGER
 # =============================================================================
@@ -35,6 +63,19 @@ SETTINGS_FILE = 'rich_presence_settings.json'
 class RichPresenceManager:
     def __init__(self):
         self.settings = self.load_settings()
+        self._save_task = None
+        self._dirty = False
+        # Presence scheduling state
+        self._bot = None
+        self._update_pending = False
+        self._update_task = None
+        self._last_sent = None
+        self._sent_times = collections.deque(maxlen=PRESENCE_MAX_UPDATES)
+        self._rotation_task = None
+        self._rotation_index = 0
+        self._refresh_task = None
+        self.updates_sent = 0
+        self.updates_skipped = 0
     
     def load_settings(self):
         """Load settings from file or use defaults"""
@@ -66,92 +107,187 @@ class RichPresenceManager:
             'large_image': DEFAULT_LARGE_IMAGE,
             'large_text': DEFAULT_LARGE_TEXT,
             'small_image': DEFAULT_SMALL_IMAGE,
-            'small_text': DEFAULT_SMALL_TEXT
+            'small_text': DEFAULT_SMALL_TEXT,
+            'rotation_texts': [],
+            'rotation_interval': 0
         }
     
+    def serialize_settings(self):
+        """Settings as JSON-ready values"""
+        # Convert discord objects to strings for JSON
+        settings_to_save = self.settings.copy()
+        settings_to_save['bot_status'] = self.settings['bot_status'].name
+        settings_to_save['activity_type'] = self.settings['activity_type'].name
+        return settings_to_save
+    
     def save_settings(self):
-        """Save settings to file"""
+        """Schedule a save of the settings file.
+
+        Changes made within SETTINGS_SAVE_DELAY are coalesced into one atomic
+        write done off the event loop. Without a running loop the file is
+        written immediately.
+        """
+        self._dirty = True
         try:
-            # Convert discord objects to strings for JSON
-            settings_to_save = self.settings.copy()
-            settings_to_save['bot_status'] = self.settings['bot_status'].name
-            settings_to_save['activity_type'] = self.settings['activity_type'].name
-            
-            with open(SETTINGS_FILE, 'w') as f:
-                json.dump(settings_to_save, f, indent=4)
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._dirty = False
+            try:
+                write_json_atomic(SETTINGS_FILE, self.serialize_settings(), indent=4, fsync=SETTINGS_FSYNC)
+            except Exception as e:
+                print(f"❌ Error saving settings: {e}")
+            return
+        if self._save_task is None or self._save_task.done():
+            self._save_task = loop.create_task(self._save_later())
+    
+    async def _save_later(self):
+        # Keep writing until no change arrived during the previous write
+        while self._dirty:
+            await asyncio.sleep(SETTINGS_SAVE_DELAY)
+            await self.flush_settings()
+    
+    async def flush_settings(self):
+        """Write pending setting changes now"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        settings_to_save = self.serialize_settings()
+        try:
+            await asyncio.to_thread(write_json_atomic, SETTINGS_FILE, settings_to_save, indent=4, fsync=SETTINGS_FSYNC)
         except Exception as e:
             print(f"❌ Error saving settings: {e}")
     
     def update_setting(self, key, value):
-        """Update a setting and save to file"""
+        """Update a setting and schedule a save to file"""
         self.settings[key] = value
         self.save_settings()
     
+    # --- Presence scheduling ---
+    
     async def set_presence(self, bot):
-        """Set the bot's Rich Presence based on current settings"""
-        try:
-            # Build activity text
-            activity_text = self.settings['activity_text']
-            
-            # Add server/member count if enabled
-            if self.settings['show_server_count'] or self.settings['show_member_count']:
-                server_count = len(bot.guilds)
-                member_count = sum(guild.member_count for guild in bot.guilds if guild.member_count)
-                
-                info_parts = []
-                if self.settings['show_server_count']:
-                    info_parts.append(f"{server_count} server{'s' if server_count != 1 else ''}")
-                if self.settings['show_member_count']:
-                    info_parts.append(f"{member_count:,} members")
-                
-                if info_parts:
-                    activity_text += f" | {', '.join(info_parts)}"
+        """Request a presence update from the current settings.
+
+        Requests are merged: one gateway update is sent per
+        PRESENCE_UPDATE_WINDOW, only when the presence actually changed, and
+        never more than PRESENCE_MAX_UPDATES per PRESENCE_RATE_PERIOD.
+        """
+        self._bot = bot
+        self._update_pending = True
+        if self._update_task is None or self._update_task.done():
+            self._update_task = asyncio.get_running_loop().create_task(self._flush_updates())
+        self.start_rotation(bot)
+        self.start_auto_refresh(bot)
+    
+    async def _flush_updates(self):
+        while self._update_pending:
+            await asyncio.sleep(PRESENCE_UPDATE_WINDOW)
+            await self._wait_for_rate_limit()
+            # Changes that arrived while waiting are included in this update
+            self._update_pending = False
+            status, activity = self.build_presence(self._bot)
+            await self._send(self._bot, status, activity)
+    
+    def current_activity_text(self):
+        """Activity text, taken from the rotation when one is configured"""
+        texts = self.settings.get('rotation_texts') or []
+        if texts and self.settings.get('rotation_interval', 0) > 0:
+            return texts[self._rotation_index % len(texts)]
+        return self.settings['activity_text']
+    
+    def build_presence(self, bot):
+        """(status, activity) for the current settings"""
+        # Build activity text
+        activity_text = self.current_activity_text()
+        
+        # Add server/member count if enabled (live counters, no guild iteration)
+        if self.settings['show_server_count'] or self.settings['show_member_count']:
+            server_count = guild_counters.servers
+            member_count = guild_counters.members
             
-            # Create activity based on type
-            if self.settings['enable_streaming']:
-                activity = discord.Streaming(
-                    name=self.settings['streaming_title'],
-                    url=self.settings['streaming_url']
-                )
-            else:
-                # Create activity
-                activity = discord.Activity(
-                    type=self.settings['activity_type'],
-                    name=activity_text
-                )
+            info_parts = []
+            if self.settings['show_server_count']:
+                info_parts.append(f"{server_count} server{'s' if server_count != 1 else ''}")
+            if self.settings['show_member_count']:
+                info_parts.append(f"{member_count:,} members")
             
-            # Set the presence
-            await bot.change_presence(
-                status=self.settings['bot_status'],
-                activity=activity
+            if info_parts:
+                activity_text += f" | {', '.join(info_parts)}"
+        
+        # Create activity based on type
+        if self.settings['enable_streaming']:
+            activity = discord.Streaming(
+                name=self.settings['streaming_title'],
+                url=self.settings['streaming_url']
             )
-            
-            print(f"🎭 Rich Presence set: {activity_text}")
+        else:
+            # Create activity
+            activity = discord.Activity(
+                type=self.settings['activity_type'],
+                name=activity_text
+            )
+        return self.settings['bot_status'], activity
+    
+    async def _send(self, bot, status, activity):
+        """Send a presence update unless it equals the last one sent"""
+        key = (status, activity.type, activity.name, getattr(activity, 'url', None))
+        if key == self._last_sent:
+            self.updates_skipped += 1
+            return
+        await self._wait_for_rate_limit()
+        try:
+            await bot.change_presence(status=status, activity=activity)
+            self._last_sent = key
+            self._sent_times.append(time.monotonic())
+            self.updates_sent += 1
+            print(f"🎭 Rich Presence set: {activity.name}")
             print("ℹ️ Note: Discord bots cannot display Rich Presence images")
-            
         except Exception as e:
             print(f"❌ Error setting Rich Presence: {e}")
     
+    async def _wait_for_rate_limit(self):
+        while len(self._sent_times) == PRESENCE_MAX_UPDATES:
+            wait = PRESENCE_RATE_PERIOD - (time.monotonic() - self._sent_times[0])
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+    
+    def start_rotation(self, bot):
+        """Cycle rotation_texts every rotation_interval seconds (if configured)"""
+        if self.settings.get('rotation_texts') and self.settings.get('rotation_interval', 0) > 0:
+            if self._rotation_task is None or self._rotation_task.done():
+                self._rotation_task = asyncio.get_running_loop().create_task(self._rotate(bot))
+    
+    async def _rotate(self, bot):
+        while True:
+            texts = self.settings.get('rotation_texts') or []
+            interval = self.settings.get('rotation_interval', 0)
+            if not texts or interval <= 0:
+                return
+            await asyncio.sleep(max(interval, PRESENCE_MIN_ROTATION_INTERVAL))
+            self._rotation_index = (self._rotation_index + 1) % len(texts)
+            await self.set_presence(bot)
+    
+    def start_auto_refresh(self, bot):
+        """Refresh the shown counts every PRESENCE_REFRESH_INTERVAL seconds"""
+        if PRESENCE_REFRESH_INTERVAL and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.get_running_loop().create_task(self._auto_refresh(bot))
+    
+    async def _auto_refresh(self, bot):
+        while True:
+            await asyncio.sleep(PRESENCE_REFRESH_INTERVAL)
+            # Unchanged counts are dropped by the dedupe in _send
+            if self.settings['show_server_count'] or self.settings['show_member_count']:
+                await self.set_presence(bot)
+    
     async def set_custom_activity(self, bot, text, activity_type=None):
         """Set a custom activity (for commands)"""
-        try:
-            if activity_type is None:
-                activity_type = self.settings['activity_type']
-            
-            activity = discord.Activity(
-                type=activity_type,
-                name=text
-            )
-            
-            await bot.change_presence(
-                status=self.settings['bot_status'],
-                activity=activity
-            )
-            
-            print(f"🎭 Custom activity set: {text}")
-            
-        except Exception as e:
-            print(f"❌ Error setting custom activity: {e}")
+        if activity_type is None:
+            activity_type = self.settings['activity_type']
+        activity = discord.Activity(
+            type=activity_type,
+            name=text
+        )
+        await self._send(bot, self.settings['bot_status'], activity)
     
     async def reset_presence(self, bot):
         """Reset to default presence"""
@@ -176,6 +312,10 @@ async def reset_presence(bot):
     """Reset to default presence"""
     await presence_manager.reset_presence(bot)
 
+async def flush_settings():
+    """Write pending (debounced) setting changes now, e.g. before shutdown"""
+    await presence_manager.flush_settings()
+
 # =============================================================================
 # CUSTOMIZATION GUIDE
 # =============================================================================
@@ -216,6 +356,7 @@ async def reset_presence(bot):
    - .setlargetext <text> - Set large image text
    - .setsmallimage <key> - Set small image
    - .setsmalltext <text> - Set small image text
+   - .setrotation <seconds> <text> | <text> ... - Rotate activity texts (.setrotation off to stop)
    - .resetpresence - Reset to default
    - .presenceinfo - Show current settings
    - .presencehelp - Show this guide
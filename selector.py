@@ -0,0 +1,175 @@
+# selector.py - Member selector language for the BrainAllianceFX Bot
+# Compiles expressions like `in:@A & !in:@B & bot:false & joined<30d` to set operations over member indexes
+
+import re
+import time
+
+import discord
+
+from member_index import member_index
+from resolver import resolver
+
+# =============================================================================
+# SELECTOR SYNTAX
+# =============================================================================
+#
+#   expr   := term ('|' term)*
+#   term   := factor ('&' factor)*
+#   factor := '!' factor | '(' expr ')' | atom
+#   atom   := in:<role> | bot:true|false | voice:any|none|<channel>
+#           | joined<Nd | joined>Nd | all
+#
+# Values containing spaces are quoted: in:"Trading Team". Durations accept
+# m (minutes), h (hours), d (days) and w (weeks).
+
+TOKEN_PATTERN = re.compile(r'\s*(?:(?P<op>[()!&|])|(?P<atom>[A-Za-z]+(?:[:<>](?:"[^"]*"|<[@#]&?!?\d+>|[^\s()&|]+))?))')
+ATOM_PATTERN = re.compile(r'(?P<key>[A-Za-z]+)(?:(?P<sep>[:<>])(?P<value>.*))?', re.S)
+MENTION_PATTERN = re.compile(r'<[@#]&?!?(\d+)>')
+DURATION_PATTERN = re.compile(r'(\d+)([mhdw])')
+DURATION_SECONDS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+class SelectorError(ValueError):
+    """Invalid selector; the message is shown to the user"""
+
+# =============================================================================
+# COMPILATION
+# =============================================================================
+
+def tokenize(text: str):
+    tokens = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        if not match or match.end() == position:
+            raise SelectorError(f"unexpected input at `{text[position:position + 20]}`")
+        tokens.append(match.group('op') or match.group('atom'))
+        position = match.end()
+    return tokens
+
+def compile_selector(text: str, guild: discord.Guild):
+    """Parse text and resolve its roles/channels for guild; returns an evaluable tree.
+
+    Tree nodes are ('or', a, b), ('and', a, b), ('not', a) and ('set', fn)
+    where fn() returns a set of member IDs from the indexes.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        raise SelectorError("empty selector")
+    parser = _Parser(tokens, guild)
+    tree = parser.expr()
+    if parser.position != len(tokens):
+        raise SelectorError(f"unexpected `{tokens[parser.position]}`")
+    return tree
+
+def evaluate(tree, guild: discord.Guild):
+    """Member IDs matched by a compiled selector"""
+    kind = tree[0]
+    if kind == 'set':
+        return set(tree[1]())
+    if kind == 'not':
+        return member_index.guild(guild).member_ids - evaluate(tree[1], guild)
+    left = evaluate(tree[1], guild)
+    if kind == 'and':
+        # Skip the right side entirely once nothing is left
+        return left & evaluate(tree[2], guild) if left else left
+    return left | evaluate(tree[2], guild)
+
+def select_members(text: str, guild: discord.Guild):
+    """Compile and evaluate text, returning the matching cached members"""
+    return member_index.members(guild, evaluate(compile_selector(text, guild), guild))
+
+class _Parser:
+    def __init__(self, tokens, guild):
+        self.tokens = tokens
+        self.position = 0
+        self.guild = guild
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        if token is None:
+            raise SelectorError("selector ends unexpectedly")
+        self.position += 1
+        return token
+
+    def expr(self):
+        node = self.term()
+        while self.peek() == '|':
+            self.take()
+            node = ('or', node, self.term())
+        return node
+
+    def term(self):
+        node = self.factor()
+        while self.peek() == '&':
+            self.take()
+            node = ('and', node, self.factor())
+        return node
+
+    def factor(self):
+        token = self.take()
+        if token == '!':
+            return ('not', self.factor())
+        if token == '(':
+            node = self.expr()
+            if self.take() != ')':
+                raise SelectorError("missing `)`")
+            return node
+        if token in (')', '&', '|'):
+            raise SelectorError(f"unexpected `{token}`")
+        return self.atom(token)
+
+    def atom(self, token):
+        match = ATOM_PATTERN.fullmatch(token)
+        key, sep, value = match.group('key').lower(), match.group('sep'), _target(match.group('value') or '')
+        index = lambda: member_index.guild(self.guild)
+        if key == 'all' and sep is None:
+            return ('set', lambda: index().member_ids)
+        if key == 'in' and sep == ':':
+            try:
+                role = resolver.resolve_role(self.guild, value)
+            except ValueError:
+                raise SelectorError(f"role not found: `{value}`")
+            return ('set', lambda: member_index.role_member_ids(self.guild, role))
+        if key == 'bot' and sep == ':' and value.lower() in ('true', 'false', 'yes', 'no'):
+            if value.lower() in ('true', 'yes'):
+                return ('set', lambda: index().bot_ids)
+            return ('set', lambda: index().member_ids - index().bot_ids)
+        if key == 'voice' and sep == ':':
+            return self.voice(value)
+        if key == 'joined' and sep in ('<', '>'):
+            seconds = parse_duration(value)
+            if sep == '<':
+                return ('set', lambda: index().joined_between(after=time.time() - seconds))
+            return ('set', lambda: index().joined_between(before=time.time() - seconds))
+        raise SelectorError(f"unknown selector `{token}`")
+
+    def voice(self, value):
+        index = lambda: member_index.guild(self.guild)
+        if value.lower() == 'any':
+            return ('set', lambda: set(index().member_voice))
+        if value.lower() == 'none':
+            return ('set', lambda: index().member_ids - index().member_voice.keys())
+        try:
+            channel = resolver.resolve_voice_channel(self.guild, value)
+        except ValueError:
+            raise SelectorError(f"voice channel not found: `{value}`")
+        return ('set', lambda: index().voice_members.get(channel.id, set()))
+
+def _target(value: str):
+    """Role/channel query from a selector value: mention -> ID, '@Name' -> 'Name'"""
+    value = value.strip('"')
+    mention = MENTION_PATTERN.fullmatch(value)
+    if mention:
+        return mention.group(1)
+    return value.lstrip('@#')
+
+def parse_duration(value: str):
+    """Seconds in a duration such as 30d or 12h"""
+    match = DURATION_PATTERN.fullmatch(value.lower())
+    if not match:
+        raise SelectorError(f"invalid duration `{value}` (use e.g. 30d, 12h)")
+    return int(match.group(1)) * DURATION_SECONDS[match.group(2)]
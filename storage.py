@@ -0,0 +1,40 @@
+# storage.py - Local JSON persistence helpers for the BrainAllianceFX Bot
+# Atomic writes (temp file + rename) meant to run off the event loop
+
+import json
+import os
+import tempfile
+
+def write_json_atomic(path: str, data, indent=None, fsync: bool = False):
+    """Write data as JSON to path atomically.
+
+    The JSON is written to a temp file in the same directory and renamed over
+    path, so readers see either the old or the new file, never a partial one.
+    With fsync=True the data is flushed to disk before the rename.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            if indent is None:
+                json.dump(data, f, separators=(',', ':'))
+            else:
+                json.dump(data, f, indent=indent)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def read_json(path: str, default=None):
+    """Read JSON from path, returning default if the file does not exist"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
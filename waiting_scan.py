@@ -0,0 +1,187 @@
+# waiting_scan.py - Background, resumable Waiting Setup scan for the BrainAllianceFX Bot
+# Runs ensure_waiting_setup_for_member over a guild with bounded concurrency
+
+import asyncio
+import os
+import time
+
+from member_index import member_index
+from storage import read_json, write_json_atomic
+
+# =============================================================================
+# SCAN SETTINGS
+# =============================================================================
+
+WAITING_SCAN_CHECKPOINT_FILE = 'waiting_scan_checkpoint.json'
+
+# Members set up in parallel per guild
+try:
+    WAITING_SCAN_CONCURRENCY = max(1, int(os.getenv('WAITING_SCAN_CONCURRENCY', '4')))
+except ValueError:
+    WAITING_SCAN_CONCURRENCY = 4
+
+# Seconds to coalesce checkpoint updates before writing them
+WAITING_SCAN_CHECKPOINT_DELAY = 2.0
+
+# =============================================================================
+# SCAN PROGRESS
+# =============================================================================
+
+class ScanProgress:
+    """Live metrics for one guild's scan"""
+
+    def __init__(self, guild_id: int, total: int, resumed: int = 0):
+        self.guild_id = guild_id
+        self.total = total
+        self.done = 0
+        self.channels_created = 0
+        self.roles_assigned = 0
+        self.failed = []  # (member, error)
+        self.resumed = resumed  # members finished before a restart, not scanned again
+        self.started_at = time.time()
+        self.finished_at = None
+
+    @property
+    def running(self):
+        return self.finished_at is None
+
+    @property
+    def rate(self):
+        """Members per second so far"""
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+# =============================================================================
+# WAITING SCANNER
+# =============================================================================
+
+class WaitingScanner:
+    """Runs the Waiting Setup scan as a background task per guild.
+
+    Members with the trigger role (read from the member index) are processed
+    by a small pool of workers. The IDs of finished members are checkpointed
+    to disk, so a scan interrupted by a restart skips them and picks up every
+    other member with the trigger role, including ones who got it while the
+    bot was offline. The checkpoint is cleared once a scan completes.
+    """
+
+    def __init__(self, path: str = WAITING_SCAN_CHECKPOINT_FILE, concurrency: int = WAITING_SCAN_CONCURRENCY):
+        self.setup_member = None
+        self.prepare_guild = None
+        self.path = path
+        self.concurrency = concurrency
+        self.progress = {}
+        self._tasks = {}
+        self._listeners = {}
+        self._checkpoints = None
+        self._save_task = None
+        self._dirty = False
+
+    def configure(self, setup_member, prepare_guild=None):
+        """Set the coroutine run per member: setup_member(guild, member, trigger_role, waiting_role, category).
+
+        prepare_guild(guild), if given, is awaited before the members are listed
+        (e.g. to load the member list when it is not cached).
+        """
+        self.setup_member = setup_member
+        self.prepare_guild = prepare_guild
+
+    def start(self, guild, trigger_role, waiting_role, category):
+        """Start a scan for guild (or return the one already running)"""
+        task = self._tasks.get(guild.id)
+        if task is None or task.done():
+            task = asyncio.get_running_loop().create_task(self._run(guild, trigger_role, waiting_role, category))
+            self._tasks[guild.id] = task
+        return task
+
+    def add_listener(self, guild_id: int, listener):
+        """Call listener(done, total) as members of guild's scan finish"""
+        self._listeners.setdefault(guild_id, []).append(listener)
+
+    def remove_listener(self, guild_id: int, listener):
+        listeners = self._listeners.get(guild_id, [])
+        if listener in listeners:
+            listeners.remove(listener)
+
+    def _notify(self, progress: ScanProgress):
+        for listener in list(self._listeners.get(progress.guild_id, ())):
+            try:
+                listener(progress.done, progress.total)
+            except Exception:
+                pass
+
+    def is_running(self, guild_id: int):
+        task = self._tasks.get(guild_id)
+        return task is not None and not task.done()
+
+    async def _run(self, guild, trigger_role, waiting_role, category):
+        await self._load_checkpoints()
+        if self.prepare_guild is not None:
+            await self.prepare_guild(guild)
+        finished = self._checkpoints.setdefault(str(guild.id), set())
+
+        members = sorted(
+            (m for m in member_index.role_members(guild, trigger_role) if not m.bot and m.id not in finished),
+            key=lambda m: m.id
+        )
+
+        progress = ScanProgress(guild.id, len(members), resumed=len(finished))
+        self.progress[guild.id] = progress
+
+        next_index = 0  # next member handed to a worker
+
+        async def _worker():
+            nonlocal next_index
+            while next_index < len(members):
+                member = members[next_index]
+                next_index += 1
+                try:
+                    channel_created, role_assigned = await self.setup_member(guild, member, trigger_role, waiting_role, category)
+                    progress.channels_created += int(bool(channel_created))
+                    progress.roles_assigned += int(bool(role_assigned))
+                except Exception as e:
+                    progress.failed.append((member, e))
+                    print(f"❌ Waiting setup failed for {member} ({member.id}): {e}")
+                progress.done += 1
+                finished.add(member.id)
+                self._schedule_save()
+                self._notify(progress)
+
+        try:
+            await asyncio.gather(*(_worker() for _ in range(min(self.concurrency, len(members)) or 1)))
+            # Completed: the next scan starts from the beginning
+            self._checkpoints.pop(str(guild.id), None)
+            self._schedule_save()
+        finally:
+            progress.finished_at = time.time()
+            self._notify(progress)
+        return progress
+
+    async def _load_checkpoints(self):
+        if self._checkpoints is not None:
+            return
+        try:
+            data = await asyncio.to_thread(read_json, self.path, {})
+            # guild ID -> finished member IDs (older checkpoints held a single ID: those guilds are rescanned in full)
+            self._checkpoints = {guild_id: set(member_ids) for guild_id, member_ids in data.items() if isinstance(member_ids, list)}
+        except Exception as e:
+            print(f"❌ Error loading waiting scan checkpoint: {e}")
+            self._checkpoints = {}
+
+    def _schedule_save(self):
+        self._dirty = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.get_running_loop().create_task(self._save_later())
+
+    async def _save_later(self):
+        while self._dirty:
+            await asyncio.sleep(WAITING_SCAN_CHECKPOINT_DELAY)
+            self._dirty = False
+            try:
+                data = {guild_id: sorted(member_ids) for guild_id, member_ids in self._checkpoints.items()}
+                await asyncio.to_thread(write_json_atomic, self.path, data)
+            except Exception as e:
+                print(f"❌ Error saving waiting scan checkpoint: {e}")
+
+# Global instance
+waiting_scanner = WaitingScanner()
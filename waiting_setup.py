@@ -0,0 +1,102 @@
+# waiting_setup.py - Waiting Setup workflow for the BrainAllianceFX Bot
+# Gives members with the trigger role the waiting role and a private channel (scan, event and .setupwaiting)
+
+import asyncio
+import weakref
+
+import discord
+
+from waiting_scan import waiting_scanner
+from private_channels import private_channels, owner_topic
+from member_lookup import member_lookup
+from guild_config import guild_config
+
+def waiting_setup_targets(guild: discord.Guild):
+    """(trigger_role, waiting_role, category) configured for guild, or None if any is missing"""
+    if guild.id not in guild_config.waiting_guilds:
+        return None
+    trigger_role = guild.get_role(guild_config.get(guild.id, 'trigger_role'))
+    waiting_role = guild.get_role(guild_config.get(guild.id, 'waiting_role'))
+    category = guild.get_channel(guild_config.get(guild.id, 'waiting_category'))
+    if not trigger_role or not waiting_role or not isinstance(category, discord.CategoryChannel):
+        return None
+    return trigger_role, waiting_role, category
+
+def start_waiting_scan(guild: discord.Guild):
+    """Start (or join) the background Waiting Setup scan for guild; None if not configured"""
+    targets = waiting_setup_targets(guild)
+    if targets is None:
+        return None
+    return waiting_scanner.start(guild, *targets)
+
+# Per-member locks so the scan and on_member_update never set up the same member twice
+_waiting_setup_locks = weakref.WeakValueDictionary()
+
+async def ensure_waiting_setup_for_member(guild: discord.Guild, member: discord.Member, trigger_role: discord.Role, waiting_role: discord.Role, category: discord.CategoryChannel):
+    """Ensure the member with trigger_role has a private text channel under category and has waiting_role.
+
+    Idempotent: re-assigns missing role, creates channel if absent.
+    Returns (channel_created: bool, role_assigned: bool).
+    """
+    lock = _waiting_setup_locks.get(member.id)
+    if lock is None:
+        lock = _waiting_setup_locks[member.id] = asyncio.Lock()
+    async with lock:
+        return await _ensure_waiting_setup(guild, member, trigger_role, waiting_role, category)
+
+async def _ensure_waiting_setup(guild, member, trigger_role, waiting_role, category):
+    channel_created = False
+    role_assigned = False
+
+    # Ensure waiting role
+    if waiting_role not in getattr(member, 'roles', []):
+        await member.add_roles(waiting_role, reason=f"Automatic waiting setup")
+        role_assigned = True
+
+    # Ensure private channel (looked up by member ID, so renamed users keep theirs)
+    await private_channels.ensure_loaded()
+    desired_name = member.name.lower()
+    existing = private_channels.lookup(category, member)
+    if existing is None:
+        overwrites = {
+            guild.default_role: discord.PermissionOverwrite(view_channel=False),
+            member: discord.PermissionOverwrite(view_channel=True, read_message_history=True, send_messages=True)
+        }
+        channel = await guild.create_text_channel(
+            name=desired_name,
+            category=category,
+            overwrites=overwrites,
+            topic=owner_topic(member),
+            reason=f"Private waiting channel for {member} ({member.id})"
+        )
+        private_channels.set(category.id, member.id, channel.id)
+        channel_created = True
+        # Send welcome message to the newly created channel
+        try:
+            welcome_message = (
+                f"👋 Ciao {member.mention},\n"
+                f"Complimenti per aver avuto il coraggio di iniziare il tuo percorso di **Trading** con noi 💪\n\n"
+                f"Con dedizione e studio potrai davvero **cambiare la tua vita** 🚀\n\n"
+                f"Questa è la tua **chat privata** con il trader 💬\n"
+                f"Puoi fare qualsiasi tipo di domanda, senza problemi — siamo qui per aiutarti a **crescere** e, soprattutto, a **fare profitti** 💸🔥"
+            )
+            await channel.send(welcome_message)
+        except Exception:
+            # Do not block setup if message fails
+            pass
+
+    # Try to remove the trigger role after setup completes
+    try:
+        if trigger_role in getattr(member, 'roles', []):
+            await member.remove_roles(trigger_role, reason="Automatic waiting setup completed")
+    except discord.Forbidden:
+        # Missing permissions or role hierarchy; skip silently
+        pass
+    except discord.HTTPException:
+        # Transient API error; skip silently
+        pass
+
+    return channel_created, role_assigned
+
+# The scan needs every member with the trigger role, so it chunks the guild first in lazy mode
+waiting_scanner.configure(ensure_waiting_setup_for_member, prepare_guild=member_lookup.ensure_chunked)